@@ -0,0 +1,352 @@
+"""
+Maintenance analytics
+
+All figures are derived from one daily aggregate of maintenance requests:
+per (day, equipment, team, request type) the requests created, the requests
+repaired, the hours from creation to repair and the labor hours (duration)
+of the repaired ones. Repairs count on the day of completed_at, which a
+flush hook sets when a request's status goes from open to closed.
+
+Days up to yesterday (UTC) are precomputed in analytics_daily_stats by
+refresh_rollups(), which only aggregates the days added since its last run
+plus the days marked dirty by writes to older requests (an edit, a reopen
+or a delete). Queries read the rollup and aggregate the remaining recent
+days live, so results are always current and their cost depends on the
+number of days and assets rather than on the number of requests.
+
+From the daily rows:
+- MTBF of an asset is the mean gap between the days of its corrective
+  requests (a LAG window over failure days; n failures on one day add n - 1
+  zero gaps), in days.
+- MTTR is the mean time from creation to repair of corrective requests, in
+  hours.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, event, func, inspect, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import (
+    AnalyticsDailyStat, AnalyticsDirtyDay, AnalyticsRollupState, Equipment, MaintenanceRequest, MaintenanceTeam,
+    CLOSED_STATUSES
+)
+
+# Seconds between rollup refreshes
+ANALYTICS_REFRESH_INTERVAL = int(os.getenv("ANALYTICS_REFRESH_INTERVAL", "3600"))
+
+STAT_KEYS = ("day", "equipment_id", "team_id", "request_type")
+STAT_VALUES = ("requests", "completed", "repair_hours", "labor_hours")
+# Days covered when a report is asked for without a start date
+DEFAULT_ANALYTICS_DAYS = 365
+VOLUME_GROUPS = ("department", "location", "team", "equipment", "month")
+
+# Attributes whose change moves a request between daily stats rows
+ROLLUP_FIELDS = ("created_at", "completed_at", "status", "equipment_id", "team_id", "request_type", "duration")
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+@event.listens_for(Session, "before_flush")
+def track_completion(session, flush_context, instances):
+    """Keep completed_at in step with status and mark rolled-up days touched by this flush"""
+    now = datetime.utcnow()
+    for obj in session.new:
+        if isinstance(obj, MaintenanceRequest) and (obj.status or "New") in CLOSED_STATUSES and obj.completed_at is None:
+            obj.completed_at = now
+    for obj in session.dirty:
+        if not isinstance(obj, MaintenanceRequest):
+            continue
+        # Only a change of status opens or closes a request; requests closed
+        # before completed_at existed keep it unset when edited otherwise
+        history = inspect(obj).attrs.status.history
+        if not history.deleted:
+            continue
+        was_closed = history.deleted[0] in CLOSED_STATUSES
+        closed = (obj.status or "New") in CLOSED_STATUSES
+        if closed and not was_closed:
+            obj.completed_at = now
+        elif was_closed and not closed:
+            obj.completed_at = None
+
+    # New requests only affect today, which is never rolled up yet
+    today = now.date()
+    days = set()
+    touched = [(obj, False) for obj in session.dirty] + [(obj, True) for obj in session.deleted]
+    for obj, deleted in touched:
+        if not isinstance(obj, MaintenanceRequest):
+            continue
+        state = inspect(obj)
+        if not deleted and not any(state.attrs[field].history.has_changes() for field in ROLLUP_FIELDS):
+            continue
+        for field in ("created_at", "completed_at"):
+            history = state.attrs[field].history
+            for value in list(history.deleted) + [getattr(obj, field)]:
+                if value is not None and value.date() < today:
+                    days.add(value.date())
+    mark_dirty_days(session, days)
+
+def mark_dirty_days(db: Session, days):
+    """Queue rolled-up days for recomputation on the next refresh (for Core writes, see sync.stamp_bulk_rows)"""
+    if days:
+        db.connection().execute(
+            insert(AnalyticsDirtyDay).prefix_with("OR IGNORE", dialect="sqlite"),
+            [{"day": day} for day in sorted(days)]
+        )
+
+def daily_rows(start: date, end: date):
+    """Live daily stats for days start..end, in the shape of analytics_daily_stats"""
+    start_at = datetime.combine(start, datetime.min.time())
+    end_at = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    created = select(
+        func.date(MaintenanceRequest.created_at).label("day"), MaintenanceRequest.equipment_id,
+        MaintenanceRequest.team_id, MaintenanceRequest.request_type,
+        func.count().label("requests"), literal(0).label("completed"),
+        literal(0.0).label("repair_hours"), literal(0).label("labor_hours"),
+    ).where(
+        MaintenanceRequest.created_at >= start_at, MaintenanceRequest.created_at < end_at
+    ).group_by(
+        func.date(MaintenanceRequest.created_at), MaintenanceRequest.equipment_id,
+        MaintenanceRequest.team_id, MaintenanceRequest.request_type
+    )
+    # Status is tested per row rather than in WHERE, which keeps the planner
+    # on the completed_at range instead of every Repaired request
+    repaired_request = MaintenanceRequest.status == "Repaired"
+    repair_hours = (func.julianday(MaintenanceRequest.completed_at) - func.julianday(MaintenanceRequest.created_at)) * 24
+    repaired = select(
+        func.date(MaintenanceRequest.completed_at).label("day"), MaintenanceRequest.equipment_id,
+        MaintenanceRequest.team_id, MaintenanceRequest.request_type,
+        literal(0).label("requests"), func.sum(case((repaired_request, 1), else_=0)).label("completed"),
+        func.sum(case((repaired_request, repair_hours), else_=0.0)).label("repair_hours"),
+        func.sum(case((repaired_request, func.coalesce(MaintenanceRequest.duration, 0)), else_=0)).label("labor_hours"),
+    ).where(
+        MaintenanceRequest.completed_at >= start_at, MaintenanceRequest.completed_at < end_at
+    ).group_by(
+        func.date(MaintenanceRequest.completed_at), MaintenanceRequest.equipment_id,
+        MaintenanceRequest.team_id, MaintenanceRequest.request_type
+    )
+    rows = union_all(created, repaired).subquery()
+    return select(
+        *(rows.c[key] for key in STAT_KEYS), *(func.sum(rows.c[value]).label(value) for value in STAT_VALUES)
+    ).group_by(*(rows.c[key] for key in STAT_KEYS))
+
+def rolled_through(db: Session) -> Optional[date]:
+    return db.execute(select(AnalyticsRollupState.rolled_through).where(AnalyticsRollupState.id == 1)).scalar()
+
+def stats_source(db: Session, start: date, end: date):
+    """Daily stats for start..end: rolled-up days from the table, later days computed live"""
+    through = rolled_through(db)
+    parts = []
+    if through is not None and start <= through:
+        stats = AnalyticsDailyStat.__table__
+        parts.append(
+            select(*(stats.c[key] for key in STAT_KEYS), *(stats.c[value] for value in STAT_VALUES))
+            .where(stats.c.day >= start, stats.c.day <= min(end, through))
+        )
+    live_start = start if through is None else max(start, through + timedelta(days=1))
+    if live_start <= end:
+        parts.append(daily_rows(live_start, end))
+    if not parts:
+        parts.append(daily_rows(start, start - timedelta(days=1)))  # Empty range, keeps the shape
+    # A CTE, so SQLite materializes it once for reports that read it several times
+    return (union_all(*parts) if len(parts) > 1 else parts[0]).cte("stats")
+
+def _rebuild_days(db: Session, start: date, end: date):
+    stats = AnalyticsDailyStat.__table__
+    db.execute(delete(stats).where(stats.c.day >= start, stats.c.day <= end))
+    db.execute(insert(stats).from_select(STAT_KEYS + STAT_VALUES, daily_rows(start, end)))
+
+def refresh_rollups(db: Session, today: Optional[date] = None) -> dict:
+    """Bring analytics_daily_stats up to yesterday, in one transaction"""
+    through = (today or utc_today()) - timedelta(days=1)
+    previous = rolled_through(db)
+    if previous is None:
+        first = db.execute(select(func.min(MaintenanceRequest.created_at))).scalar()
+        previous = (first.date() if first else through + timedelta(days=1)) - timedelta(days=1)
+    rebuilt = 0
+    if previous < through:
+        _rebuild_days(db, previous + timedelta(days=1), through)
+        rebuilt += (through - previous).days
+    dirty = db.execute(
+        select(AnalyticsDirtyDay.day).where(AnalyticsDirtyDay.day <= previous).order_by(AnalyticsDirtyDay.day)
+    ).scalars().all()
+    for day in dirty:
+        _rebuild_days(db, day, day)
+    rebuilt += len(dirty)
+    db.execute(delete(AnalyticsDirtyDay).where(AnalyticsDirtyDay.day <= through))
+    db.merge(AnalyticsRollupState(id=1, rolled_through=max(previous, through)))
+    db.commit()
+    return {"days": rebuilt, "rolled_through": str(max(previous, through))}
+
+def report_range(start: Optional[date], end: Optional[date]):
+    end = end or utc_today()
+    start = start or end - timedelta(days=DEFAULT_ANALYTICS_DAYS - 1)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return start, end
+
+def _stat_filters(stats, team_id: Optional[int], department: Optional[str], location: Optional[str]) -> list:
+    conditions = []
+    if team_id is not None:
+        conditions.append(stats.c.team_id == team_id)
+    if department is not None or location is not None:
+        assets = select(Equipment.id)
+        if department is not None:
+            assets = assets.where(Equipment.department == department)
+        if location is not None:
+            assets = assets.where(Equipment.location == location)
+        conditions.append(stats.c.equipment_id.in_(assets))
+    return conditions
+
+def _round(value, digits: int = 2):
+    return round(value, digits) if value is not None else None
+
+def reliability_report(db: Session, start: Optional[date] = None, end: Optional[date] = None,
+                       team_id: Optional[int] = None, department: Optional[str] = None,
+                       location: Optional[str] = None, limit: int = 100) -> dict:
+    """MTBF and MTTR per asset from corrective requests, most failures first"""
+    start, end = report_range(start, end)
+    stats = stats_source(db, start, end)
+    corrective = [stats.c.request_type == "Corrective", *_stat_filters(stats, team_id, department, location)]
+
+    failure_days = select(
+        stats.c.equipment_id, stats.c.day, func.sum(stats.c.requests).label("failures")
+    ).where(*corrective).group_by(stats.c.equipment_id, stats.c.day).having(func.sum(stats.c.requests) > 0).subquery()
+    previous_day = func.lag(failure_days.c.day).over(partition_by=failure_days.c.equipment_id, order_by=failure_days.c.day)
+    gaps = select(
+        failure_days.c.equipment_id, failure_days.c.failures,
+        (func.julianday(failure_days.c.day) - func.julianday(previous_day)).label("gap_days")
+    ).subquery()
+    mtbf = select(
+        gaps.c.equipment_id, func.sum(gaps.c.failures).label("failures"),
+        (func.sum(gaps.c.gap_days) / func.nullif(func.sum(gaps.c.failures) - 1, 0)).label("mtbf_days")
+    ).group_by(gaps.c.equipment_id).subquery()
+    repairs = select(
+        stats.c.equipment_id, func.sum(stats.c.completed).label("repairs"),
+        func.sum(stats.c.repair_hours).label("repair_hours"), func.sum(stats.c.labor_hours).label("labor_hours")
+    ).where(*corrective).group_by(stats.c.equipment_id).subquery()
+
+    rows = db.execute(
+        select(
+            Equipment.id, Equipment.name, Equipment.department, Equipment.location,
+            mtbf.c.failures, mtbf.c.mtbf_days, repairs.c.repairs, repairs.c.repair_hours, repairs.c.labor_hours
+        ).join(mtbf, mtbf.c.equipment_id == Equipment.id)
+        .outerjoin(repairs, repairs.c.equipment_id == Equipment.id)
+        .order_by(mtbf.c.failures.desc(), Equipment.id).limit(limit)
+    ).all()
+    totals = db.execute(
+        select(func.sum(stats.c.requests), func.sum(stats.c.completed), func.sum(stats.c.repair_hours)).where(*corrective)
+    ).one()
+    failures, repaired, repair_hours = totals
+    return {
+        "start": str(start),
+        "end": str(end),
+        "failures": failures or 0,
+        "repairs": repaired or 0,
+        "mttr_hours": _round(repair_hours / repaired) if repaired else None,
+        "equipment": [
+            {
+                "equipment_id": row.id,
+                "name": row.name,
+                "department": row.department,
+                "location": row.location,
+                "failures": row.failures,
+                "mtbf_days": _round(row.mtbf_days),
+                "repairs": row.repairs or 0,
+                "mttr_hours": _round(row.repair_hours / row.repairs) if row.repairs else None,
+                "labor_hours": row.labor_hours or 0,
+            }
+            for row in rows
+        ],
+    }
+
+def volume_report(db: Session, group_by: str, start: Optional[date] = None, end: Optional[date] = None,
+                  team_id: Optional[int] = None, department: Optional[str] = None,
+                  location: Optional[str] = None) -> dict:
+    """Request volume, preventive share, repairs, labor hours and MTTR per group"""
+    if group_by not in VOLUME_GROUPS:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by. Allowed: {', '.join(VOLUME_GROUPS)}")
+    start, end = report_range(start, end)
+    stats = stats_source(db, start, end)
+
+    corrective = stats.c.request_type == "Corrective"
+    columns = [
+        func.sum(stats.c.requests).label("requests"),
+        func.sum(case((corrective, stats.c.requests), else_=0)).label("corrective"),
+        func.sum(case((stats.c.request_type == "Preventive", stats.c.requests), else_=0)).label("preventive"),
+        func.sum(stats.c.completed).label("repairs"),
+        func.sum(stats.c.labor_hours).label("labor_hours"),
+        func.sum(case((corrective, stats.c.completed), else_=0)).label("corrective_repairs"),
+        func.sum(case((corrective, stats.c.repair_hours), else_=0)).label("corrective_repair_hours"),
+    ]
+    # Totals per team, month or asset first, so only those rows are joined and regrouped
+    if group_by == "team":
+        inner_key = stats.c.team_id
+    elif group_by == "month":
+        inner_key = func.strftime("%Y-%m", stats.c.day)
+    else:
+        inner_key = stats.c.equipment_id
+    totals = select(inner_key.label("key"), *columns).where(
+        *_stat_filters(stats, team_id, department, location)
+    ).group_by(inner_key).subquery()
+
+    values = [totals.c[column.name] for column in columns]
+    if group_by == "team":
+        query = select(totals.c.key, MaintenanceTeam.name.label("name"), *values).outerjoin(
+            MaintenanceTeam, MaintenanceTeam.id == totals.c.key
+        ).order_by(totals.c.key)
+    elif group_by == "month":
+        query = select(totals.c.key, literal(None).label("name"), *values).order_by(totals.c.key)
+    elif group_by == "equipment":
+        query = select(totals.c.key, Equipment.name.label("name"), *values).join(
+            Equipment, Equipment.id == totals.c.key
+        ).order_by(totals.c.key)
+    else:
+        key = getattr(Equipment, group_by)
+        query = select(
+            key.label("key"), literal(None).label("name"), *(func.sum(value).label(value.name) for value in values)
+        ).join(Equipment, Equipment.id == totals.c.key).group_by(key).order_by(key)
+    rows = db.execute(query.select_from(totals)).all()
+
+    groups = []
+    for row in rows:
+        if not row.requests and not row.repairs:
+            continue
+        group = {group_by: row.key}
+        if row.name is not None:
+            group["name"] = row.name
+        group.update({
+            "requests": row.requests,
+            "corrective": row.corrective,
+            "preventive": row.preventive,
+            "preventive_ratio": _round(row.preventive / row.requests, 3) if row.requests else None,
+            "repairs": row.repairs,
+            "labor_hours": row.labor_hours,
+            "mttr_hours": _round(row.corrective_repair_hours / row.corrective_repairs) if row.corrective_repairs else None,
+        })
+        groups.append(group)
+    return {"start": str(start), "end": str(end), "group_by": group_by, "groups": groups}
+
+def run_refresh() -> dict:
+    db = SessionLocal()
+    try:
+        return refresh_rollups(db)
+    finally:
+        db.close()
+
+async def rollup_refresher():
+    """Refresh the daily rollups every ANALYTICS_REFRESH_INTERVAL seconds until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(run_refresh)
+        except Exception as e:
+            print(f"ERROR during analytics rollup: {e}")
+        await asyncio.sleep(ANALYTICS_REFRESH_INTERVAL)
@@ -0,0 +1,250 @@
+"""
+Technician auto-assignment
+
+The assignment engine keeps an in-memory load index per team: every
+technician's open hours (sum of duration over New and In Progress requests),
+hours booked per scheduled day and skill tags, with a min-heap of
+(open hours, technician id) per team. Picking a technician pops the least
+loaded ones until one has the required skills and room on the scheduled day
+(DAILY_CAPACITY_HOURS), so an assignment costs O(k log n) for k skipped
+technicians instead of a workload query per candidate.
+
+Teams are loaded lazily from the database. ORM writes to maintenance
+requests update the index incrementally once their transaction commits
+(see record_load_changes); Core writes stamped with stamp_bulk_rows
+rebuild it on commit instead.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import heapq
+import threading
+from datetime import date
+from typing import Optional
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from backend.models import MaintenanceRequest, Technician, OPEN_STATUSES, team_members
+from backend.sync import stamp_bulk_rows
+from backend.technicians import parse_members
+
+# Hours of work one technician can be booked for on a single day
+DAILY_CAPACITY_HOURS = float(os.getenv("DAILY_CAPACITY_HOURS", "8"))
+# Unassigned requests assigned per batch call at most
+MAX_ASSIGN_BATCH = 10000
+
+def parse_skills(skills: Optional[str]) -> frozenset:
+    """Skill tags from a comma-separated string, case-insensitive"""
+    return frozenset(name.lower() for name in parse_members(skills))
+
+class TechnicianLoad:
+    __slots__ = ("id", "name", "skills", "open_hours", "booked")
+
+    def __init__(self, technician_id: int, name: str, skills: frozenset):
+        self.id = technician_id
+        self.name = name
+        self.skills = skills
+        self.open_hours = 0.0
+        self.booked = {}  # scheduled date -> open hours booked that day
+
+    def fits(self, scheduled_date: Optional[date], hours: float, skills: frozenset) -> bool:
+        if not skills <= self.skills:
+            return False
+        if scheduled_date is None:
+            return True
+        booked = self.booked.get(scheduled_date, 0.0)
+        # A job longer than a whole day still goes to someone free that day
+        return booked == 0 or booked + hours <= DAILY_CAPACITY_HOURS
+
+class AssignmentEngine:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._technicians = {}  # technician id -> TechnicianLoad
+        self._teams = {}  # team id -> heap of (open hours, technician id)
+        self._members = {}  # team id -> technician ids
+
+    def reset(self):
+        with self.lock:
+            self._technicians.clear()
+            self._teams.clear()
+            self._members.clear()
+
+    def invalidate_team(self, team_id: int):
+        with self.lock:
+            self._teams.pop(team_id, None)
+            self._members.pop(team_id, None)
+
+    def _load_team(self, db: Session, team_id: int):
+        members = db.execute(
+            select(Technician.id, Technician.name, Technician.skills).join(
+                team_members, team_members.c.technician_id == Technician.id
+            ).where(team_members.c.team_id == team_id)
+        ).all()
+        new = [row for row in members if row.id not in self._technicians]
+        if new:
+            loads = {row.id: TechnicianLoad(row.id, row.name, parse_skills(row.skills)) for row in new}
+            open_requests = (
+                MaintenanceRequest.technician_id.in_(loads),
+                MaintenanceRequest.status.in_(OPEN_STATUSES),
+            )
+            for technician_id, hours in db.execute(
+                select(MaintenanceRequest.technician_id, func.sum(MaintenanceRequest.duration))
+                .where(*open_requests).group_by(MaintenanceRequest.technician_id)
+            ):
+                loads[technician_id].open_hours = float(hours or 0)
+            for technician_id, day, hours in db.execute(
+                select(MaintenanceRequest.technician_id, MaintenanceRequest.scheduled_date, func.sum(MaintenanceRequest.duration))
+                .where(*open_requests, MaintenanceRequest.scheduled_date >= date.today())
+                .group_by(MaintenanceRequest.technician_id, MaintenanceRequest.scheduled_date)
+            ):
+                loads[technician_id].booked[day] = float(hours or 0)
+            self._technicians.update(loads)
+        self._members[team_id] = {row.id for row in members}
+        heap = [(self._technicians[row.id].open_hours, row.id) for row in members]
+        heapq.heapify(heap)
+        self._teams[team_id] = heap
+
+    def choose(self, db: Session, team_id: int, scheduled_date: Optional[date], hours: float,
+               skills: frozenset = frozenset()) -> Optional[TechnicianLoad]:
+        """Least loaded technician of the team who has the skills and room that day"""
+        with self.lock:
+            if team_id not in self._teams:
+                self._load_team(db, team_id)
+            heap = self._teams[team_id]
+            skipped = []
+            chosen = None
+            while heap:
+                open_hours, technician_id = heapq.heappop(heap)
+                load = self._technicians.get(technician_id)
+                # Entries left behind by earlier load changes are dropped
+                if load is None or load.open_hours != open_hours or technician_id not in self._members[team_id]:
+                    continue
+                skipped.append((open_hours, technician_id))
+                if load.fits(scheduled_date, hours, skills):
+                    chosen = load
+                    break
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            return chosen
+
+    def apply(self, changes):
+        """Apply (technician id, hours, scheduled date) load changes"""
+        with self.lock:
+            for technician_id, hours, scheduled_date in changes:
+                load = self._technicians.get(technician_id)
+                if load is None:
+                    continue
+                load.open_hours += hours
+                if scheduled_date is not None:
+                    load.booked[scheduled_date] = load.booked.get(scheduled_date, 0.0) + hours
+                for team_id, members in self._members.items():
+                    if technician_id in members:
+                        heap = self._teams[team_id]
+                        heapq.heappush(heap, (load.open_hours, technician_id))
+                        # Stale entries are normally dropped as they surface;
+                        # rebuild when they start to dominate the heap
+                        if len(heap) > 4 * len(members) + 16:
+                            heap[:] = [(self._technicians[member].open_hours, member) for member in members]
+                            heapq.heapify(heap)
+
+    def update_skills(self, technician_id: int, skills: Optional[str]):
+        with self.lock:
+            load = self._technicians.get(technician_id)
+            if load is not None:
+                load.skills = parse_skills(skills)
+
+assignment_engine = AssignmentEngine()
+
+def _load(technician_id, status, duration, scheduled_date):
+    """Load a request puts on its technician, None when it puts none"""
+    if technician_id is None or (status or "New") not in OPEN_STATUSES:
+        return None
+    return technician_id, float(duration or 0), scheduled_date
+
+LOAD_FIELDS = ("technician_id", "status", "duration", "scheduled_date")
+
+@event.listens_for(Session, "after_flush")
+def record_load_changes(session, flush_context):
+    """Collect the load changes of flushed maintenance requests until commit"""
+    changes = session.info.setdefault("assignment_changes", [])
+    for obj in session.new:
+        if isinstance(obj, MaintenanceRequest):
+            new = _load(*(getattr(obj, field) for field in LOAD_FIELDS))
+            if new:
+                changes.append(new)
+    for obj in session.dirty:
+        if not isinstance(obj, MaintenanceRequest):
+            continue
+        state = inspect(obj)
+        old_values = []
+        for field in LOAD_FIELDS:
+            history = state.attrs[field].history
+            old_values.append(history.deleted[0] if history.deleted else getattr(obj, field))
+        old = _load(*old_values)
+        new = _load(*(getattr(obj, field) for field in LOAD_FIELDS))
+        if old != new:
+            if old:
+                changes.append((old[0], -old[1], old[2]))
+            if new:
+                changes.append(new)
+    for obj in session.deleted:
+        if isinstance(obj, MaintenanceRequest):
+            old = _load(*(getattr(obj, field) for field in LOAD_FIELDS))
+            if old:
+                changes.append((old[0], -old[1], old[2]))
+
+def queue_reload(session: Session):
+    """Rebuild the index on commit, after Core writes the flush hook does not see"""
+    session.info["assignment_reload"] = True
+
+@event.listens_for(Session, "after_commit")
+def apply_load_changes(session):
+    changes = session.info.pop("assignment_changes", None)
+    if session.info.pop("assignment_reload", False):
+        assignment_engine.reset()
+    elif changes:
+        assignment_engine.apply(changes)
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_load_changes(session, previous_transaction):
+    session.info.pop("assignment_changes", None)
+    session.info.pop("assignment_reload", None)
+
+def assign_unassigned(db: Session, team_id: Optional[int] = None, limit: int = MAX_ASSIGN_BATCH) -> dict:
+    """Assign open requests without a technician, earliest scheduled first.
+
+    Picks are made against the in-memory index and written back with one
+    executemany UPDATE in a single transaction.
+    """
+    query = select(
+        MaintenanceRequest.id, MaintenanceRequest.team_id, MaintenanceRequest.scheduled_date,
+        MaintenanceRequest.duration, MaintenanceRequest.required_skills, MaintenanceRequest.technician
+    ).where(
+        MaintenanceRequest.technician_id.is_(None), MaintenanceRequest.status.in_(OPEN_STATUSES)
+    ).order_by(MaintenanceRequest.scheduled_date, MaintenanceRequest.id).limit(limit)
+    if team_id is not None:
+        query = query.where(MaintenanceRequest.team_id == team_id)
+    pending = db.execute(query).all()
+
+    assignments = []
+    with assignment_engine.lock:
+        for row in pending:
+            hours = float(row.duration or 0)
+            chosen = assignment_engine.choose(db, row.team_id, row.scheduled_date, hours, parse_skills(row.required_skills))
+            if chosen is None:
+                continue
+            assignment_engine.apply([(chosen.id, hours, row.scheduled_date)])
+            assignments.append({"id": row.id, "technician_id": chosen.id, "technician": chosen.name})
+        if assignments:
+            try:
+                stamp_bulk_rows(db, assignments, {row.id: row for row in pending}, loads_applied=True)
+                db.execute(update(MaintenanceRequest), assignments)
+                db.commit()
+            except Exception:
+                # The index already counts these picks; rebuild it from the database
+                db.rollback()
+                assignment_engine.reset()
+                raise
+    return {"assigned": len(assignments), "unassigned": len(pending) - len(assignments)}
@@ -0,0 +1,150 @@
+"""
+Bulk import/export helpers
+
+Uploads are spooled to a temporary file (kept in memory up to
+SPOOL_MAX_MEMORY bytes) and parsed row by row, so large CSV or JSON Lines
+files never have to fit in memory at once. Exports stream rows straight
+from a server-side cursor.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime, date
+from typing import Optional
+from fastapi import HTTPException, Request
+from backend.database import SessionLocal
+
+# Rows validated and inserted per transaction
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+# Rows fetched per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
+# Per-row errors listed in an import report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+MEDIA_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick csv or jsonl from an explicit format parameter or the Content-Type"""
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid format. Allowed: csv, jsonl")
+        return requested
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if not content_type or "json" in content_type or content_type.startswith("text/plain"):
+        return "jsonl"
+    raise HTTPException(status_code=415, detail="Upload must be CSV (text/csv) or JSON Lines (application/x-ndjson)")
+
+async def spool_body(request: Request):
+    """Copy the request body into a temporary file without buffering it whole"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def read_rows(binary_file, fmt: str):
+    """Yield (line number, row dict, error) for every record in the upload.
+
+    Exactly one of row and error is set. Empty CSV cells are dropped so model
+    defaults apply to them.
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}, None
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+def batched(iterable, size: int):
+    """Split an iterable into lists of at most size items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def validation_message(error) -> str:
+    """Flatten a pydantic ValidationError into one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+class BulkReport:
+    """Outcome of a bulk import: inserted rows and per-row errors"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {"inserted": self.inserted, "failed": self.failed, "errors": errors}
+
+def plain_value(value):
+    """Date and datetime values as ISO strings, everything else unchanged"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def stream_export(statement, fmt: str):
+    """Yield a Core select's rows encoded as CSV or JSON Lines.
+
+    Opens its own session because the response body is produced after the
+    route has returned.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        fields = list(result.keys())
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for rows in result.partitions():
+                writer.writerows([plain_value(value) for value in row] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps({field: plain_value(value) for field, value in zip(fields, row)}) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
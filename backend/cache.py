@@ -0,0 +1,43 @@
+import os
+import threading
+import time
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds.
+
+    A ttl of 0 disables caching: get() always misses.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+# Dashboard statistics, invalidated by the write routes
+dashboard_cache = TTLCache(ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "30")))
@@ -0,0 +1,40 @@
+"""
+Conditional GET support
+
+Read endpoints declare the tables their response is built from with
+etag_for(). The ETag is a weak validator made of those tables' committed
+change versions, read from memory (sync.table_versions), so a request whose
+If-None-Match still matches is answered with 304 Not Modified before the
+route runs a single query.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, HTTPException, Request, Response
+from backend.sync import table_versions
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+def etag_for(*tables: str):
+    """Route dependency adding an ETag built from tables and answering 304 when it matches"""
+    async def check(request: Request, response: Response):
+        versions = table_versions.get(tables)
+        if versions is None:
+            return
+        etag = 'W/"' + "-".join(str(version) for version in versions) + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return Depends(check)
@@ -1,14 +1,88 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import functools
+import inspect as pyinspect
 import os
+from backend.metrics import instrument_engine
 
-# Database file path
-DATABASE_URL = "sqlite:///./gearGuard.db"
+# Database URL, defaults to a SQLite file in the working directory
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./gearGuard.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Serve API routes through an aiosqlite-backed AsyncSession instead of the
+# threadpool + sync session (requires the aiosqlite and greenlet packages)
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "").lower() in ("1", "true", "yes")
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+)
+
+# Connection pool settings (ignored for in-memory SQLite, which cannot pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # Seconds, -1 keeps connections forever
+
+# PRAGMAs applied to every new SQLite connection. WAL lets readers proceed
+# while a writer commits, and synchronous=NORMAL is durable under WAL except
+# for the last transactions on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # Milliseconds
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # Negative means KiB, so 64 MiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", "268435456")),  # Bytes
+}
+
+def is_memory_sqlite(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(url) -> dict:
+    """Keyword arguments for create_engine/create_async_engine for url"""
+    options = {}
+    if not is_memory_sqlite(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+def apply_sqlite_pragmas(target_engine):
+    """Run SQLITE_PRAGMAS on each connection target_engine opens"""
+    if target_engine.dialect.name != "sqlite":
+        return
+    pragmas = dict(SQLITE_PRAGMAS)
+    if is_memory_sqlite(target_engine.url):
+        pragmas.pop("journal_mode")  # In-memory databases have no journal file
+
+    @event.listens_for(target_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **engine_options(DATABASE_URL))
+apply_sqlite_pragmas(engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    apply_sqlite_pragmas(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=True
+    )
+
 Base = declarative_base()
 
 def get_db():
@@ -19,7 +93,73 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session (USE_ASYNC_DB only)"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database layer is disabled, set USE_ASYNC_DB=1")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def db_route(func):
+    """Run a route written against a sync Session on the configured database layer.
+
+    Without USE_ASYNC_DB the route is returned unchanged and FastAPI runs it
+    in its threadpool with a session from get_db. With USE_ASYNC_DB it becomes
+    a coroutine that receives an AsyncSession from get_async_db and executes
+    the route body through AsyncSession.run_sync, so database I/O is awaited
+    on the event loop instead of holding a threadpool thread per request.
+    """
+    if not USE_ASYNC_DB:
+        return func
+
+    from fastapi import Depends
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    signature = pyinspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, db: AsyncSession, **kwargs):
+        return await db.run_sync(lambda session: func(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=[
+        param.replace(annotation=AsyncSession, default=Depends(get_async_db)) if name == "db" else param
+        for name, param in signature.parameters.items()
+    ])
+    return wrapper
+
+def add_missing_columns():
+    """Add model columns that are missing from tables created by older versions"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                    if column.server_default is not None:
+                        default = column.server_default.arg
+                        if isinstance(default, str):
+                            default = "'" + default.replace("'", "''") + "'"
+                        else:
+                            default = default.compile(dialect=engine.dialect)
+                        ddl += f" DEFAULT {default}"
+                        if not column.nullable:
+                            ddl += " NOT NULL"
+                    conn.execute(text(ddl))
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    # create_all skips existing tables, so indexes added to models later
+    # have to be created explicitly on databases from older versions
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # FTS5 indexes are raw DDL outside the models
+    from backend.search import create_search_indexes
+    with engine.begin() as conn:
+        create_search_indexes(conn)
 
@@ -0,0 +1,190 @@
+"""
+Live update events
+
+The event hub fans committed changes to maintenance requests and equipment
+out to Server-Sent Events subscribers (GET /api/events). A subscriber holds
+only a pending set of changed and deleted ids per entity and an asyncio
+event, so an idle connection costs one sleeping coroutine; there is no
+per-connection queue to fill up.
+
+Changes are coalesced: once something is pending, the stream waits
+EVENT_COALESCE_MS before sending, so a burst of writes to the same rows
+becomes one message per entity. Subscribers may restrict themselves to one
+team and then only hear about rows of that team.
+
+ORM writes are published automatically once their transaction commits (see
+record_events). Core writes queue theirs with queue_events, which
+stamp_bulk_rows does for requests; set-based updates that do not know
+their rows call event_hub.publish_reload(), which tells clients to refetch
+instead of listing ids.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from backend.models import Equipment, MaintenanceRequest
+
+# Milliseconds changes are collected before they are sent to a subscriber
+EVENT_COALESCE_MS = int(os.getenv("EVENT_COALESCE_MS", "250"))
+# Seconds between keep-alive comments on an idle stream
+EVENT_HEARTBEAT_SECONDS = int(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+# Ids kept per entity and subscriber before falling back to a reload event
+EVENT_MAX_IDS = 500
+# Milliseconds EventSource waits before reconnecting
+EVENT_RETRY_MS = 3000
+
+# Model -> (event name, attribute holding its team id)
+EVENT_SOURCES = {
+    MaintenanceRequest: ("maintenance_request", "team_id"),
+    Equipment: ("equipment", "maintenance_team_id"),
+}
+
+class Subscriber:
+    __slots__ = ("team_id", "pending", "ready")
+
+    def __init__(self, team_id: Optional[int]):
+        self.team_id = team_id
+        self.pending = {}  # event name -> {"changed": set, "deleted": set, "reload": bool}
+        self.ready = asyncio.Event()
+
+    def wants(self, teams) -> bool:
+        # None in teams marks a change not tied to one team (e.g. a reload)
+        return self.team_id is None or None in teams or self.team_id in teams
+
+    def add(self, name: str, action: str, row_id: Optional[int]):
+        entry = self.pending.setdefault(name, {"changed": set(), "deleted": set(), "reload": False})
+        if row_id is None or entry["reload"]:
+            entry["reload"] = True
+            entry["changed"].clear()
+            entry["deleted"].clear()
+            return
+        if action == "deleted":
+            entry["changed"].discard(row_id)
+            entry["deleted"].add(row_id)
+        else:
+            entry["changed"].add(row_id)
+        if len(entry["changed"]) + len(entry["deleted"]) > EVENT_MAX_IDS:
+            entry["reload"] = True
+            entry["changed"].clear()
+            entry["deleted"].clear()
+
+    def drain(self) -> dict:
+        pending, self.pending = self.pending, {}
+        self.ready.clear()
+        return pending
+
+class EventHub:
+    """In-process fan-out of change events to the connected subscribers.
+
+    Subscribers live on the server's event loop; publish() may be called from
+    any thread and hands the events over with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._loop = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def stop(self):
+        self._loop = None
+        for subscriber in list(self._subscribers):
+            subscriber.ready.set()
+        self._subscribers.clear()
+
+    def subscribe(self, team_id: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(team_id)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, events):
+        """Publish (event name, action, id, team ids) tuples; an id of None means reload"""
+        loop = self._loop
+        if loop is None or not events:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, events)
+        except RuntimeError:
+            # The loop closed while the server was shutting down
+            pass
+
+    def publish_reload(self, name: str, team_id: Optional[int] = None):
+        self.publish([(name, "reload", None, {team_id})])
+
+    def _dispatch(self, events):
+        for subscriber in self._subscribers:
+            touched = False
+            for name, action, row_id, teams in events:
+                if subscriber.wants(teams):
+                    subscriber.add(name, action, row_id)
+                    touched = True
+            if touched:
+                subscriber.ready.set()
+
+    async def stream(self, subscriber: Subscriber):
+        """Server-Sent Events for one subscriber, until the client goes away"""
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            while self._loop is not None:
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                # Let the rest of a burst arrive before sending
+                await asyncio.sleep(EVENT_COALESCE_MS / 1000)
+                for name, entry in subscriber.drain().items():
+                    data = {
+                        "changed": sorted(entry["changed"]),
+                        "deleted": sorted(entry["deleted"]),
+                        "reload": entry["reload"],
+                    }
+                    yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+event_hub = EventHub()
+
+def _teams(obj, team_attr: str) -> set:
+    """Team ids a row belongs to before and after this flush"""
+    history = inspect(obj).attrs[team_attr].history
+    return {getattr(obj, team_attr), *history.deleted}
+
+@event.listens_for(Session, "after_flush")
+def record_events(session, flush_context):
+    """Collect change events of flushed requests and equipment until commit"""
+    events = session.info.setdefault("live_events", [])
+    for action, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            source = EVENT_SOURCES.get(type(obj))
+            if source is None:
+                continue
+            if action == "updated" and not session.is_modified(obj, include_collections=False):
+                continue
+            name, team_attr = source
+            events.append((name, action, obj.id, _teams(obj, team_attr)))
+
+def queue_events(session: Session, events: list):
+    """Queue events of Core writes, which the flush hook does not see, for publishing on commit"""
+    session.info.setdefault("live_events", []).extend(events)
+
+@event.listens_for(Session, "after_commit")
+def publish_events(session):
+    events = session.info.pop("live_events", None)
+    if events:
+        event_hub.publish(events)
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_events(session, previous_transaction):
+    session.info.pop("live_events", None)
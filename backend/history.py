@@ -0,0 +1,56 @@
+"""
+Status-transition history of maintenance requests
+
+Every change to a request's status, technician or scheduled date appends
+one row to request_events, inside the transaction that makes the change:
+an after_flush hook covers ORM writes, and Core bulk writes call
+log_events() themselves. The log lives in its own narrow table, so busy
+kanban boards add small rows there instead of widening or rewriting
+maintenance_requests, and rows are never updated or deleted. The same rows
+feed the webhook notifications (backend/notifications.py).
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+from backend.models import MaintenanceRequest, RequestEvent
+from backend.notifications import queue_notifications
+
+# Request attributes whose changes are logged
+TRACKED_FIELDS = ("status", "technician", "scheduled_date")
+
+def _value(value):
+    return str(value) if value is not None else None
+
+def event_row(request_id: int, field: str, old, new, ts: datetime) -> dict:
+    return {"request_id": request_id, "ts": ts, "field": field, "old_value": _value(old), "new_value": _value(new)}
+
+def log_events(db: Session, rows: list):
+    """Append event rows (see event_row) in the session's transaction"""
+    if rows:
+        db.connection().execute(insert(RequestEvent), rows)
+        queue_notifications(db, rows)
+
+@event.listens_for(Session, "after_flush")
+def log_request_changes(session, flush_context):
+    """Log tracked attribute changes of flushed requests"""
+    now = datetime.utcnow()
+    rows = []
+    for obj in session.dirty:
+        if not isinstance(obj, MaintenanceRequest):
+            continue
+        state = inspect(obj)
+        for field in TRACKED_FIELDS:
+            history = state.attrs[field].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if _value(old) != _value(new):
+                rows.append(event_row(obj.id, field, old, new, now))
+    log_events(session, rows)
@@ -0,0 +1,90 @@
+"""
+Cross-process cache invalidation
+
+The workers of run.py --production share one database with each other,
+the launcher's periodic tasks and scripts such as seed_data.py. The ETag
+versions (sync.table_versions), the dashboard cache, the assignment
+engine's technician loads and the live update subscribers all live in one
+process, so each worker polls change_versions every CACHE_SYNC_INTERVAL_MS.
+Every write bumps the counters of the tables it touches, and
+table_versions remembers the versions the worker wrote itself (already
+handled by its own after-commit hooks), so any other new version means
+another process committed to that table. The worker then advances its
+ETags, drops what it cached from the table and tells its own subscribers
+what changed: requests are read back by row_version, equipment is sent as
+a reload. A single-process server sees all writes itself and does not poll.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Equipment, MaintenanceRequest, MaintenanceTeam, RequestTombstone, Technician
+from backend.assignment import assignment_engine
+from backend.cache import dashboard_cache
+from backend.events import event_hub, EVENT_MAX_IDS
+from backend.sync import table_versions
+
+# Milliseconds between checks for writes of other processes (0 disables them)
+CACHE_SYNC_INTERVAL_MS = int(os.getenv("CACHE_SYNC_INTERVAL_MS", "1000"))
+
+# Tables the assignment engine's technician loads are built from
+ASSIGNMENT_TABLES = {MaintenanceRequest.__tablename__, Technician.__tablename__, MaintenanceTeam.__tablename__}
+
+def request_events(db: Session, ranges: list) -> list:
+    """Live update events for the requests written in the given (first, last) version ranges"""
+    changed = db.execute(
+        select(MaintenanceRequest.id, MaintenanceRequest.team_id)
+        .where(or_(*(MaintenanceRequest.row_version.between(first, last) for first, last in ranges)))
+        .limit(EVENT_MAX_IDS + 1)
+    ).all()
+    deleted = db.execute(
+        select(RequestTombstone.request_id, RequestTombstone.team_id)
+        .where(or_(*(RequestTombstone.row_version.between(first, last) for first, last in ranges)))
+        .limit(EVENT_MAX_IDS + 1)
+    ).all()
+    if len(changed) + len(deleted) > EVENT_MAX_IDS:
+        return [("maintenance_request", "reload", None, {None})]
+    return (
+        [("maintenance_request", "updated", request_id, {team_id}) for request_id, team_id in changed]
+        + [("maintenance_request", "deleted", request_id, {team_id}) for request_id, team_id in deleted]
+    )
+
+def apply_remote_changes(db: Session) -> dict:
+    """Catch up with writes committed elsewhere; returns {table: version ranges} for tables they touched"""
+    changed = table_versions.refresh(db)
+    if not changed:
+        return changed
+    dashboard_cache.invalidate()
+    if ASSIGNMENT_TABLES & changed.keys():
+        assignment_engine.reset()
+    events = []
+    if MaintenanceRequest.__tablename__ in changed:
+        events += request_events(db, changed[MaintenanceRequest.__tablename__])
+    if Equipment.__tablename__ in changed:
+        events.append(("equipment", "reload", None, {None}))
+    event_hub.publish(events)
+    return changed
+
+def run_sync():
+    db = SessionLocal()
+    try:
+        apply_remote_changes(db)
+    finally:
+        db.close()
+
+async def watch_changes():
+    """Apply other processes' writes every CACHE_SYNC_INTERVAL_MS until cancelled"""
+    table_versions.track_local()
+    while True:
+        try:
+            await run_in_threadpool(run_sync)
+        except Exception as e:
+            print(f"ERROR syncing changes from other processes: {e}")
+        await asyncio.sleep(CACHE_SYNC_INTERVAL_MS / 1000)
@@ -0,0 +1,210 @@
+"""
+Durable background job queue
+
+Side effects that the client does not need to wait for are queued as rows
+of the jobs table with enqueue(), in the same transaction as the write
+that causes them: a job exists exactly when that write committed, and
+survives restarts. Committing a session that enqueued jobs wakes the
+worker pool, a few asyncio tasks started with the application that run
+jobs in the threadpool.
+
+Workers claim up to JOB_BATCH_SIZE due jobs of one kind with a single
+UPDATE, which also pushes their run_at JOB_LEASE_SECONDS ahead: a job whose
+worker dies is claimed again once the lease runs out. The kind's handler
+gets all the payloads at once, and the jobs are deleted in the handler's
+transaction. When a batch fails its jobs are retried one by one, and the
+ones that still fail are retried later with exponential backoff, up to
+JOB_MAX_ATTEMPTS attempts, then kept with status "failed".
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Job
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Jobs of one kind handed to a handler at once
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "100"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "8"))
+# Delay before the first retry; doubled for every further attempt
+JOB_RETRY_SECONDS = float(os.getenv("JOB_RETRY_SECONDS", "5"))
+JOB_MAX_RETRY_SECONDS = 3600
+JOB_LEASE_SECONDS = 300
+# Idle workers look for jobs queued by other processes at least this often
+JOB_POLL_SECONDS = 5
+
+# Job kind -> handler(db, payloads); see job_handler
+HANDLERS = {}
+
+def job_handler(kind: str):
+    """Register the handler of a job kind.
+
+    The handler gets the session and a list of payloads and must not commit.
+    It may return a callable, which runs after its writes are committed.
+    """
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return register
+
+def enqueue(db: Session, kind: str, payload: dict):
+    """Queue a job in the session's transaction; it runs once that commits"""
+    db.connection().execute(insert(Job), {
+        "kind": kind,
+        "payload": json.dumps(payload),
+        "run_at": datetime.utcnow(),
+    })
+    db.info["jobs_enqueued"] = True
+
+@event.listens_for(Session, "after_commit")
+def wake_workers(session):
+    if session.info.pop("jobs_enqueued", False):
+        job_queue.wake()
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_wakeup(session, previous_transaction):
+    session.info.pop("jobs_enqueued", None)
+
+def claim(db: Session, limit: int) -> list:
+    """Lease up to limit due jobs of the kind due first, in one UPDATE"""
+    now = datetime.utcnow()
+    due = (Job.status == "pending", Job.run_at <= now)
+    first_kind = select(Job.kind).where(*due).order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+    ids = select(Job.id).where(*due, Job.kind == first_kind).order_by(Job.run_at, Job.id).limit(limit)
+    jobs = db.execute(
+        update(Job).where(Job.id.in_(ids))
+        .values(run_at=now + timedelta(seconds=JOB_LEASE_SECONDS), attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts)
+    ).all()
+    db.commit()
+    return sorted(jobs, key=lambda job: job.id)
+
+def _run(db: Session, jobs: list):
+    """Run one kind's jobs through its handler and delete them, in one transaction"""
+    handler = HANDLERS.get(jobs[0].kind)
+    if handler is None:
+        raise RuntimeError(f"No handler for job kind {jobs[0].kind}")
+    after_commit = handler(db, [json.loads(job.payload) for job in jobs])
+    db.execute(delete(Job).where(Job.id.in_([job.id for job in jobs])))
+    db.commit()
+    if after_commit is not None:
+        after_commit()
+
+def _retry_later(db: Session, job, error: Exception):
+    if job.attempts >= JOB_MAX_ATTEMPTS:
+        values = {"status": "failed"}
+    else:
+        delay = min(JOB_RETRY_SECONDS * 2 ** (job.attempts - 1), JOB_MAX_RETRY_SECONDS)
+        values = {"run_at": datetime.utcnow() + timedelta(seconds=delay)}
+    db.execute(update(Job).where(Job.id == job.id).values(last_error=f"{type(error).__name__}: {error}"[:1000], **values))
+    db.commit()
+
+def run_due_jobs(limit: int = JOB_BATCH_SIZE) -> int:
+    """Claim and run one batch of due jobs; returns how many were claimed"""
+    db = SessionLocal()
+    try:
+        jobs = claim(db, limit)
+        if not jobs:
+            return 0
+        try:
+            _run(db, jobs)
+        except Exception as e:
+            db.rollback()
+            if len(jobs) == 1:
+                _retry_later(db, jobs[0], e)
+            else:
+                # Find the jobs that fail on their own; the rest run now
+                for job in jobs:
+                    try:
+                        _run(db, [job])
+                    except Exception as job_error:
+                        db.rollback()
+                        _retry_later(db, job, job_error)
+        return len(jobs)
+    finally:
+        db.close()
+
+def seconds_until_due() -> float:
+    """Seconds until the next pending job is due, at most JOB_POLL_SECONDS"""
+    db = SessionLocal()
+    try:
+        run_at = db.execute(select(func.min(Job.run_at)).where(Job.status == "pending")).scalar()
+    finally:
+        db.close()
+    if run_at is None:
+        return JOB_POLL_SECONDS
+    return min(max((run_at - datetime.utcnow()).total_seconds(), 0), JOB_POLL_SECONDS)
+
+def job_counts(db: Session) -> dict:
+    """Number of queued jobs by kind and status"""
+    counts = {}
+    for kind, status, count in db.execute(select(Job.kind, Job.status, func.count()).group_by(Job.kind, Job.status)):
+        counts.setdefault(kind, {})[status] = count
+    return counts
+
+def retry_failed(db: Session) -> int:
+    """Queue every failed job again with a fresh set of attempts"""
+    result = db.execute(
+        update(Job).where(Job.status == "failed")
+        .values(status="pending", attempts=0, run_at=datetime.utcnow())
+    )
+    db.info["jobs_enqueued"] = True
+    db.commit()
+    return result.rowcount
+
+class JobQueue:
+    """Worker tasks running due jobs until stopped"""
+
+    def __init__(self):
+        self._loop = None
+        self._wakeup = None
+        self._tasks = []
+
+    def start(self, loop: asyncio.AbstractEventLoop, workers: int = JOB_WORKERS):
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._work()) for _ in range(workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._loop = None
+
+    def wake(self):
+        """Tell idle workers new jobs are due; callable from any thread"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The loop closed while the server was shutting down
+            pass
+
+    async def _work(self):
+        while True:
+            try:
+                claimed = await run_in_threadpool(run_due_jobs)
+                if claimed:
+                    continue
+                idle = await run_in_threadpool(seconds_until_due)
+            except Exception as e:
+                print(f"ERROR running jobs: {e}")
+                idle = JOB_POLL_SECONDS
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), idle)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+job_queue = JobQueue()
@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 
 # Get project root directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,7 +11,14 @@ sys.path.insert(0, BASE_DIR)
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import init_db
+from fastapi.responses import PlainTextResponse
+from backend.database import init_db, async_engine, SessionLocal
+from backend.metrics import MetricsMiddleware, render_prometheus
+from backend import analytics, invalidation, overdue, schedules
+from backend.events import event_hub
+from backend.jobs import job_queue
+from backend.sync import table_versions
+from backend.technicians import migrate_legacy_members
 from backend.routes import router
 
 app = FastAPI(title="GearGuard Maintenance Management System")
@@ -22,24 +30,77 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Per-route timing and SQL query counts, served at /api/metrics
+app.add_middleware(MetricsMiddleware)
+
+# Seconds browsers may reuse static files before revalidating them
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles (which already answers If-None-Match) plus a Cache-Control header"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}"
+        return response
+
 # Mount static files with absolute path
 static_dir = os.path.join(BASE_DIR, "frontend", "static")
 if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 else:
     print(f"WARNING: Static directory not found at {static_dir}")
 
 # Include routes
 app.include_router(router)
 
+# Set for the worker processes of run.py --production (directly in the
+# forked workers, through the environment in spawned ones): the launcher has
+# prepared the database and runs the periodic tasks, workers only serve
+MANAGED_WORKER_ENV = "GEARGUARD_MANAGED_WORKER"
+MANAGED_WORKER = os.getenv(MANAGED_WORKER_ENV) == "1"
+
+def prepare_database():
+    """Create or migrate the schema and flag requests that became overdue while stopped"""
+    init_db()
+    db = SessionLocal()
+    try:
+        migrated = migrate_legacy_members(db)
+        flipped = overdue.rollover_overdue(db)
+    finally:
+        db.close()
+    print("✓ Database initialized successfully!")
+    if migrated["team_members"] or migrated["requests"]:
+        print(f"✓ Technicians: linked {migrated['team_members']} team member(s) and {migrated['requests']} request(s)")
+    print(f"✓ Overdue rollover: {flipped} request(s) newly overdue")
+
+def periodic_tasks() -> list:
+    """Coroutines of the maintenance loops that run once per deployment"""
+    return [overdue.daily_rollover(), schedules.pm_scheduler(), analytics.rollup_refresher()]
+
 @app.on_event("startup")
 async def startup_event():
     try:
-        init_db()
+        app.state.tasks = []
+        if not MANAGED_WORKER:
+            prepare_database()
+            app.state.tasks += [asyncio.create_task(task) for task in periodic_tasks()]
+        db = SessionLocal()
+        try:
+            # ETags are served from memory from here on
+            table_versions.load(db)
+        finally:
+            db.close()
+        event_hub.start(asyncio.get_running_loop())
+        # Jobs left queued by the previous run are picked up right away
+        job_queue.start(asyncio.get_running_loop())
+        # Only the workers of run.py --production share the database with other servers
+        if MANAGED_WORKER and invalidation.CACHE_SYNC_INTERVAL_MS > 0:
+            app.state.tasks.append(asyncio.create_task(invalidation.watch_changes()))
         templates_dir = os.path.join(BASE_DIR, "frontend", "templates")
-        print("✓ Database initialized successfully!")
         print(f"✓ Project root: {BASE_DIR}")
         print(f"✓ Static files: {static_dir if os.path.exists(static_dir) else 'NOT FOUND'}")
         print(f"✓ Templates: {templates_dir if os.path.exists(templates_dir) else 'NOT FOUND'}")
@@ -47,11 +108,26 @@ async def startup_event():
         print(f"ERROR during startup: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in app.state.tasks:
+        task.cancel()
+    job_queue.stop()
+    # Ends open event streams so the server does not wait on them
+    event_hub.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 @app.get("/api/health")
 def health_check():
     return {"status": "ok", "message": "GearGuard API is running"}
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request and SQL metrics in Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_graceful_shutdown=5)
 
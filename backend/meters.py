@@ -0,0 +1,273 @@
+"""
+Equipment meter and sensor readings
+
+Readings arrive in batches (JSON Lines or CSV, thousands of points per
+call) and are stored in meter_readings, a WITHOUT ROWID table clustered on
+(equipment, meter, ts): every series is contiguous and new readings extend
+it at the end. Readings already stored are ignored, so a client can safely
+resend a batch.
+
+Each batch also recomputes the hourly rollups (meter_hourly_stats) of the
+hours it touched from the stored readings, so duplicates and late arrivals
+never skew them, and checks its readings against the meter rules of their
+equipment: the first reading outside a rule's limits opens a Corrective
+request, unless one opened by the rule is still open. Each rule remembers
+the newest reading it has checked, so resent or late readings never open
+requests.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+from backend.models import Equipment, MaintenanceRequest, MeterHourlyStat, MeterReading, MeterRule, OPEN_STATUSES
+from backend import bulk
+
+# Readings validated and stored per transaction
+METER_BATCH_SIZE = int(os.getenv("METER_BATCH_SIZE", "5000"))
+# Most points one series query returns
+MAX_SERIES_POINTS = 10000
+SERIES_RESOLUTIONS = ("raw", "hour", "day")
+
+def naive_utc(ts: datetime) -> datetime:
+    """ts in UTC without tzinfo, the way timestamps are stored (naive ones are taken as UTC)"""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def parse_timestamp(value) -> datetime:
+    """Naive UTC datetime from an ISO 8601 string or a Unix timestamp; now when missing"""
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromtimestamp(float(value), timezone.utc)
+        except ValueError:
+            ts = datetime.fromisoformat(value)
+        return naive_utc(ts)
+    raise ValueError("ts must be an ISO 8601 string or a Unix timestamp")
+
+def parse_reading(row: dict, equipment_id: Optional[int]):
+    """(equipment_id, meter, ts, value) of an uploaded row; raises ValueError with the reason"""
+    equipment = row.get("equipment_id", equipment_id)
+    if equipment is None:
+        raise ValueError("equipment_id is required")
+    try:
+        equipment = int(equipment)
+    except (TypeError, ValueError):
+        raise ValueError("equipment_id must be an integer")
+    meter = row.get("meter")
+    if not isinstance(meter, str) or not meter.strip():
+        raise ValueError("meter is required")
+    try:
+        value = float(row["value"])
+    except KeyError:
+        raise ValueError("value is required")
+    except (TypeError, ValueError):
+        raise ValueError("value must be a number")
+    if not math.isfinite(value):
+        raise ValueError("value must be finite")
+    try:
+        ts = parse_timestamp(row.get("ts"))
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("ts must be an ISO 8601 string or a Unix timestamp")
+    return equipment, meter.strip(), ts, value
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+# Recompute the hourly rollups of one series between :start and :end
+_hour_of_reading = func.strftime("%Y-%m-%d %H:00:00.000000", MeterReading.ts)
+REFRESH_HOURLY_STATS = insert(MeterHourlyStat.__table__).prefix_with("OR REPLACE", dialect="sqlite").from_select(
+    ["equipment_id", "meter", "hour", "count", "min_value", "max_value", "sum_value"],
+    select(
+        MeterReading.equipment_id, MeterReading.meter, _hour_of_reading,
+        func.count(), func.min(MeterReading.value), func.max(MeterReading.value), func.sum(MeterReading.value)
+    ).where(
+        MeterReading.equipment_id == bindparam("series_equipment_id"),
+        MeterReading.meter == bindparam("series_meter"),
+        MeterReading.ts >= bindparam("start"),
+        MeterReading.ts < bindparam("end")
+    ).group_by(_hour_of_reading)
+)
+
+def breaches(rule: MeterRule, value: float) -> Optional[str]:
+    if rule.max_value is not None and value > rule.max_value:
+        return f"above the maximum of {rule.max_value:g}"
+    if rule.min_value is not None and value < rule.min_value:
+        return f"below the minimum of {rule.min_value:g}"
+    return None
+
+def check_rules(db: Session, rows: list, equipment: dict) -> list:
+    """Open a Corrective request for every rule the readings breach; returns the new requests"""
+    series = {}
+    for row in rows:
+        series.setdefault((row["equipment_id"], row["meter"]), []).append(row)
+    rules = [
+        rule for rule in db.query(MeterRule).filter(MeterRule.equipment_id.in_({key[0] for key in series}))
+        if (rule.equipment_id, rule.meter) in series and not equipment[rule.equipment_id].is_scrapped
+    ]
+    if not rules:
+        return []
+    open_rules = set(db.execute(
+        select(MaintenanceRequest.meter_rule_id).where(
+            MaintenanceRequest.meter_rule_id.in_([rule.id for rule in rules]),
+            MaintenanceRequest.status.in_(OPEN_STATUSES)
+        )
+    ).scalars())
+
+    opened = []
+    for rule in rules:
+        readings = series[rule.equipment_id, rule.meter]
+        checked_through = rule.checked_through
+        rule.checked_through = max([row["ts"] for row in readings] + ([checked_through] if checked_through else []))
+        if rule.id in open_rules:
+            continue
+        for row in sorted(readings, key=lambda row: row["ts"]):
+            if checked_through is not None and row["ts"] <= checked_through:
+                continue
+            reason = breaches(rule, row["value"])
+            if reason is None:
+                continue
+            eq = equipment[rule.equipment_id]
+            # Added through the ORM, so the flush hooks version, index and publish it
+            request = MaintenanceRequest(
+                title=f"{rule.meter} out of range on {eq.name}",
+                description=f"Reading {row['value']:g} at {row['ts']:%Y-%m-%d %H:%M} UTC is {reason}",
+                equipment_id=eq.id,
+                team_id=eq.maintenance_team_id,
+                request_type="Corrective",
+                scheduled_date=date.today(),
+                meter_rule_id=rule.id
+            )
+            db.add(request)
+            opened.append(request)
+            break
+    return opened
+
+def _add_error(report: dict, line: int, message: str):
+    report["failed"] += 1
+    if len(report["errors"]) < bulk.MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line, "error": message})
+
+def ingest_batch(db: Session, batch: list, report: dict, equipment_id: Optional[int]):
+    """Validate and store one batch of readings in a single transaction"""
+    readings = {}
+    for line, data, error in batch:
+        if error is None:
+            try:
+                key = parse_reading(data, equipment_id)
+            except ValueError as e:
+                error = str(e)
+        if error:
+            _add_error(report, line, error)
+            continue
+        # The last of several readings for the same instant wins
+        readings[key[:3]] = (line, key[3])
+    if not readings:
+        return
+
+    equipment = {
+        eq.id: eq for eq in db.execute(
+            select(Equipment.id, Equipment.name, Equipment.maintenance_team_id, Equipment.is_scrapped)
+            .where(Equipment.id.in_({key[0] for key in readings}))
+        )
+    }
+    rows = []
+    for (equipment_id_, meter, ts), (line, value) in readings.items():
+        if equipment_id_ not in equipment:
+            _add_error(report, line, "Equipment not found")
+            continue
+        rows.append({"equipment_id": equipment_id_, "meter": meter, "ts": ts, "value": value})
+    if not rows:
+        return
+
+    inserted = db.execute(insert(MeterReading.__table__).prefix_with("OR IGNORE", dialect="sqlite"), rows).rowcount
+    spans = {}
+    for row in rows:
+        key = (row["equipment_id"], row["meter"])
+        first, last = spans.get(key, (row["ts"], row["ts"]))
+        spans[key] = (min(first, row["ts"]), max(last, row["ts"]))
+    db.execute(REFRESH_HOURLY_STATS, [
+        {"series_equipment_id": key[0], "series_meter": key[1], "start": _hour(first), "end": _hour(last) + timedelta(hours=1)}
+        for key, (first, last) in spans.items()
+    ])
+    opened = check_rules(db, rows, equipment)
+    db.commit()
+    report["inserted"] += inserted
+    report["duplicates"] += len(rows) - inserted
+    report["requests_opened"].extend(request.id for request in opened)
+
+def ingest(db: Session, upload, fmt: str, equipment_id: Optional[int] = None) -> dict:
+    """Store every reading of an upload, METER_BATCH_SIZE readings per transaction"""
+    report = {"inserted": 0, "duplicates": 0, "failed": 0, "errors": [], "requests_opened": []}
+    for batch in bulk.batched(bulk.read_rows(upload, fmt), METER_BATCH_SIZE):
+        ingest_batch(db, batch, report, equipment_id)
+    report["errors"].sort(key=lambda error: error["line"])
+    return report
+
+def series(db: Session, equipment_id: int, meter: str, start: datetime, end: datetime, resolution: str, limit: int) -> list:
+    """Points of one series in [start, end), oldest first: raw readings or hourly/daily rollups"""
+    if resolution not in SERIES_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid resolution. Allowed: {', '.join(SERIES_RESOLUTIONS)}")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if resolution == "raw":
+        rows = db.execute(
+            select(MeterReading.ts, MeterReading.value).where(
+                MeterReading.equipment_id == equipment_id, MeterReading.meter == meter,
+                MeterReading.ts >= start, MeterReading.ts < end
+            ).order_by(MeterReading.ts).limit(limit)
+        ).all()
+        return [{"ts": ts.isoformat(), "value": value} for ts, value in rows]
+
+    stats = MeterHourlyStat
+    in_range = and_(
+        stats.equipment_id == equipment_id, stats.meter == meter, stats.hour >= _hour(start), stats.hour < end
+    )
+    if resolution == "hour":
+        rows = db.execute(
+            select(stats.hour, stats.count, stats.min_value, stats.max_value, stats.sum_value)
+            .where(in_range).order_by(stats.hour).limit(limit)
+        ).all()
+        points = [(hour.isoformat(), *values) for hour, *values in rows]
+    else:
+        day = func.date(stats.hour)
+        rows = db.execute(
+            select(day, func.sum(stats.count), func.min(stats.min_value), func.max(stats.max_value), func.sum(stats.sum_value))
+            .where(in_range).group_by(day).order_by(day).limit(limit)
+        ).all()
+        points = [(f"{day_}T00:00:00", *values) for day_, *values in rows]
+    return [
+        {"ts": ts, "count": count, "min": min_value, "max": max_value, "avg": sum_value / count}
+        for ts, count, min_value, max_value, sum_value in points
+    ]
+
+def latest_readings(db: Session, equipment_id: int) -> list:
+    """Latest reading of every meter of a piece of equipment"""
+    latest = select(
+        MeterReading.meter, func.max(MeterReading.ts).label("ts")
+    ).where(MeterReading.equipment_id == equipment_id).group_by(MeterReading.meter).subquery()
+    rows = db.execute(
+        select(latest.c.meter, latest.c.ts, MeterReading.value).join(
+            MeterReading, and_(
+                MeterReading.equipment_id == equipment_id, MeterReading.meter == latest.c.meter,
+                MeterReading.ts == latest.c.ts
+            )
+        ).order_by(latest.c.meter)
+    ).all()
+    return [{"meter": meter, "ts": ts.isoformat(), "value": value} for meter, ts, value in rows]
+
+def delete_equipment_meters(db: Session, equipment_id: int):
+    """Delete the readings, hourly rollups and rules of a piece of equipment, in the caller's transaction"""
+    for model in (MeterReading, MeterHourlyStat, MeterRule):
+        db.execute(delete(model).where(model.equipment_id == equipment_id))
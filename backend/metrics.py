@@ -0,0 +1,218 @@
+"""
+Per-route request and SQL instrumentation
+
+MetricsMiddleware opens a RequestStats for every HTTP request and keeps it in
+a context variable; the engine hooks installed by instrument_engine() add
+each statement's count and duration to it. When the response has been sent,
+the totals are recorded per (method, route template) and exposed in
+Prometheus text format by render_prometheus(). Two durations are kept: the
+whole request, and the handler's share up to the start of the response,
+which leaves out sending the body (all of a streamed listing's rows).
+
+Statements slower than SLOW_QUERY_MS are logged together with their
+EXPLAIN QUERY PLAN on SQLite.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from sqlalchemy import event
+
+# Log statements slower than this many milliseconds (0 disables slow query logging)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1").lower() in ("1", "true", "yes")
+
+# Upper bounds of the request and handler duration histograms, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statement prefixes that have a query plan worth logging
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+logger = logging.getLogger("gearguard.sql")
+
+class RequestStats:
+    """SQL work done on behalf of one HTTP request"""
+    __slots__ = ("queries", "sql_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+_current_request = contextvars.ContextVar("gearguard_request_stats", default=None)
+
+def _observe(buckets: list, value: float):
+    for i, bound in enumerate(DURATION_BUCKETS):
+        if value <= bound:
+            buckets[i] += 1
+
+class RouteMetrics:
+    """Running totals for one (method, route) pair"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.duration_sum = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.handler_sum = 0.0
+        self.handler_buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.slow_queries = 0
+
+    def record(self, method: str, route: str, status: int, duration: float, handler_duration: float,
+               stats: RequestStats, response_bytes: int):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.duration_sum += duration
+            _observe(metrics.duration_buckets, duration)
+            metrics.handler_sum += handler_duration
+            _observe(metrics.handler_buckets, handler_duration)
+            metrics.queries += stats.queries
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.response_bytes += response_bytes
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def snapshot(self):
+        with self._lock:
+            routes = {
+                key: (
+                    dict(m.statuses), m.duration_sum, list(m.duration_buckets), m.queries, m.sql_seconds,
+                    m.response_bytes, m.handler_sum, list(m.handler_buckets)
+                )
+                for key, m in self._routes.items()
+            }
+            return routes, self.slow_queries
+
+registry = MetricsRegistry()
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def render_prometheus() -> str:
+    """All collected metrics in the Prometheus text exposition format"""
+    routes, slow_queries = registry.snapshot()
+    lines = [
+        "# HELP gearguard_http_requests_total HTTP requests handled, by route and status.",
+        "# TYPE gearguard_http_requests_total counter",
+    ]
+    for (method, route), (statuses, *_rest) in sorted(routes.items()):
+        for status, count in sorted(statuses.items()):
+            lines.append(f"gearguard_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    for name, index, help_text in (
+        ("gearguard_http_request_duration_seconds", 1, "Time from receiving a request to sending the last response byte."),
+        ("gearguard_http_handler_duration_seconds", 6, "Time from receiving a request to starting the response, without sending the body."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route), values in sorted(routes.items()):
+            total = sum(values[0].values())
+            duration_sum, buckets = values[index], values[index + 1]
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {count}")
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {total}")
+            lines.append(f"{name}_sum{_labels(method=method, route=route)} {duration_sum:.6f}")
+            lines.append(f"{name}_count{_labels(method=method, route=route)} {total}")
+
+    for name, index, help_text, fmt in (
+        ("gearguard_sql_queries_total", 3, "SQL statements executed while handling requests.", "{}"),
+        ("gearguard_sql_duration_seconds_total", 4, "Time spent executing SQL statements while handling requests.", "{:.6f}"),
+        ("gearguard_http_response_bytes_total", 5, "Response body bytes sent.", "{}"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (method, route), values in sorted(routes.items()):
+            lines.append(f"{name}{_labels(method=method, route=route)} {fmt.format(values[index])}")
+
+    lines += [
+        f"# HELP gearguard_slow_queries_total SQL statements slower than SLOW_QUERY_MS ({SLOW_QUERY_MS:g} ms).",
+        "# TYPE gearguard_slow_queries_total counter",
+        f"gearguard_slow_queries_total {slow_queries}",
+    ]
+    return "\n".join(lines) + "\n"
+
+def _explain(conn, statement, parameters) -> str:
+    """EXPLAIN QUERY PLAN of a statement on its own raw connection (SQLite only)"""
+    if conn.dialect.name != "sqlite":
+        return ""
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+            return "\n".join(f"  {row[-1]}" for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"  (EXPLAIN failed: {e})"
+
+def instrument_engine(engine):
+    """Attach query counting, timing and slow query logging to a sync engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            registry.record_slow_query()
+            plan = ""
+            if SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+                plan = "\n" + _explain(conn, statement, parameters)
+            logger.warning("Slow query (%.1f ms): %s%s", elapsed * 1000, statement, plan)
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route timing, SQL work and response size"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+        response_bytes = 0
+        handler_end = None
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes, handler_end
+            if message["type"] == "http.response.start":
+                handler_end = time.perf_counter()
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            # Route template for API routes, mount point (e.g. /static) for mounts
+            route_path = getattr(scope.get("route"), "path", None) or scope.get("root_path") or "unmatched"
+            end = time.perf_counter()
+            registry.record(
+                scope["method"], route_path, status, end - start, (handler_end or end) - start, stats, response_bytes
+            )
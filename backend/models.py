@@ -4,22 +4,42 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, ForeignKey, Text, Index, Table, false, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 import enum
 from backend.database import Base
 
+# Team membership; the technician_id index serves "teams of a technician"
+team_members = Table(
+    "team_members",
+    Base.metadata,
+    Column("team_id", Integer, ForeignKey("maintenance_teams.id", ondelete="CASCADE"), primary_key=True),
+    Column("technician_id", Integer, ForeignKey("technicians.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
 class MaintenanceTeam(Base):
     __tablename__ = "maintenance_teams"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
-    members = Column(Text)  # Comma-separated list of technicians
+    members = Column(Text)  # Comma-separated technician names as entered; team_members is derived from it
     
     # Relationships
     equipment = relationship("Equipment", back_populates="team")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="team")
+    technicians = relationship("Technician", secondary=team_members, back_populates="teams")
+
+class Technician(Base):
+    __tablename__ = "technicians"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    skills = Column(Text)  # Comma-separated skill tags, matched against required_skills
+    
+    # Relationships
+    teams = relationship("MaintenanceTeam", secondary=team_members, back_populates="technicians")
+    maintenance_requests = relationship("MaintenanceRequest", back_populates="assigned_technician")
 
 class Equipment(Base):
     __tablename__ = "equipment"
@@ -31,12 +51,13 @@ class Equipment(Base):
     location = Column(String, nullable=False)
     purchase_date = Column(Date, nullable=False)
     warranty_expiry = Column(Date)
-    maintenance_team_id = Column(Integer, ForeignKey("maintenance_teams.id"), nullable=False)
+    maintenance_team_id = Column(Integer, ForeignKey("maintenance_teams.id"), nullable=False, index=True)
     is_scrapped = Column(Boolean, default=False)
     
     # Relationships
     team = relationship("MaintenanceTeam", back_populates="equipment")
     maintenance_requests = relationship("MaintenanceRequest", back_populates="equipment", cascade="all, delete-orphan")
+    maintenance_schedules = relationship("MaintenanceSchedule", back_populates="equipment", cascade="all, delete-orphan")
 
 class RequestType(str, enum.Enum):
     CORRECTIVE = "Corrective"
@@ -48,22 +69,207 @@ class RequestStatus(str, enum.Enum):
     REPAIRED = "Repaired"
     SCRAP = "Scrap"
 
+# Statuses that close a request; closed requests are never overdue
+CLOSED_STATUSES = ["Repaired", "Scrap"]
+OPEN_STATUSES = ["New", "In Progress"]
+# Open requests as literal SQL: SQLite only uses a partial index when the query
+# repeats its WHERE terms, and a bound parameter never matches a literal
+OPEN_REQUEST_SQL = "status NOT IN ('Repaired', 'Scrap')"
+
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
+    # Composite indexes backing the list filters and keyset sort orders.
+    # SQLite appends the rowid (id) to every index, so each one also serves
+    # "filter by prefix, page by id" without listing id explicitly.
+    __table_args__ = (
+        Index("ix_maintenance_requests_status_scheduled", "status", "scheduled_date"),
+        Index("ix_maintenance_requests_team_status", "team_id", "status"),
+        Index("ix_maintenance_requests_type_scheduled", "request_type", "scheduled_date"),
+        Index("ix_maintenance_requests_scheduled_date", "scheduled_date"),
+        Index("ix_maintenance_requests_created_at", "created_at"),
+        Index("ix_maintenance_requests_completed_at", "completed_at"),
+        # Technician workload: open requests of one technician, with the
+        # hours summed straight from the index
+        Index("ix_maintenance_requests_technician_status", "technician_id", "status", "duration"),
+        # One generated request per schedule and day; makes PM generation idempotent
+        Index("ux_maintenance_requests_schedule_date", "schedule_id", "scheduled_date", unique=True),
+        # Partial indexes for overdue tracking (backend/overdue.py): open
+        # requests by date for the daily rollover, flagged ones for reads
+        Index(
+            "ix_maintenance_requests_open_scheduled", "scheduled_date",
+            sqlite_where=text(OPEN_REQUEST_SQL), postgresql_where=text(OPEN_REQUEST_SQL)
+        ),
+        Index(
+            "ix_maintenance_requests_overdue", "scheduled_date",
+            sqlite_where=text("is_overdue = 1"), postgresql_where=text("is_overdue")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text)
-    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
     team_id = Column(Integer, ForeignKey("maintenance_teams.id"), nullable=False)
-    technician = Column(String)
+    technician = Column(String)  # Technician name as entered
+    technician_id = Column(Integer, ForeignKey("technicians.id"))  # Resolved from technician, see backend/technicians.py
+    required_skills = Column(Text)  # Comma-separated skill tags the assigned technician needs
     request_type = Column(String, nullable=False)  # Corrective or Preventive
     status = Column(String, nullable=False, default="New")  # New, In Progress, Repaired, Scrap
     scheduled_date = Column(Date)
     duration = Column(Integer)  # Duration in hours
     created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)  # When the request was closed (Repaired or Scrap), see backend/analytics.py
+    row_version = Column(Integer, index=True)  # Change version of the last write, see backend/sync.py
+    is_overdue = Column(Boolean, nullable=False, default=False, server_default=false())  # Maintained by backend/overdue.py
+    schedule_id = Column(Integer, ForeignKey("maintenance_schedules.id"))  # Set on requests generated by a PM schedule
+    meter_rule_id = Column(Integer, ForeignKey("meter_rules.id"), index=True)  # Set on requests opened by a meter rule
     
     # Relationships
     equipment = relationship("Equipment", back_populates="maintenance_requests")
     team = relationship("MaintenanceTeam", back_populates="maintenance_requests")
+    assigned_technician = relationship("Technician", back_populates="maintenance_requests")
+
+
+class ChangeVersion(Base):
+    """Monotonic write counter per table, used for incremental sync"""
+    __tablename__ = "change_versions"
+    
+    name = Column(String, primary_key=True)  # Table name
+    version = Column(Integer, nullable=False, default=0)
+
+class RequestTombstone(Base):
+    """Marker left behind by a deleted maintenance request so sync clients can drop it"""
+    __tablename__ = "request_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    request_id = Column(Integer, nullable=False)
+    team_id = Column(Integer)
+    row_version = Column(Integer, nullable=False, index=True)
+
+class RequestEvent(Base):
+    """Append-only log of changes to a request's status, technician and scheduled date, see backend/history.py"""
+    __tablename__ = "request_events"
+    __table_args__ = (
+        Index("ix_request_events_request_ts", "request_id", "ts"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    request_id = Column(Integer, nullable=False)  # No foreign key: history outlives deleted requests
+    ts = Column(DateTime, nullable=False)
+    field = Column(String, nullable=False)
+    old_value = Column(String)
+    new_value = Column(String)
+
+class IntervalUnit(str, enum.Enum):
+    DAYS = "days"
+    WEEKS = "weeks"
+    MONTHS = "months"
+    HOURS = "hours"  # Operating hours, projected with usage_hours_per_day
+
+class MaintenanceSchedule(Base):
+    """Recurring preventive maintenance for one piece of equipment, see backend/schedules.py"""
+    __tablename__ = "maintenance_schedules"
+    # Schedules with occurrences inside the horizon, in due order
+    __table_args__ = (
+        Index("ix_maintenance_schedules_active_next_due", "is_active", "next_due_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    technician = Column(String)
+    duration = Column(Integer)  # Duration of each generated request in hours
+    interval_value = Column(Integer, nullable=False)
+    interval_unit = Column(String, nullable=False)  # days, weeks, months or hours
+    usage_hours_per_day = Column(Float)  # Expected operating hours per day, for hour intervals
+    start_date = Column(Date, nullable=False)  # First occurrence
+    generated_count = Column(Integer, nullable=False, default=0)  # Occurrences materialized so far
+    next_due_date = Column(Date, nullable=False)  # Date of occurrence number generated_count
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    equipment = relationship("Equipment", back_populates="maintenance_schedules")
+
+class AnalyticsDailyStat(Base):
+    """Request counts and hours per day, asset, team and request type, see backend/analytics.py"""
+    __tablename__ = "analytics_daily_stats"
+    # Clustered on the key, so day range scans read the values without a second lookup
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    day = Column(Date, primary_key=True)
+    equipment_id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, primary_key=True)
+    request_type = Column(String, primary_key=True)
+    requests = Column(Integer, nullable=False, default=0)  # Requests created that day
+    completed = Column(Integer, nullable=False, default=0)  # Requests repaired that day
+    repair_hours = Column(Float, nullable=False, default=0)  # Hours from creation to repair, summed over completed
+    labor_hours = Column(Integer, nullable=False, default=0)  # Duration summed over completed
+
+class AnalyticsDirtyDay(Base):
+    """Day whose rolled-up stats are outdated by a write to an older request"""
+    __tablename__ = "analytics_dirty_days"
+    
+    day = Column(Date, primary_key=True)
+
+class AnalyticsRollupState(Base):
+    """Single row: the last day analytics_daily_stats covers"""
+    __tablename__ = "analytics_rollup_state"
+    
+    id = Column(Integer, primary_key=True)
+    rolled_through = Column(Date, nullable=False)
 
+class MeterReading(Base):
+    """One sensor or meter reading of a piece of equipment, see backend/meters.py"""
+    __tablename__ = "meter_readings"
+    # Clustered on (equipment, meter, time): a series is stored contiguously
+    # and appending readings extends it at the end
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    equipment_id = Column(Integer, primary_key=True)
+    meter = Column(String, primary_key=True)
+    ts = Column(DateTime, primary_key=True)
+    value = Column(Float, nullable=False)
+
+class MeterHourlyStat(Base):
+    """Readings of one meter downsampled to an hour"""
+    __tablename__ = "meter_hourly_stats"
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    equipment_id = Column(Integer, primary_key=True)
+    meter = Column(String, primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_value = Column(Float, nullable=False)
+
+class MeterRule(Base):
+    """Limits on a meter; a reading outside them opens a corrective request"""
+    __tablename__ = "meter_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=False, index=True)
+    meter = Column(String, nullable=False)
+    min_value = Column(Float)
+    max_value = Column(Float)
+    checked_through = Column(DateTime)  # Time of the newest reading checked against the rule
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Job(Base):
+    """Queued background job, see backend/jobs.py"""
+    __tablename__ = "jobs"
+    # Due pending jobs, in the order workers claim them
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String, nullable=False, default="pending", server_default="pending")  # pending or failed
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    run_at = Column(DateTime, nullable=False)  # Due time, or end of the lease while running
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
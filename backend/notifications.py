@@ -0,0 +1,44 @@
+"""
+Webhook notifications of request changes
+
+When NOTIFY_WEBHOOK_URL is set, every transaction that changes the status,
+technician or scheduled date of requests queues one "notify" job with
+those changes (the rows it adds to request_events). A worker posts the
+changes of up to JOB_BATCH_SIZE queued jobs as one JSON document:
+
+    {"changes": [{"request_id": 1, "ts": "...", "field": "status", "old_value": "New", "new_value": "In Progress"}]}
+
+While the endpoint fails or is unreachable the job queue retries with
+backoff, so nothing is lost and no client request waits for the webhook.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import urllib.request
+from sqlalchemy.orm import Session
+from backend import jobs
+
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL", "")
+NOTIFY_TIMEOUT_SECONDS = 10
+
+def queue_notifications(db: Session, rows: list):
+    """Queue request_events rows for the webhook, in the session's transaction"""
+    if NOTIFY_WEBHOOK_URL and rows:
+        jobs.enqueue(db, "notify", {"changes": [{**row, "ts": row["ts"].isoformat()} for row in rows]})
+
+@jobs.job_handler("notify")
+def post_notifications(db: Session, payloads: list):
+    changes = [change for payload in payloads for change in payload["changes"]]
+    request = urllib.request.Request(
+        NOTIFY_WEBHOOK_URL,
+        data=json.dumps({"changes": changes}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    # Error statuses raise, which leaves the jobs queued for a retry
+    with urllib.request.urlopen(request, timeout=NOTIFY_TIMEOUT_SECONDS) as response:
+        response.read()
@@ -0,0 +1,92 @@
+"""
+Materialized overdue tracking
+
+MaintenanceRequest.is_overdue is kept up to date instead of being computed
+on every read: each flush recomputes it for the requests it writes, and a
+daily rollover flips open requests whose scheduled date has just passed.
+Reads then filter on the flag, which the partial index
+ix_maintenance_requests_overdue answers without touching closed or future
+requests.
+
+Core inserts and updates set it through sync.stamp_bulk_rows.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select, text, update
+from sqlalchemy.orm import Session
+from backend.cache import dashboard_cache
+from backend.database import SessionLocal
+from backend.events import event_hub
+from backend.models import MaintenanceRequest, CLOSED_STATUSES, OPEN_REQUEST_SQL
+from backend.sync import next_version
+
+def is_overdue_on(status: str, scheduled_date: Optional[date], today: date) -> bool:
+    """Whether a request with this status and date is overdue on a given day"""
+    return scheduled_date is not None and status not in CLOSED_STATUSES and scheduled_date < today
+
+def overdue_condition():
+    """SQL condition matching flagged requests, served by the overdue partial index"""
+    return MaintenanceRequest.is_overdue == True
+
+@event.listens_for(Session, "before_flush")
+def track_overdue(session, flush_context, instances):
+    """Recompute is_overdue for maintenance requests written in this flush"""
+    today = date.today()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, MaintenanceRequest):
+            obj.is_overdue = is_overdue_on(obj.status or "New", obj.scheduled_date, today)
+
+def rollover_overdue(db: Session, today: Optional[date] = None) -> int:
+    """Flag open requests that became overdue by today; returns how many flipped.
+
+    Walks ix_maintenance_requests_open_scheduled, so the cost depends on the
+    number of open past-due requests rather than the size of the table. The
+    flipped rows get a new change version so incremental sync clients see them.
+    """
+    today = today or date.today()
+    newly_overdue = (
+        text(OPEN_REQUEST_SQL),
+        MaintenanceRequest.scheduled_date < today,
+        MaintenanceRequest.is_overdue == False,
+    )
+    if db.execute(select(MaintenanceRequest.id).where(*newly_overdue).limit(1)).first() is None:
+        return 0
+    version = next_version(db, MaintenanceRequest.__tablename__)
+    result = db.execute(
+        update(MaintenanceRequest).where(*newly_overdue).values(is_overdue=True, row_version=version)
+    )
+    db.commit()
+    return result.rowcount
+
+def run_rollover() -> int:
+    db = SessionLocal()
+    try:
+        return rollover_overdue(db)
+    finally:
+        db.close()
+
+def seconds_until_midnight(now: Optional[datetime] = None) -> float:
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+async def daily_rollover():
+    """Run the rollover just after every local midnight until cancelled"""
+    while True:
+        await asyncio.sleep(seconds_until_midnight() + 1)
+        try:
+            flipped = await run_in_threadpool(run_rollover)
+        except Exception as e:
+            print(f"ERROR during overdue rollover: {e}")
+            continue
+        if flipped:
+            dashboard_cache.invalidate()
+            event_hub.publish_reload("maintenance_request")
@@ -0,0 +1,102 @@
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+from datetime import datetime, date
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Header carrying the cursor of the next page on list responses
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_column):
+    """Decode a cursor back into (sort value, id), typed for sort_column"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None:
+            python_type = sort_column.type.python_type
+            if python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+            elif python_type is date:
+                sort_value = date.fromisoformat(sort_value)
+            else:
+                sort_value = python_type(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(sort_column, id_column, sort_value, row_id: int, descending: bool):
+    """Condition selecting the rows strictly after (sort_value, row_id).
+
+    SQLite sorts NULLs first ascending and last descending, so rows with a
+    NULL sort value are handled as their own block at that end.
+    """
+    if sort_column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+    if sort_value is None:
+        if descending:
+            return and_(sort_column.is_(None), id_column < row_id)
+        return or_(
+            and_(sort_column.is_(None), id_column > row_id),
+            sort_column.isnot(None),
+        )
+    if descending:
+        return or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id),
+            sort_column.is_(None),
+        )
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > row_id),
+    )
+
+def keyset_order(query, sort_column, id_column, cursor: Optional[str], descending: bool = False):
+    """Order a Query or select() by (sort_column, id) starting after cursor"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        query = query.filter(keyset_filter(sort_column, id_column, sort_value, row_id, descending))
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+def paginate(query, sort_column, id_column, key, cursor: Optional[str], limit: int, descending: bool = False):
+    """Apply keyset pagination to query.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    key(row) must return the (sort value, id) of a result row, which lets
+    callers paginate queries returning tuples as well as entities.
+    """
+    query = keyset_order(query, sort_column, id_column, cursor, descending)
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+def resolve_sort(sort: str, order: str, allowed: dict):
+    """Map the sort/order query parameters onto a column and direction"""
+    if sort not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort field. Allowed: {', '.join(sorted(allowed))}"
+        )
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Invalid order. Allowed: asc, desc")
+    return allowed[sort], order == "desc"
@@ -7,16 +7,34 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Add parent directory to path for imports
 sys.path.insert(0, BASE_DIR)
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, insert, update
 from typing import List, Optional
-from datetime import datetime, date
-from pydantic import BaseModel
-from backend.database import get_db
-from backend.models import Equipment, MaintenanceTeam, MaintenanceRequest
+from datetime import datetime, date, timedelta
+from pydantic import BaseModel, ValidationError
+from backend.database import get_db, db_route
+from backend.models import Equipment, MaintenanceTeam, MaintenanceRequest, MaintenanceSchedule, MeterRule, RequestStatus, RequestEvent, RequestTombstone, Technician, OPEN_STATUSES, team_members
+from backend.overdue import overdue_condition
+from backend.sync import current_version, next_version, stamp_bulk_rows
+from backend.conditional import etag_for
+from backend.technicians import ensure_technicians, set_team_members, technician_id_for
+from backend import schedules
+from backend.assignment import assignment_engine, assign_unassigned, parse_skills, MAX_ASSIGN_BATCH
+from backend import bulk
+from backend.cache import dashboard_cache
+from backend.events import event_hub, queue_events
+from backend.search import search_page
+from backend.history import TRACKED_FIELDS
+from backend import analytics
+from backend import meters
+from backend import jobs
+from backend.pagination import paginate, keyset_order, resolve_sort, NEXT_CURSOR_HEADER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend import streaming
+from backend.serializers import RowSerializer, model_columns
 
 router = APIRouter()
 
@@ -65,6 +83,10 @@ class MaintenanceRequestCreate(BaseModel):
     request_type: str
     scheduled_date: Optional[str] = None
     duration: Optional[int] = None
+    required_skills: Optional[str] = None
+
+class MaintenanceRequestImport(MaintenanceRequestCreate):
+    status: str = "New"
 
 class MaintenanceRequestUpdate(BaseModel):
     title: Optional[str] = None
@@ -74,6 +96,44 @@ class MaintenanceRequestUpdate(BaseModel):
     status: Optional[str] = None
     scheduled_date: Optional[str] = None
     duration: Optional[int] = None
+    required_skills: Optional[str] = None
+
+class MaintenanceRequestBatchItem(BaseModel):
+    id: int
+    status: Optional[str] = None
+    technician: Optional[str] = None
+    scheduled_date: Optional[str] = None
+
+class MaintenanceRequestBatch(BaseModel):
+    updates: List[MaintenanceRequestBatchItem]
+
+class TechnicianUpdate(BaseModel):
+    skills: Optional[str] = None
+
+class MeterRuleCreate(BaseModel):
+    equipment_id: int
+    meter: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+
+class ScheduleCreate(BaseModel):
+    equipment_id: int
+    title: str
+    description: Optional[str] = None
+    technician: Optional[str] = None
+    duration: Optional[int] = None
+    interval_value: int
+    interval_unit: str
+    usage_hours_per_day: Optional[float] = None
+    start_date: Optional[str] = None
+
+# Timing fields are fixed once occurrences exist; recreate the schedule to change them
+class ScheduleUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    technician: Optional[str] = None
+    duration: Optional[int] = None
+    is_active: Optional[bool] = None
 
 # Helper function to parse date
 def parse_date(date_str: Optional[str]) -> Optional[date]:
@@ -84,47 +144,211 @@ def parse_date(date_str: Optional[str]) -> Optional[date]:
             return None
     return None
 
+# Columns the list endpoints may be sorted by
+EQUIPMENT_SORT_FIELDS = {"id": Equipment.id, "name": Equipment.name, "serial_number": Equipment.serial_number}
+TEAM_SORT_FIELDS = {"id": MaintenanceTeam.id, "name": MaintenanceTeam.name}
+TECHNICIAN_SORT_FIELDS = {"id": Technician.id, "name": Technician.name}
+REQUEST_SORT_FIELDS = {
+    "id": MaintenanceRequest.id,
+    "created_at": MaintenanceRequest.created_at,
+    "scheduled_date": MaintenanceRequest.scheduled_date,
+}
+
+# Response objects, see backend/serializers.py
+EQUIPMENT = RowSerializer(**model_columns(
+    Equipment, "id", "name", "serial_number", "department", "location", "purchase_date",
+    "warranty_expiry", "maintenance_team_id", "is_scrapped"
+))
+EQUIPMENT_WITH_COUNT = EQUIPMENT.extend(maintenance_count=func.count(MaintenanceRequest.id))
+REQUEST = RowSerializer(**model_columns(
+    MaintenanceRequest, "id", "title", "description", "equipment_id", "team_id", "technician",
+    "technician_id", "request_type", "status", "scheduled_date", "duration", "required_skills",
+    "created_at", "completed_at", "is_overdue"
+))
+# Calendar entries and Kanban cards: the request fields the views show plus joined names
+CALENDAR_ITEM = RowSerializer(
+    **model_columns(MaintenanceRequest, "id", "title", "description", "equipment_id"),
+    equipment_name=Equipment.name,
+    **model_columns(
+        MaintenanceRequest, "team_id", "technician", "technician_id", "request_type", "status",
+        "scheduled_date", "duration", "created_at", "is_overdue"
+    )
+)
+KANBAN_CARD = RowSerializer(
+    **model_columns(MaintenanceRequest, "id", "title", "description", "equipment_id"),
+    equipment_name=Equipment.name,
+    team_id=MaintenanceRequest.team_id,
+    team_name=MaintenanceTeam.name,
+    **model_columns(
+        MaintenanceRequest, "technician", "technician_id", "request_type", "status",
+        "scheduled_date", "duration", "created_at", "is_overdue"
+    )
+)
+METER_RULE = RowSerializer(**model_columns(
+    MeterRule, "id", "equipment_id", "meter", "min_value", "max_value", "checked_through"
+))
+SCHEDULE = RowSerializer(**model_columns(
+    MaintenanceSchedule, "id", "equipment_id", "title", "description", "technician", "duration",
+    "interval_value", "interval_unit", "usage_hours_per_day", "start_date", "next_due_date",
+    "generated_count", "is_active"
+))
+
+# Equipment with its maintenance request count, fetched in a single statement
+# (outer join + group by, served by the maintenance_requests.equipment_id index)
+def query_equipment_with_counts(db: Session):
+    return EQUIPMENT_WITH_COUNT.query(db).outerjoin(
+        MaintenanceRequest, MaintenanceRequest.equipment_id == Equipment.id
+    ).group_by(Equipment.id)
+
 # Equipment Routes
-@router.get("/api/equipment", response_model=List[dict])
-def get_equipment(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    equipment = db.query(Equipment).offset(skip).limit(limit).all()
-    result = []
-    for eq in equipment:
-        maintenance_count = db.query(MaintenanceRequest).filter(MaintenanceRequest.equipment_id == eq.id).count()
-        result.append({
-            "id": eq.id,
-            "name": eq.name,
-            "serial_number": eq.serial_number,
-            "department": eq.department,
-            "location": eq.location,
-            "purchase_date": str(eq.purchase_date),
-            "warranty_expiry": str(eq.warranty_expiry) if eq.warranty_expiry else None,
-            "maintenance_team_id": eq.maintenance_team_id,
-            "is_scrapped": eq.is_scrapped,
-            "maintenance_count": maintenance_count
-        })
-    return result
+@router.get("/api/equipment", response_model=List[dict], dependencies=[etag_for(Equipment.__tablename__, MaintenanceRequest.__tablename__)])
+@db_route
+def get_equipment(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = "id",
+    order: str = "asc",
+    team_id: Optional[int] = None,
+    department: Optional[str] = None,
+    location: Optional[str] = None,
+    is_scrapped: Optional[bool] = None,
+    stream: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    streaming.check_stream_mode(stream)
+    sort_column, descending = resolve_sort(sort, order, EQUIPMENT_SORT_FIELDS)
+    query = query_equipment_with_counts(db)
+    if team_id is not None:
+        query = query.filter(Equipment.maintenance_team_id == team_id)
+    if department is not None:
+        query = query.filter(Equipment.department == department)
+    if location is not None:
+        query = query.filter(Equipment.location == location)
+    if is_scrapped is not None:
+        query = query.filter(Equipment.is_scrapped == is_scrapped)
+
+    if stream:
+        # Every matching row from the cursor on, ignoring limit
+        statement = keyset_order(query, sort_column, Equipment.id, cursor, descending).statement
+        return streaming.streaming_response(statement, EQUIPMENT_WITH_COUNT, stream)
+
+    rows, next_cursor = paginate(
+        query, sort_column, Equipment.id,
+        lambda row: (getattr(row, sort_column.key), row.id),
+        cursor, limit, descending
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return EQUIPMENT_WITH_COUNT.to_dicts(rows)
+
+# Equipment bulk import/export
+def import_equipment_batch(db: Session, batch: list, report: bulk.BulkReport, seen_serials: set):
+    """Validate and insert one batch of equipment rows in a single transaction"""
+    candidates = []
+    for line, data, error in batch:
+        if error:
+            report.add_error(line, error)
+            continue
+        try:
+            item = EquipmentCreate(**data)
+        except ValidationError as e:
+            report.add_error(line, bulk.validation_message(e))
+            continue
+        purchase_date = parse_date(item.purchase_date)
+        if purchase_date is None:
+            report.add_error(line, "purchase_date must be YYYY-MM-DD")
+            continue
+        warranty_expiry = parse_date(item.warranty_expiry)
+        if item.warranty_expiry and warranty_expiry is None:
+            report.add_error(line, "warranty_expiry must be YYYY-MM-DD")
+            continue
+        if item.serial_number in seen_serials:
+            report.add_error(line, "Duplicate serial number in upload")
+            continue
+        seen_serials.add(item.serial_number)
+        candidates.append((line, {
+            "name": item.name,
+            "serial_number": item.serial_number,
+            "department": item.department,
+            "location": item.location,
+            "purchase_date": purchase_date,
+            "warranty_expiry": warranty_expiry,
+            "maintenance_team_id": item.maintenance_team_id,
+            "is_scrapped": item.is_scrapped
+        }))
+    if not candidates:
+        return
+    
+    # One set-based lookup each for serial numbers and teams
+    existing_serials = {serial for (serial,) in db.query(Equipment.serial_number).filter(
+        Equipment.serial_number.in_([row["serial_number"] for _, row in candidates])
+    )}
+    known_teams = {team_id for (team_id,) in db.query(MaintenanceTeam.id).filter(
+        MaintenanceTeam.id.in_({row["maintenance_team_id"] for _, row in candidates})
+    )}
+    rows = []
+    for line, row in candidates:
+        if row["serial_number"] in existing_serials:
+            report.add_error(line, "Serial number already exists")
+        elif row["maintenance_team_id"] not in known_teams:
+            report.add_error(line, "Team not found")
+        else:
+            rows.append(row)
+    if rows:
+        # Core insert: bump the equipment version the flush hook would have
+        next_version(db, Equipment.__tablename__)
+        db.execute(insert(Equipment), rows)
+        db.commit()
+        report.inserted += len(rows)
+
+def import_equipment(db: Session, upload, fmt: str) -> bulk.BulkReport:
+    report = bulk.BulkReport()
+    seen_serials = set()
+    for batch in bulk.batched(bulk.read_rows(upload, fmt), bulk.BULK_BATCH_SIZE):
+        import_equipment_batch(db, batch, report, seen_serials)
+    return report
+
+# Bulk routes read the body on the event loop and then run the import in the
+# threadpool with the sync session, so they are not wrapped in db_route
+@router.post("/api/equipment/bulk", response_model=dict)
+async def bulk_import_equipment(request: Request, fmt: Optional[str] = Query(None, alias="format"), db: Session = Depends(get_db)):
+    fmt = bulk.detect_format(request.headers.get("content-type"), fmt)
+    upload = await bulk.spool_body(request)
+    try:
+        report = await run_in_threadpool(import_equipment, db, upload, fmt)
+    finally:
+        upload.close()
+    dashboard_cache.invalidate()
+    if report.inserted:
+        event_hub.publish_reload("equipment")
+    return report.as_dict()
+
+@router.get("/api/equipment/export")
+def export_equipment(fmt: str = Query("csv", alias="format")):
+    fmt = bulk.detect_format(None, fmt)
+    statement = select(
+        Equipment.id, Equipment.name, Equipment.serial_number, Equipment.department,
+        Equipment.location, Equipment.purchase_date, Equipment.warranty_expiry,
+        Equipment.maintenance_team_id, Equipment.is_scrapped
+    ).order_by(Equipment.id)
+    return StreamingResponse(
+        bulk.stream_export(statement, fmt),
+        media_type=bulk.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="equipment.{fmt}"'}
+    )
 
-@router.get("/api/equipment/{equipment_id}", response_model=dict)
+@router.get("/api/equipment/{equipment_id}", response_model=dict, dependencies=[etag_for(Equipment.__tablename__, MaintenanceRequest.__tablename__)])
+@db_route
 def get_equipment_by_id(equipment_id: int, db: Session = Depends(get_db)):
-    equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
-    if not equipment:
+    row = query_equipment_with_counts(db).filter(Equipment.id == equipment_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Equipment not found")
-    maintenance_count = db.query(MaintenanceRequest).filter(MaintenanceRequest.equipment_id == equipment.id).count()
-    return {
-        "id": equipment.id,
-        "name": equipment.name,
-        "serial_number": equipment.serial_number,
-        "department": equipment.department,
-        "location": equipment.location,
-        "purchase_date": str(equipment.purchase_date),
-        "warranty_expiry": str(equipment.warranty_expiry) if equipment.warranty_expiry else None,
-        "maintenance_team_id": equipment.maintenance_team_id,
-        "is_scrapped": equipment.is_scrapped,
-        "maintenance_count": maintenance_count
-    }
+    return EQUIPMENT_WITH_COUNT.to_dict(row)
 
 @router.post("/api/equipment", response_model=dict)
+@db_route
 def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
     # Check if serial number already exists
     existing = db.query(Equipment).filter(Equipment.serial_number == equipment.serial_number).first()
@@ -143,20 +367,12 @@ def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
     )
     db.add(db_equipment)
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_equipment)
-    return {
-        "id": db_equipment.id,
-        "name": db_equipment.name,
-        "serial_number": db_equipment.serial_number,
-        "department": db_equipment.department,
-        "location": db_equipment.location,
-        "purchase_date": str(db_equipment.purchase_date),
-        "warranty_expiry": str(db_equipment.warranty_expiry) if db_equipment.warranty_expiry else None,
-        "maintenance_team_id": db_equipment.maintenance_team_id,
-        "is_scrapped": db_equipment.is_scrapped
-    }
+    return EQUIPMENT.from_object(db_equipment)
 
 @router.put("/api/equipment/{equipment_id}", response_model=dict)
+@db_route
 def update_equipment(equipment_id: int, equipment: EquipmentUpdate, db: Session = Depends(get_db)):
     db_equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
     if not db_equipment:
@@ -177,35 +393,46 @@ def update_equipment(equipment_id: int, equipment: EquipmentUpdate, db: Session
         setattr(db_equipment, key, value)
     
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_equipment)
-    return {
-        "id": db_equipment.id,
-        "name": db_equipment.name,
-        "serial_number": db_equipment.serial_number,
-        "department": db_equipment.department,
-        "location": db_equipment.location,
-        "purchase_date": str(db_equipment.purchase_date),
-        "warranty_expiry": str(db_equipment.warranty_expiry) if db_equipment.warranty_expiry else None,
-        "maintenance_team_id": db_equipment.maintenance_team_id,
-        "is_scrapped": db_equipment.is_scrapped
-    }
+    return EQUIPMENT.from_object(db_equipment)
 
 @router.delete("/api/equipment/{equipment_id}")
+@db_route
 def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
     equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
+    # Readings and rules are not ORM children of the equipment
+    meters.delete_equipment_meters(db, equipment_id)
     db.delete(equipment)
     db.commit()
+    dashboard_cache.invalidate()
     return {"message": "Equipment deleted successfully"}
 
 # Team Routes
-@router.get("/api/teams", response_model=List[dict])
-def get_teams(db: Session = Depends(get_db)):
-    teams = db.query(MaintenanceTeam).all()
+@router.get("/api/teams", response_model=List[dict], dependencies=[etag_for(MaintenanceTeam.__tablename__)])
+@db_route
+def get_teams(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = "id",
+    order: str = "asc",
+    db: Session = Depends(get_db)
+):
+    sort_column, descending = resolve_sort(sort, order, TEAM_SORT_FIELDS)
+    teams, next_cursor = paginate(
+        db.query(MaintenanceTeam), sort_column, MaintenanceTeam.id,
+        lambda t: (getattr(t, sort_column.key), t.id),
+        cursor, limit, descending
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [{"id": t.id, "name": t.name, "members": t.members} for t in teams]
 
-@router.get("/api/teams/{team_id}", response_model=dict)
+@router.get("/api/teams/{team_id}", response_model=dict, dependencies=[etag_for(MaintenanceTeam.__tablename__)])
+@db_route
 def get_team_by_id(team_id: int, db: Session = Depends(get_db)):
     team = db.query(MaintenanceTeam).filter(MaintenanceTeam.id == team_id).first()
     if not team:
@@ -213,18 +440,23 @@ def get_team_by_id(team_id: int, db: Session = Depends(get_db)):
     return {"id": team.id, "name": team.name, "members": team.members}
 
 @router.post("/api/teams", response_model=dict)
+@db_route
 def create_team(team: TeamCreate, db: Session = Depends(get_db)):
     existing = db.query(MaintenanceTeam).filter(MaintenanceTeam.name == team.name).first()
     if existing:
         raise HTTPException(status_code=400, detail="Team name already exists")
     
     db_team = MaintenanceTeam(name=team.name, members=team.members)
+    set_team_members(db, db_team, team.members)
     db.add(db_team)
     db.commit()
+    assignment_engine.invalidate_team(db_team.id)
+    dashboard_cache.invalidate()
     db.refresh(db_team)
     return {"id": db_team.id, "name": db_team.name, "members": db_team.members}
 
 @router.put("/api/teams/{team_id}", response_model=dict)
+@db_route
 def update_team(team_id: int, team: TeamUpdate, db: Session = Depends(get_db)):
     db_team = db.query(MaintenanceTeam).filter(MaintenanceTeam.id == team_id).first()
     if not db_team:
@@ -233,118 +465,599 @@ def update_team(team_id: int, team: TeamUpdate, db: Session = Depends(get_db)):
     update_data = team.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_team, key, value)
+    if "members" in update_data:
+        set_team_members(db, db_team, update_data["members"])
     
     db.commit()
+    assignment_engine.invalidate_team(team_id)
+    dashboard_cache.invalidate()
     db.refresh(db_team)
     return {"id": db_team.id, "name": db_team.name, "members": db_team.members}
 
 @router.delete("/api/teams/{team_id}")
+@db_route
 def delete_team(team_id: int, db: Session = Depends(get_db)):
     team = db.query(MaintenanceTeam).filter(MaintenanceTeam.id == team_id).first()
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     db.delete(team)
     db.commit()
+    assignment_engine.invalidate_team(team_id)
+    dashboard_cache.invalidate()
     return {"message": "Team deleted successfully"}
 
+# Technician Routes
+@router.get("/api/technicians", response_model=List[dict], dependencies=[etag_for(Technician.__tablename__, MaintenanceTeam.__tablename__)])
+@db_route
+def get_technicians(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = "id",
+    order: str = "asc",
+    team_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    sort_column, descending = resolve_sort(sort, order, TECHNICIAN_SORT_FIELDS)
+    query = db.query(Technician)
+    if team_id is not None:
+        query = query.join(team_members, team_members.c.technician_id == Technician.id).filter(
+            team_members.c.team_id == team_id
+        )
+    technicians, next_cursor = paginate(
+        query, sort_column, Technician.id,
+        lambda t: (getattr(t, sort_column.key), t.id),
+        cursor, limit, descending
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [{"id": t.id, "name": t.name, "skills": t.skills} for t in technicians]
+
+@router.put("/api/technicians/{technician_id}", response_model=dict)
+@db_route
+def update_technician(technician_id: int, technician: TechnicianUpdate, db: Session = Depends(get_db)):
+    db_technician = db.query(Technician).filter(Technician.id == technician_id).first()
+    if not db_technician:
+        raise HTTPException(status_code=404, detail="Technician not found")
+    if technician.skills is not None:
+        # Stored normalized so the assignment engine and clients agree on the tags
+        db_technician.skills = ", ".join(sorted(parse_skills(technician.skills))) or None
+    db.commit()
+    assignment_engine.update_skills(technician_id, db_technician.skills)
+    return {"id": db_technician.id, "name": db_technician.name, "skills": db_technician.skills}
+
+@router.get("/api/technicians/{technician_id}/workload", response_model=dict, dependencies=[etag_for(Technician.__tablename__, MaintenanceRequest.__tablename__)])
+@db_route
+def get_technician_workload(technician_id: int, db: Session = Depends(get_db)):
+    """Open requests and hours assigned to a technician, in a single statement
+    served by the (technician_id, status, duration) index"""
+    row = db.execute(
+        select(
+            Technician.name,
+            func.count(MaintenanceRequest.id),
+            func.coalesce(func.sum(MaintenanceRequest.duration), 0)
+        ).select_from(Technician).outerjoin(
+            MaintenanceRequest,
+            (MaintenanceRequest.technician_id == Technician.id) & MaintenanceRequest.status.in_(OPEN_STATUSES)
+        ).where(Technician.id == technician_id).group_by(Technician.id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Technician not found")
+    return {"technician_id": technician_id, "name": row[0], "open_requests": row[1], "open_hours": row[2]}
+
+# Preventive Maintenance Schedule Routes
+@router.get("/api/schedules", response_model=List[dict], dependencies=[etag_for(MaintenanceSchedule.__tablename__)])
+@db_route
+def get_schedules(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    equipment_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    query = SCHEDULE.query(db)
+    if equipment_id is not None:
+        query = query.filter(MaintenanceSchedule.equipment_id == equipment_id)
+    rows, next_cursor = paginate(
+        query, MaintenanceSchedule.id, MaintenanceSchedule.id,
+        lambda s: (s.id, s.id),
+        cursor, limit, False
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return SCHEDULE.to_dicts(rows)
+
+@router.post("/api/schedules/generate", response_model=dict)
+@db_route
+def generate_scheduled_requests(horizon_days: int = Query(schedules.PM_HORIZON_DAYS, ge=0, le=3660), db: Session = Depends(get_db)):
+    """Materialize every schedule occurrence within horizon_days now instead of waiting for the scheduler"""
+    return schedules.generate_due_requests(db, horizon_days)
+
+@router.get("/api/schedules/{schedule_id}", response_model=dict, dependencies=[etag_for(MaintenanceSchedule.__tablename__)])
+@db_route
+def get_schedule_by_id(schedule_id: int, db: Session = Depends(get_db)):
+    row = SCHEDULE.query(db).filter(MaintenanceSchedule.id == schedule_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return SCHEDULE.to_dict(row)
+
+@router.post("/api/schedules", response_model=dict)
+@db_route
+def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
+    error = schedules.validate_interval(schedule.interval_value, schedule.interval_unit, schedule.usage_hours_per_day)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    if not db.query(Equipment.id).filter(Equipment.id == schedule.equipment_id).first():
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    start_date = parse_date(schedule.start_date) if schedule.start_date else date.today()
+    if start_date is None:
+        raise HTTPException(status_code=400, detail="start_date must be YYYY-MM-DD")
+    
+    db_schedule = MaintenanceSchedule(
+        equipment_id=schedule.equipment_id,
+        title=schedule.title,
+        description=schedule.description,
+        technician=schedule.technician,
+        duration=schedule.duration,
+        interval_value=schedule.interval_value,
+        interval_unit=schedule.interval_unit,
+        usage_hours_per_day=schedule.usage_hours_per_day,
+        start_date=start_date,
+        next_due_date=start_date,
+        generated_count=0,
+        is_active=True
+    )
+    db.add(db_schedule)
+    db.commit()
+    # Materialize the occurrences inside the horizon right away
+    schedules.generate_due_requests(db, schedule_id=db_schedule.id)
+    db.refresh(db_schedule)
+    return SCHEDULE.from_object(db_schedule)
+
+@router.put("/api/schedules/{schedule_id}", response_model=dict)
+@db_route
+def update_schedule(schedule_id: int, schedule: ScheduleUpdate, db: Session = Depends(get_db)):
+    """Change how future occurrences are generated; requests already generated are left as they are"""
+    db_schedule = db.query(MaintenanceSchedule).filter(MaintenanceSchedule.id == schedule_id).first()
+    if not db_schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    reactivated = schedule.is_active and not db_schedule.is_active
+    for key, value in schedule.dict(exclude_unset=True).items():
+        setattr(db_schedule, key, value)
+    if reactivated:
+        # Occurrences missed while paused are skipped, not backfilled
+        db_schedule.generated_count, db_schedule.next_due_date = schedules.first_upcoming(
+            db_schedule, db_schedule.generated_count, db_schedule.next_due_date, date.today()
+        )
+    db.commit()
+    if reactivated:
+        schedules.generate_due_requests(db, schedule_id=db_schedule.id)
+    db.refresh(db_schedule)
+    return SCHEDULE.from_object(db_schedule)
+
+@router.delete("/api/schedules/{schedule_id}")
+@db_route
+def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
+    """Stop a schedule; requests it already generated are kept"""
+    schedule = db.query(MaintenanceSchedule).filter(MaintenanceSchedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    # Detach the generated requests so a later schedule reusing the id
+    # does not collide with them in the (schedule_id, scheduled_date) index
+    db.execute(update(MaintenanceRequest).where(MaintenanceRequest.schedule_id == schedule_id).values(schedule_id=None))
+    db.delete(schedule)
+    db.commit()
+    return {"message": "Schedule deleted successfully"}
+
+# Meter Routes
+@router.post("/api/meter-readings", response_model=dict)
+async def ingest_meter_readings(
+    request: Request,
+    equipment_id: Optional[int] = None,
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """Store batched meter readings (JSON Lines or CSV of equipment_id, meter, ts, value).
+
+    equipment_id, when given, applies to lines without one. Readings outside
+    a meter rule's limits open Corrective requests, listed in requests_opened.
+    """
+    fmt = bulk.detect_format(request.headers.get("content-type"), fmt)
+    upload = await bulk.spool_body(request)
+    try:
+        report = await run_in_threadpool(meters.ingest, db, upload, fmt, equipment_id)
+    finally:
+        upload.close()
+    if report["requests_opened"]:
+        dashboard_cache.invalidate()
+    return report
+
+@router.get("/api/equipment/{equipment_id}/readings", response_model=dict)
+@db_route
+def get_meter_readings(
+    equipment_id: int,
+    meter: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = "raw",
+    limit: int = Query(1000, ge=1, le=meters.MAX_SERIES_POINTS),
+    db: Session = Depends(get_db)
+):
+    """Readings of one meter in [start, end) (default: the last 7 days) as raw points or hourly/daily rollups"""
+    if not db.query(Equipment.id).filter(Equipment.id == equipment_id).first():
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    end = meters.naive_utc(end) if end else datetime.utcnow()
+    start = meters.naive_utc(start) if start else end - timedelta(days=7)
+    return {
+        "equipment_id": equipment_id,
+        "meter": meter,
+        "resolution": resolution,
+        "points": meters.series(db, equipment_id, meter, start, end, resolution, limit)
+    }
+
+@router.get("/api/equipment/{equipment_id}/meters", response_model=List[dict])
+@db_route
+def get_equipment_meters(equipment_id: int, db: Session = Depends(get_db)):
+    """Latest reading of every meter of the equipment"""
+    if not db.query(Equipment.id).filter(Equipment.id == equipment_id).first():
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    return meters.latest_readings(db, equipment_id)
+
+@router.get("/api/meter-rules", response_model=List[dict])
+@db_route
+def get_meter_rules(equipment_id: Optional[int] = None, db: Session = Depends(get_db)):
+    query = METER_RULE.query(db)
+    if equipment_id is not None:
+        query = query.filter(MeterRule.equipment_id == equipment_id)
+    return METER_RULE.to_dicts(query.order_by(MeterRule.id))
+
+@router.post("/api/meter-rules", response_model=dict)
+@db_route
+def create_meter_rule(rule: MeterRuleCreate, db: Session = Depends(get_db)):
+    if rule.min_value is None and rule.max_value is None:
+        raise HTTPException(status_code=400, detail="Give min_value, max_value or both")
+    if rule.min_value is not None and rule.max_value is not None and rule.min_value > rule.max_value:
+        raise HTTPException(status_code=400, detail="min_value must not exceed max_value")
+    if not rule.meter.strip():
+        raise HTTPException(status_code=400, detail="meter is required")
+    if not db.query(Equipment.id).filter(Equipment.id == rule.equipment_id).first():
+        raise HTTPException(status_code=404, detail="Equipment not found")
+    
+    db_rule = MeterRule(
+        equipment_id=rule.equipment_id,
+        meter=rule.meter.strip(),
+        min_value=rule.min_value,
+        max_value=rule.max_value
+    )
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    return METER_RULE.from_object(db_rule)
+
+@router.delete("/api/meter-rules/{rule_id}")
+@db_route
+def delete_meter_rule(rule_id: int, db: Session = Depends(get_db)):
+    rule = db.query(MeterRule).filter(MeterRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Meter rule not found")
+    # Requests the rule opened stay, without the link
+    db.execute(update(MaintenanceRequest).where(MaintenanceRequest.meter_rule_id == rule_id).values(meter_rule_id=None))
+    db.delete(rule)
+    db.commit()
+    return {"message": "Meter rule deleted successfully"}
+
 # Maintenance Request Routes
-@router.get("/api/maintenance-requests", response_model=List[dict])
-def get_maintenance_requests(db: Session = Depends(get_db)):
-    requests = db.query(MaintenanceRequest).all()
-    result = []
-    today = date.today()
-    for req in requests:
-        is_overdue = False
-        if req.scheduled_date and req.status not in ["Repaired", "Scrap"]:
-            is_overdue = req.scheduled_date < today
-        
-        result.append({
-            "id": req.id,
-            "title": req.title,
-            "description": req.description,
-            "equipment_id": req.equipment_id,
-            "team_id": req.team_id,
-            "technician": req.technician,
-            "request_type": req.request_type,
-            "status": req.status,
-            "scheduled_date": str(req.scheduled_date) if req.scheduled_date else None,
-            "duration": req.duration,
-            "created_at": req.created_at.isoformat() if req.created_at else None,
-            "is_overdue": is_overdue
-        })
+@router.get("/api/maintenance-requests", response_model=List[dict], dependencies=[etag_for(MaintenanceRequest.__tablename__)])
+@db_route
+def get_maintenance_requests(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = "id",
+    order: str = "asc",
+    status: Optional[str] = None,
+    team_id: Optional[int] = None,
+    equipment_id: Optional[int] = None,
+    request_type: Optional[str] = None,
+    scheduled_from: Optional[date] = None,
+    scheduled_to: Optional[date] = None,
+    is_overdue: Optional[bool] = None,
+    stream: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    streaming.check_stream_mode(stream)
+    sort_column, descending = resolve_sort(sort, order, REQUEST_SORT_FIELDS)
+    query = REQUEST.query(db)
+    if status is not None:
+        query = query.filter(MaintenanceRequest.status == status)
+    if team_id is not None:
+        query = query.filter(MaintenanceRequest.team_id == team_id)
+    if equipment_id is not None:
+        query = query.filter(MaintenanceRequest.equipment_id == equipment_id)
+    if request_type is not None:
+        query = query.filter(MaintenanceRequest.request_type == request_type)
+    if scheduled_from is not None:
+        query = query.filter(MaintenanceRequest.scheduled_date >= scheduled_from)
+    if scheduled_to is not None:
+        query = query.filter(MaintenanceRequest.scheduled_date <= scheduled_to)
+    if is_overdue is not None:
+        query = query.filter(MaintenanceRequest.is_overdue == is_overdue)
+
+    if stream:
+        # Every matching row from the cursor on, ignoring limit
+        statement = keyset_order(query, sort_column, MaintenanceRequest.id, cursor, descending).statement
+        return streaming.streaming_response(statement, REQUEST, stream)
+
+    requests, next_cursor = paginate(
+        query, sort_column, MaintenanceRequest.id,
+        lambda r: (getattr(r, sort_column.key), r.id),
+        cursor, limit, descending
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return REQUEST.to_dicts(requests)
+
+# Maintenance request bulk import/export
+REQUEST_STATUSES = {status.value for status in RequestStatus}
+
+def import_requests_batch(db: Session, batch: list, report: bulk.BulkReport):
+    """Validate and insert one batch of maintenance requests in a single transaction"""
+    candidates = []
+    for line, data, error in batch:
+        if error:
+            report.add_error(line, error)
+            continue
+        try:
+            item = MaintenanceRequestImport(**data)
+        except ValidationError as e:
+            report.add_error(line, bulk.validation_message(e))
+            continue
+        scheduled_date = parse_date(item.scheduled_date)
+        if item.scheduled_date and scheduled_date is None:
+            report.add_error(line, "scheduled_date must be YYYY-MM-DD")
+            continue
+        if item.status not in REQUEST_STATUSES:
+            report.add_error(line, f"Invalid status: {item.status}")
+            continue
+        candidates.append((line, {
+            "title": item.title,
+            "description": item.description,
+            "equipment_id": item.equipment_id,
+            "technician": item.technician,
+            "request_type": item.request_type,
+            "status": item.status,
+            "scheduled_date": scheduled_date,
+            "duration": item.duration,
+            "required_skills": item.required_skills
+        }))
+    if not candidates:
+        return
+    
+    # Team is auto-filled from the equipment, looked up once per batch
+    equipment_teams = dict(db.query(Equipment.id, Equipment.maintenance_team_id).filter(
+        Equipment.id.in_({row["equipment_id"] for _, row in candidates})
+    ).all())
+    rows = []
+    for line, row in candidates:
+        if row["equipment_id"] not in equipment_teams:
+            report.add_error(line, "Equipment not found")
+        else:
+            row["team_id"] = equipment_teams[row["equipment_id"]]
+            rows.append(row)
+    if not rows:
+        return
+    
+    technician_ids = ensure_technicians(db, [row["technician"] for row in rows if row["technician"]])
+    for row in rows:
+        row["technician_id"] = technician_ids.get((row["technician"] or "").strip())
+    
+    stamp_bulk_rows(db, rows)
+    db.execute(insert(MaintenanceRequest), rows)
+    scrapped = {row["equipment_id"] for row in rows if row["status"] == "Scrap"}
+    if scrapped:
+        db.execute(update(Equipment).where(Equipment.id.in_(scrapped)).values(is_scrapped=True))
+        next_version(db, Equipment.__tablename__)
+    db.commit()
+    report.inserted += len(rows)
+
+def import_requests(db: Session, upload, fmt: str) -> bulk.BulkReport:
+    report = bulk.BulkReport()
+    for batch in bulk.batched(bulk.read_rows(upload, fmt), bulk.BULK_BATCH_SIZE):
+        import_requests_batch(db, batch, report)
+    return report
+
+@router.post("/api/maintenance-requests/bulk", response_model=dict)
+async def bulk_import_maintenance_requests(request: Request, fmt: Optional[str] = Query(None, alias="format"), db: Session = Depends(get_db)):
+    fmt = bulk.detect_format(request.headers.get("content-type"), fmt)
+    upload = await bulk.spool_body(request)
+    try:
+        report = await run_in_threadpool(import_requests, db, upload, fmt)
+    finally:
+        upload.close()
+    dashboard_cache.invalidate()
+    return report.as_dict()
+
+@router.post("/api/maintenance-requests/assign", response_model=dict)
+@db_route
+def assign_maintenance_requests(
+    team_id: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=MAX_ASSIGN_BATCH),
+    db: Session = Depends(get_db)
+):
+    """Assign open requests without a technician to the least loaded eligible team member"""
+    result = assign_unassigned(db, team_id, limit)
+    if result["assigned"]:
+        dashboard_cache.invalidate()
     return result
 
-@router.get("/api/maintenance-requests/{request_id}", response_model=dict)
+# Most requests one batch update may change
+MAX_BATCH_UPDATES = 1000
+
+def apply_request_batch(db: Session, updates: dict) -> list:
+    """Apply {request id: changed fields} in one transaction, returning the ids of the changed requests.
+
+    Requests are written with one executemany UPDATE (stamped by
+    stamp_bulk_rows) and scrapped equipment with one set-based UPDATE.
+    """
+    current = {
+        row.id: row for row in db.execute(
+            select(
+                MaintenanceRequest.id, MaintenanceRequest.status, MaintenanceRequest.technician,
+                MaintenanceRequest.technician_id, MaintenanceRequest.scheduled_date, MaintenanceRequest.equipment_id,
+                MaintenanceRequest.team_id, MaintenanceRequest.created_at, MaintenanceRequest.completed_at
+            ).where(MaintenanceRequest.id.in_(updates))
+        )
+    }
+    missing = sorted(updates.keys() - current.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Maintenance requests not found: {', '.join(map(str, missing))}")
+    technician_ids = ensure_technicians(db, [data["technician"] for data in updates.values() if data.get("technician")])
+    
+    rows, scrapped = [], set()
+    for request_id, data in updates.items():
+        old = current[request_id]
+        new = {field: data.get(field, getattr(old, field)) for field in TRACKED_FIELDS}
+        changed = [field for field in TRACKED_FIELDS if new[field] != getattr(old, field)]
+        if new["status"] == "Scrap" and "status" in data:
+            scrapped.add(old.equipment_id)
+        if not changed:
+            continue
+        rows.append({
+            "id": request_id,
+            **new,
+            "technician_id": technician_ids.get((new["technician"] or "").strip()) if "technician" in changed else old.technician_id,
+        })
+    
+    if rows:
+        stamp_bulk_rows(db, rows, current)
+        db.execute(update(MaintenanceRequest), rows)
+    if scrapped:
+        newly_scrapped = db.execute(
+            select(Equipment.id, Equipment.maintenance_team_id).where(Equipment.id.in_(scrapped), Equipment.is_scrapped.is_(False))
+        ).all()
+        if newly_scrapped:
+            db.execute(update(Equipment).where(Equipment.id.in_([row.id for row in newly_scrapped])).values(is_scrapped=True))
+            next_version(db, Equipment.__tablename__)
+            queue_events(db, [("equipment", "updated", row.id, {row.maintenance_team_id}) for row in newly_scrapped])
+    db.commit()
+    return [row["id"] for row in rows]
+
+@router.patch("/api/maintenance-requests/batch", response_model=List[dict])
+@db_route
+def batch_update_maintenance_requests(batch: MaintenanceRequestBatch, db: Session = Depends(get_db)):
+    """Apply status, technician and scheduled date updates to many requests atomically; returns the changed requests"""
+    if len(batch.updates) > MAX_BATCH_UPDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_UPDATES} updates per batch")
+    updates = {}
+    for item in batch.updates:
+        if item.id in updates:
+            raise HTTPException(status_code=400, detail=f"Duplicate update for request {item.id}")
+        data = item.dict(exclude_unset=True)
+        data.pop("id")
+        if "status" in data and data["status"] not in REQUEST_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {data['status']}")
+        if "scheduled_date" in data:
+            scheduled_date = parse_date(data["scheduled_date"])
+            if data["scheduled_date"] and scheduled_date is None:
+                raise HTTPException(status_code=400, detail="scheduled_date must be YYYY-MM-DD")
+            data["scheduled_date"] = scheduled_date
+        updates[item.id] = data
+    if not updates:
+        return []
+    
+    changed = apply_request_batch(db, updates)
+    if not changed:
+        return []
+    dashboard_cache.invalidate()
+    return REQUEST.to_dicts(
+        REQUEST.query(db).filter(MaintenanceRequest.id.in_(changed)).order_by(MaintenanceRequest.id)
+    )
+
+@router.get("/api/maintenance-requests/overdue", response_model=List[dict], dependencies=[etag_for(MaintenanceRequest.__tablename__)])
+@db_route
+def get_overdue_maintenance_requests(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    team_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Overdue requests, longest overdue first, read from the overdue partial index"""
+    query = REQUEST.query(db).filter(overdue_condition())
+    if team_id is not None:
+        query = query.filter(MaintenanceRequest.team_id == team_id)
+    requests, next_cursor = paginate(
+        query, MaintenanceRequest.scheduled_date, MaintenanceRequest.id,
+        lambda r: (r.scheduled_date, r.id),
+        cursor, limit, False
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return REQUEST.to_dicts(requests)
+
+@router.get("/api/maintenance-requests/export")
+def export_maintenance_requests(fmt: str = Query("csv", alias="format")):
+    fmt = bulk.detect_format(None, fmt)
+    statement = select(
+        MaintenanceRequest.id, MaintenanceRequest.title, MaintenanceRequest.description,
+        MaintenanceRequest.equipment_id, MaintenanceRequest.team_id, MaintenanceRequest.technician,
+        MaintenanceRequest.request_type, MaintenanceRequest.status, MaintenanceRequest.scheduled_date,
+        MaintenanceRequest.duration, MaintenanceRequest.created_at
+    ).order_by(MaintenanceRequest.id)
+    return StreamingResponse(
+        bulk.stream_export(statement, fmt),
+        media_type=bulk.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="maintenance_requests.{fmt}"'}
+    )
+
+@router.get("/api/maintenance-requests/{request_id}", response_model=dict, dependencies=[etag_for(MaintenanceRequest.__tablename__)])
+@db_route
 def get_maintenance_request_by_id(request_id: int, db: Session = Depends(get_db)):
-    req = db.query(MaintenanceRequest).filter(MaintenanceRequest.id == request_id).first()
-    if not req:
+    row = REQUEST.query(db).filter(MaintenanceRequest.id == request_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
     
-    today = date.today()
-    is_overdue = False
-    if req.scheduled_date and req.status not in ["Repaired", "Scrap"]:
-        is_overdue = req.scheduled_date < today
-    
-    return {
-        "id": req.id,
-        "title": req.title,
-        "description": req.description,
-        "equipment_id": req.equipment_id,
-        "team_id": req.team_id,
-        "technician": req.technician,
-        "request_type": req.request_type,
-        "status": req.status,
-        "scheduled_date": str(req.scheduled_date) if req.scheduled_date else None,
-        "duration": req.duration,
-        "created_at": req.created_at.isoformat() if req.created_at else None,
-        "is_overdue": is_overdue
-    }
+    return REQUEST.to_dict(row)
 
 @router.post("/api/maintenance-requests", response_model=dict)
-def create_maintenance_request(request: MaintenanceRequestCreate, db: Session = Depends(get_db)):
+@db_route
+def create_maintenance_request(request: MaintenanceRequestCreate, auto_assign: bool = False, db: Session = Depends(get_db)):
     # Get equipment to auto-fill team_id
     equipment = db.query(Equipment).filter(Equipment.id == request.equipment_id).first()
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
     
+    technician = request.technician
+    if not technician and auto_assign:
+        chosen = assignment_engine.choose(
+            db, equipment.maintenance_team_id, parse_date(request.scheduled_date),
+            float(request.duration or 0), parse_skills(request.required_skills)
+        )
+        technician = chosen.name if chosen else None
+    
     db_request = MaintenanceRequest(
         title=request.title,
         description=request.description,
         equipment_id=request.equipment_id,
         team_id=equipment.maintenance_team_id,  # Auto-filled from equipment
-        technician=request.technician,
+        technician=technician,
+        technician_id=technician_id_for(db, technician),
         request_type=request.request_type,
         scheduled_date=parse_date(request.scheduled_date),
         duration=request.duration,
+        required_skills=request.required_skills,
         status="New"
     )
     db.add(db_request)
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_request)
     
-    # If status is Scrap, mark equipment as scrapped
-    if request.request_type == "Preventive" and request.scheduled_date:
-        scheduled = parse_date(request.scheduled_date)
-        is_overdue = scheduled < date.today() if scheduled else False
-    else:
-        is_overdue = False
-    
-    return {
-        "id": db_request.id,
-        "title": db_request.title,
-        "description": db_request.description,
-        "equipment_id": db_request.equipment_id,
-        "team_id": db_request.team_id,
-        "technician": db_request.technician,
-        "request_type": db_request.request_type,
-        "status": db_request.status,
-        "scheduled_date": str(db_request.scheduled_date) if db_request.scheduled_date else None,
-        "duration": db_request.duration,
-        "created_at": db_request.created_at.isoformat() if db_request.created_at else None,
-        "is_overdue": is_overdue
-    }
+    return REQUEST.from_object(db_request)
 
 @router.put("/api/maintenance-requests/{request_id}", response_model=dict)
+@db_route
 def update_maintenance_request(request_id: int, request: MaintenanceRequestUpdate, db: Session = Depends(get_db)):
     db_request = db.query(MaintenanceRequest).filter(MaintenanceRequest.id == request_id).first()
     if not db_request:
@@ -353,6 +1066,8 @@ def update_maintenance_request(request_id: int, request: MaintenanceRequestUpdat
     update_data = request.dict(exclude_unset=True)
     if "scheduled_date" in update_data:
         update_data["scheduled_date"] = parse_date(update_data["scheduled_date"])
+    if "technician" in update_data:
+        update_data["technician_id"] = technician_id_for(db, update_data["technician"])
     
     for key, value in update_data.items():
         setattr(db_request, key, value)
@@ -364,69 +1079,235 @@ def update_maintenance_request(request_id: int, request: MaintenanceRequestUpdat
             equipment.is_scrapped = True
     
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_request)
     
-    today = date.today()
-    is_overdue = False
-    if db_request.scheduled_date and db_request.status not in ["Repaired", "Scrap"]:
-        is_overdue = db_request.scheduled_date < today
+    return REQUEST.from_object(db_request)
+
+@router.get("/api/maintenance-requests/{request_id}/history", response_model=dict, dependencies=[etag_for(MaintenanceRequest.__tablename__)])
+@db_route
+def get_maintenance_request_history(request_id: int, db: Session = Depends(get_db)):
+    """Status, technician and scheduled date changes of a request, oldest first"""
+    created_at = db.query(MaintenanceRequest.created_at).filter(MaintenanceRequest.id == request_id).scalar()
+    if created_at is None:
+        raise HTTPException(status_code=404, detail="Maintenance request not found")
     
+    # Served by the (request_id, ts) index
+    events = db.query(RequestEvent.ts, RequestEvent.field, RequestEvent.old_value, RequestEvent.new_value).filter(
+        RequestEvent.request_id == request_id
+    ).order_by(RequestEvent.ts, RequestEvent.id).all()
     return {
-        "id": db_request.id,
-        "title": db_request.title,
-        "description": db_request.description,
-        "equipment_id": db_request.equipment_id,
-        "team_id": db_request.team_id,
-        "technician": db_request.technician,
-        "request_type": db_request.request_type,
-        "status": db_request.status,
-        "scheduled_date": str(db_request.scheduled_date) if db_request.scheduled_date else None,
-        "duration": db_request.duration,
-        "created_at": db_request.created_at.isoformat() if db_request.created_at else None,
-        "is_overdue": is_overdue
+        "request_id": request_id,
+        "created_at": created_at.isoformat(),
+        "events": [
+            {"ts": ts.isoformat(), "field": field, "from": old_value, "to": new_value}
+            for ts, field, old_value, new_value in events
+        ]
     }
 
 @router.delete("/api/maintenance-requests/{request_id}")
+@db_route
 def delete_maintenance_request(request_id: int, db: Session = Depends(get_db)):
     request = db.query(MaintenanceRequest).filter(MaintenanceRequest.id == request_id).first()
     if not request:
         raise HTTPException(status_code=404, detail="Maintenance request not found")
     db.delete(request)
     db.commit()
+    dashboard_cache.invalidate()
     return {"message": "Maintenance request deleted successfully"}
 
-# Frontend Routes
-@router.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request, db: Session = Depends(get_db)):
-    equipment_count = db.query(Equipment).count()
-    requests_count = db.query(MaintenanceRequest).count()
-    teams_count = db.query(MaintenanceTeam).count()
-    
-    # Count overdue requests
-    today = date.today()
-    overdue_count = db.query(MaintenanceRequest).filter(
-        MaintenanceRequest.scheduled_date < today
+# Calendar Routes
+# Longest range one calendar call may cover
+MAX_CALENDAR_DAYS = 366
+
+@router.get("/api/calendar", response_model=dict, dependencies=[etag_for(MaintenanceRequest.__tablename__, Equipment.__tablename__)])
+@db_route
+def get_calendar(start: date, end: date, db: Session = Depends(get_db)):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days")
+    
+    # Served by the (request_type, scheduled_date) index
+    rows = CALENDAR_ITEM.query(db).join(
+        Equipment, Equipment.id == MaintenanceRequest.equipment_id
     ).filter(
-        ~MaintenanceRequest.status.in_(["Repaired", "Scrap"])
-    ).count()
+        MaintenanceRequest.request_type == "Preventive",
+        MaintenanceRequest.scheduled_date >= start,
+        MaintenanceRequest.scheduled_date <= end
+    ).order_by(MaintenanceRequest.scheduled_date, MaintenanceRequest.id).all()
     
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
-        "equipment_count": equipment_count,
-        "requests_count": requests_count,
-        "teams_count": teams_count,
-        "overdue_count": overdue_count
-    })
+    days = {}
+    for row in rows:
+        days.setdefault(str(row.scheduled_date), []).append(CALENDAR_ITEM.to_dict(row))
+    return {"start": str(start), "end": str(end), "days": days}
+
+# Kanban Routes
+@router.get("/api/kanban", response_model=dict, dependencies=[etag_for(MaintenanceRequest.__tablename__, Equipment.__tablename__, MaintenanceTeam.__tablename__)])
+@db_route
+def get_kanban(since: Optional[int] = None, team_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Requests grouped by status with equipment and team names.
+
+    With since=<version>, only requests written after that version are
+    returned, plus the ids of requests deleted since then.
+    """
+    # Read the version first: rows written concurrently are re-sent next time
+    version = current_version(db, MaintenanceRequest.__tablename__)
+    
+    query = KANBAN_CARD.query(db).join(
+        Equipment, Equipment.id == MaintenanceRequest.equipment_id
+    ).join(
+        MaintenanceTeam, MaintenanceTeam.id == MaintenanceRequest.team_id
+    )
+    if team_id is not None:
+        query = query.filter(MaintenanceRequest.team_id == team_id)
+    
+    deleted = []
+    if since is not None:
+        query = query.filter(MaintenanceRequest.row_version > since)
+        tombstones = db.query(RequestTombstone.request_id).filter(RequestTombstone.row_version > since)
+        if team_id is not None:
+            tombstones = tombstones.filter(RequestTombstone.team_id == team_id)
+        deleted = [request_id for (request_id,) in tombstones.all()]
+    
+    columns = {status.value: [] for status in RequestStatus}
+    for row in query.order_by(MaintenanceRequest.id):
+        columns.setdefault(row.status, []).append(KANBAN_CARD.to_dict(row))
+    
+    return {
+        "version": version,
+        "incremental": since is not None,
+        "columns": columns,
+        "deleted": deleted
+    }
+
+# Search Routes
+@router.get("/api/search", response_model=List[dict], dependencies=[etag_for(Equipment.__tablename__, MaintenanceRequest.__tablename__)])
+@db_route
+def search(
+    response: Response,
+    q: str,
+    result_type: Optional[str] = Query(None, alias="type"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over equipment and maintenance requests, best match first"""
+    rows, next_cursor = search_page(db, q, result_type, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    # Load the matched rows with one query per type
+    ids = {}
+    for row in rows:
+        ids.setdefault(row.type, []).append(row.id)
+    items = {}
+    if "equipment" in ids:
+        for row in query_equipment_with_counts(db).filter(Equipment.id.in_(ids["equipment"])):
+            items["equipment", row.id] = EQUIPMENT_WITH_COUNT.to_dict(row)
+    if "maintenance_request" in ids:
+        for row in REQUEST.query(db).filter(MaintenanceRequest.id.in_(ids["maintenance_request"])):
+            items["maintenance_request", row.id] = REQUEST.to_dict(row)
+    return [
+        {"type": row.type, "id": row.id, "rank": row.rank, "item": items[row.type, row.id]}
+        for row in rows if (row.type, row.id) in items
+    ]
+
+# Analytics Routes
+@router.get("/api/analytics/reliability")
+@db_route
+def analytics_reliability(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    team_id: Optional[int] = None,
+    department: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """MTBF and MTTR per asset over start..end (default: the last 365 days)"""
+    return analytics.reliability_report(db, start, end, team_id, department, location, limit)
+
+@router.get("/api/analytics/volume")
+@db_route
+def analytics_volume(
+    group_by: str = "department",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    team_id: Optional[int] = None,
+    department: Optional[str] = None,
+    location: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Request volume, preventive ratio, labor hours and MTTR per group over start..end"""
+    return analytics.volume_report(db, group_by, start, end, team_id, department, location)
+
+@router.post("/api/analytics/refresh")
+@db_route
+def analytics_refresh(db: Session = Depends(get_db)):
+    """Roll up the days since the last refresh and the days changed since"""
+    return analytics.refresh_rollups(db)
+
+# Job Routes
+@router.get("/api/jobs", response_model=dict)
+@db_route
+def get_job_counts(db: Session = Depends(get_db)):
+    """Queued background jobs by kind and status (pending or failed)"""
+    return jobs.job_counts(db)
+
+@router.post("/api/jobs/retry", response_model=dict)
+@db_route
+def retry_failed_jobs(db: Session = Depends(get_db)):
+    """Queue every failed job again"""
+    return {"retried": jobs.retry_failed(db)}
+
+# Live Update Routes
+# Not a db_route: the stream only waits on the event hub
+@router.get("/api/events")
+async def stream_events(team_id: Optional[int] = None):
+    """Server-Sent Events for maintenance request and equipment changes"""
+    subscriber = event_hub.subscribe(team_id)
+    return StreamingResponse(
+        event_hub.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Frontend Routes
+def dashboard_stats(db: Session) -> dict:
+    """All dashboard counters in a single statement"""
+    row = db.execute(select(
+        select(func.count()).select_from(Equipment).scalar_subquery(),
+        select(func.count()).select_from(MaintenanceRequest).scalar_subquery(),
+        select(func.count()).select_from(MaintenanceTeam).scalar_subquery(),
+        select(func.count()).select_from(MaintenanceRequest).where(overdue_condition()).scalar_subquery()
+    )).one()
+    return {
+        "equipment_count": row[0],
+        "requests_count": row[1],
+        "teams_count": row[2],
+        "overdue_count": row[3]
+    }
+
+# Page handlers are plain functions so FastAPI runs them in its threadpool
+# instead of blocking the event loop on database I/O
+@router.get("/", response_class=HTMLResponse)
+@db_route
+def dashboard(request: Request, db: Session = Depends(get_db)):
+    stats = dashboard_cache.get("stats")
+    if stats is None:
+        stats = dashboard_stats(db)
+        dashboard_cache.set("stats", stats)
+    return templates.TemplateResponse(request, "dashboard.html", stats)
 
 @router.get("/equipment", response_class=HTMLResponse)
 async def equipment_page(request: Request):
-    return templates.TemplateResponse("equipment.html", {"request": request})
+    return templates.TemplateResponse(request, "equipment.html")
 
 @router.get("/kanban", response_class=HTMLResponse)
 async def kanban_page(request: Request):
-    return templates.TemplateResponse("kanban.html", {"request": request})
+    return templates.TemplateResponse(request, "kanban.html")
 
 @router.get("/calendar", response_class=HTMLResponse)
 async def calendar_page(request: Request):
-    return templates.TemplateResponse("calendar.html", {"request": request})
-
+    return templates.TemplateResponse(request, "calendar.html")
@@ -0,0 +1,171 @@
+"""
+Preventive maintenance schedules
+
+A MaintenanceSchedule describes a recurring preventive request for one piece
+of equipment. Occurrence k falls on start_date + k intervals (hour intervals
+are projected onto days with usage_hours_per_day), so dates never drift.
+
+generate_due_requests() materializes every occurrence from today up to a
+rolling horizon as regular maintenance requests; occurrences already in the
+past (a start_date in the past, a schedule paused for a while) are skipped,
+not backfilled. Schedules are processed in batches
+of SCHEDULE_BATCH_SIZE, each batch in one transaction with executemany
+inserts. The (schedule_id, scheduled_date) unique index together with
+INSERT OR IGNORE makes a rerun, or two schedulers racing, harmless.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from backend.cache import dashboard_cache
+from backend.database import SessionLocal
+from backend.models import Equipment, IntervalUnit, MaintenanceRequest, MaintenanceSchedule
+from backend.sync import next_version, stamp_bulk_rows
+from backend.technicians import ensure_technicians
+
+# Days ahead the scheduler keeps materialized
+PM_HORIZON_DAYS = int(os.getenv("PM_HORIZON_DAYS", "90"))
+# Seconds between scheduler runs
+PM_SCHEDULER_INTERVAL = int(os.getenv("PM_SCHEDULER_INTERVAL", "3600"))
+# Schedules generated per transaction
+SCHEDULE_BATCH_SIZE = int(os.getenv("SCHEDULE_BATCH_SIZE", "1000"))
+
+INTERVAL_UNITS = {unit.value for unit in IntervalUnit}
+
+def add_months(day: date, months: int) -> date:
+    """Same day of month, months later (clamped to the end of shorter months)"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def occurrence_date(schedule, index: int) -> date:
+    """Date of occurrence number index (0 is start_date) of a schedule row"""
+    step = schedule.interval_value * index
+    unit = schedule.interval_unit
+    if unit == IntervalUnit.DAYS:
+        return schedule.start_date + timedelta(days=step)
+    if unit == IntervalUnit.WEEKS:
+        return schedule.start_date + timedelta(weeks=step)
+    if unit == IntervalUnit.MONTHS:
+        return add_months(schedule.start_date, step)
+    return schedule.start_date + timedelta(days=int(step // schedule.usage_hours_per_day))
+
+def first_upcoming(schedule, index: int, due: date, today: date) -> tuple:
+    """(index, date) of the first occurrence on or after today, counting on from occurrence index on due"""
+    while due < today:
+        index += 1
+        due = occurrence_date(schedule, index)
+    return index, due
+
+def validate_interval(interval_value: int, interval_unit: str, usage_hours_per_day: Optional[float]) -> Optional[str]:
+    """Error message for an invalid recurrence, None when it is valid"""
+    if interval_unit not in INTERVAL_UNITS:
+        return f"Invalid interval_unit. Allowed: {', '.join(unit.value for unit in IntervalUnit)}"
+    if interval_value < 1:
+        return "interval_value must be at least 1"
+    if interval_unit == IntervalUnit.HOURS and not (usage_hours_per_day and 0 < usage_hours_per_day <= 24):
+        return "Hour intervals need usage_hours_per_day between 0 and 24"
+    return None
+
+def generate_batch(db: Session, schedules: list, horizon: date, today: date) -> int:
+    """Insert the occurrences of schedules up to horizon and advance them, in one transaction"""
+    technician_ids = ensure_technicians(db, [s.technician for s in schedules if s.technician])
+    now = datetime.utcnow()
+    rows = []
+    progress = []
+    for schedule in schedules:
+        # Past occurrences are skipped, only counted
+        index, due = first_upcoming(schedule, schedule.generated_count, schedule.next_due_date, today)
+        previous = None
+        while due <= horizon:
+            # Hour intervals shorter than a day's usage land twice on one day
+            if due != previous:
+                rows.append({
+                    "title": schedule.title,
+                    "description": schedule.description,
+                    "equipment_id": schedule.equipment_id,
+                    "team_id": schedule.maintenance_team_id,
+                    "technician": schedule.technician,
+                    "technician_id": technician_ids.get((schedule.technician or "").strip()),
+                    "request_type": "Preventive",
+                    "status": "New",
+                    "scheduled_date": due,
+                    "duration": schedule.duration,
+                    "created_at": now,
+                    "schedule_id": schedule.id,
+                })
+            previous = due
+            index += 1
+            due = occurrence_date(schedule, index)
+        progress.append({"id": schedule.id, "generated_count": index, "next_due_date": due})
+
+    inserted = 0
+    if rows:
+        stamp_bulk_rows(db, rows)
+        inserted = db.execute(
+            insert(MaintenanceRequest.__table__).prefix_with("OR IGNORE", dialect="sqlite"), rows
+        ).rowcount
+    next_version(db, MaintenanceSchedule.__tablename__)
+    db.execute(update(MaintenanceSchedule), progress)
+    db.commit()
+    return inserted
+
+def generate_due_requests(db: Session, horizon_days: int = PM_HORIZON_DAYS, today: Optional[date] = None,
+                          schedule_id: Optional[int] = None) -> dict:
+    """Materialize all schedule occurrences due within horizon_days of today.
+
+    Every processed schedule moves past the horizon, so the loop simply takes
+    the next batch of due schedules until there are none left.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=horizon_days)
+    statement = select(
+        MaintenanceSchedule.id, MaintenanceSchedule.equipment_id, MaintenanceSchedule.title,
+        MaintenanceSchedule.description, MaintenanceSchedule.technician, MaintenanceSchedule.duration,
+        MaintenanceSchedule.interval_value, MaintenanceSchedule.interval_unit,
+        MaintenanceSchedule.usage_hours_per_day, MaintenanceSchedule.start_date,
+        MaintenanceSchedule.generated_count, MaintenanceSchedule.next_due_date,
+        Equipment.maintenance_team_id
+    ).join(Equipment, Equipment.id == MaintenanceSchedule.equipment_id).where(
+        MaintenanceSchedule.is_active == True,
+        MaintenanceSchedule.next_due_date <= horizon,
+        Equipment.is_scrapped == False
+    ).order_by(MaintenanceSchedule.next_due_date, MaintenanceSchedule.id).limit(SCHEDULE_BATCH_SIZE)
+    if schedule_id is not None:
+        statement = statement.where(MaintenanceSchedule.id == schedule_id)
+
+    result = {"schedules": 0, "requests": 0, "horizon": str(horizon)}
+    while True:
+        schedules = db.execute(statement).all()
+        if not schedules:
+            break
+        result["requests"] += generate_batch(db, schedules, horizon, today)
+        result["schedules"] += len(schedules)
+    if result["requests"]:
+        dashboard_cache.invalidate()
+    return result
+
+def run_scheduler() -> dict:
+    db = SessionLocal()
+    try:
+        return generate_due_requests(db)
+    finally:
+        db.close()
+
+async def pm_scheduler():
+    """Keep the PM horizon materialized, every PM_SCHEDULER_INTERVAL seconds until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(run_scheduler)
+        except Exception as e:
+            print(f"ERROR during preventive maintenance scheduling: {e}")
+        await asyncio.sleep(PM_SCHEDULER_INTERVAL)
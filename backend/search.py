@@ -0,0 +1,157 @@
+"""
+Full-text search over equipment and maintenance requests
+
+Each searchable table has an external-content FTS5 index (equipment_fts,
+maintenance_requests_fts) holding only the tokenized text columns. Triggers
+keep the indexes in step with every insert, update and delete, including
+Core bulk writes, so nothing in the application has to maintain them.
+
+Results are ranked with bm25, weighted towards names and titles, and
+paginated with the usual keyset cursor on (rank, key): key is a number
+unique across both tables (id * 2, plus 1 for requests).
+
+Finding the matches is cheap, scoring them is not: a word that appears in
+every eighth request has 125k matches on a million-row history. Only the
+newest SEARCH_RANK_WINDOW matches of each table are therefore scored, which
+bounds the cost of common queries and favours recent history. Older matches
+are still returned, after all ranked ones, newest first and with rank 0.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, column, literal, literal_column, select, table, text, union_all
+from sqlalchemy.orm import Session
+from backend.pagination import encode_cursor, paginate
+
+# Searchable table -> (result type, indexed columns with their bm25 weights)
+SEARCH_INDEXES = {
+    "equipment": ("equipment", {"name": 10.0, "serial_number": 5.0, "department": 1.0, "location": 1.0}),
+    "maintenance_requests": ("maintenance_request", {"title": 10.0, "description": 1.0}),
+}
+SEARCH_TYPES = [result_type for result_type, _ in SEARCH_INDEXES.values()]
+
+# Terms of a query: words, optionally ending in * for an explicit prefix match
+QUERY_TERM = re.compile(r"(\w+)(\*?)")
+MAX_QUERY_TERMS = 16
+# Newest matches per table that are ranked (0 ranks every match)
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "5000"))
+
+def create_search_indexes(conn):
+    """Create the FTS5 indexes and their triggers, indexing existing rows once"""
+    if conn.dialect.name != "sqlite":
+        return
+    for source, (_, weights) in SEARCH_INDEXES.items():
+        fts = f"{source}_fts"
+        columns = list(weights)
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+        ).first()
+        if not exists:
+            # prefix='2 3' keeps short prefix queries (the common search-as-you-type case) on the index
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{source}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+            conn.execute(text(
+                f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({', '.join(str(w) for w in weights.values())})')"
+            ))
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        # Only changes to indexed columns touch the index (status moves do not)
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+        ))
+
+def match_expression(q: str) -> str:
+    """FTS5 query for free text: every word must match, the last one as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation in the input are
+    treated as plain text.
+    """
+    terms = QUERY_TERM.findall(q)[:MAX_QUERY_TERMS]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    parts = []
+    for i, (word, star) in enumerate(terms):
+        prefix = star or i == len(terms) - 1
+        parts.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+def search_query(db: Session, q: str, result_type: Optional[str] = None, older: bool = False):
+    """Query of (type, id, key, rank) rows matching q, for paginate().
+
+    With older=True the query returns the matches beyond the ranked window
+    instead, or None when every match is ranked.
+    """
+    if result_type is not None and result_type not in SEARCH_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid type. Allowed: {', '.join(SEARCH_TYPES)}")
+    if older and not SEARCH_RANK_WINDOW:
+        return None, None
+    expression = match_expression(q)
+    parts = []
+    for offset, (source, (source_type, _)) in enumerate(SEARCH_INDEXES.items()):
+        if result_type not in (None, source_type):
+            continue
+        fts = table(f"{source}_fts", column("rowid", Integer), column("rank", Float))
+        candidates = select(fts.c.rowid).where(literal_column(fts.name).op("MATCH")(expression))
+        if older:
+            # Older matches are not scored: rank 0 sorts them after every bm25
+            # rank (always negative), and a negated key keeps them newest first
+            candidates = candidates.order_by(fts.c.rowid.desc()).offset(SEARCH_RANK_WINDOW).subquery()
+            key, rank = -(candidates.c.rowid * 2 + offset), literal(0.0, Float)
+        else:
+            candidates = candidates.add_columns(fts.c.rank)
+            if SEARCH_RANK_WINDOW:
+                candidates = candidates.order_by(fts.c.rowid.desc()).limit(SEARCH_RANK_WINDOW)
+            candidates = candidates.subquery()
+            key, rank = candidates.c.rowid * 2 + offset, candidates.c.rank
+        parts.append(select(
+            literal(source_type).label("type"),
+            candidates.c.rowid.label("id"),
+            key.label("key"),
+            rank.label("rank"),
+        ))
+    matches = union_all(*parts).subquery("matches") if len(parts) > 1 else parts[0].subquery("matches")
+    return db.query(matches.c.type, matches.c.id, matches.c.key, matches.c.rank), matches
+
+def search_page(db: Session, q: str, result_type: Optional[str], cursor: Optional[str], limit: int):
+    """One page of (type, id, key, rank) matches, best first, and the next page's cursor.
+
+    The ranked matches are paginated first and the older ones only once they
+    run out, so pages within the window never enumerate the older matches.
+    A cursor into either part works for both: ranked rows all sort before
+    rank 0, older rows all after any negative rank.
+    """
+    query, matches = search_query(db, q, result_type)
+    rows, next_cursor = paginate(query, matches.c.rank, matches.c.key, page_key, cursor, limit)
+    if next_cursor:
+        return rows, next_cursor
+    query, matches = search_query(db, q, result_type, older=True)
+    if query is None:
+        return rows, None
+    if len(rows) == limit:
+        # The page ends with the last ranked match: another page exists if any older one does
+        return rows, encode_cursor(*page_key(rows[-1])) if query.first() else None
+    more, next_cursor = paginate(query, matches.c.rank, matches.c.key, page_key, cursor, limit - len(rows))
+    return rows + more, next_cursor
+
+def page_key(row) -> tuple:
+    return row.rank, row.key
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.database import SessionLocal, init_db
 from backend.models import MaintenanceTeam, Equipment, MaintenanceRequest
+from backend.technicians import migrate_legacy_members
 from datetime import date, datetime, timedelta
 
 def seed_database():
@@ -167,6 +168,8 @@ def seed_database():
         db.add(request4)
         db.add(request5)
         db.commit()
+        # Technicians and team membership from the names above
+        migrate_legacy_members(db)
         
         print("✓ Database seeded successfully!")
         print(f"  - Created {db.query(MaintenanceTeam).count()} teams")
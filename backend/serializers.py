@@ -0,0 +1,56 @@
+"""
+Response serialization
+
+Every API object (equipment, maintenance request, schedule, ...) is
+described once as a RowSerializer: its fields and the columns they are
+read from, in response order. Read routes select exactly those columns, so
+rows come back as plain tuples instead of ORM objects that have to be
+built, tracked and read attribute by attribute, and each row becomes a
+dict with a single zip(). Dates stay date/datetime objects: the JSON
+encoder writes them out (FastAPI's pydantic serializer for regular
+responses, orjson for streamed listings), so no field is formatted in
+Python.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from sqlalchemy.orm import Session
+
+def model_columns(model, *fields: str) -> dict:
+    """Field name -> column of a model, for columns exposed under their own name"""
+    return {field: getattr(model, field) for field in fields}
+
+class RowSerializer:
+    """Fields of one response object and the columns they are selected from"""
+
+    def __init__(self, **columns):
+        self.fields = tuple(columns)
+        self.columns = tuple(column.label(field) for field, column in columns.items())
+        self._columns_by_field = columns
+
+    def extend(self, **columns) -> "RowSerializer":
+        """Serializer with more fields appended, e.g. joined names or counts"""
+        return RowSerializer(**self._columns_by_field, **columns)
+
+    def query(self, db: Session):
+        """Query selecting the columns; its rows go to to_dict()/to_dicts()"""
+        return db.query(*self.columns)
+
+    def to_dict(self, row) -> dict:
+        return dict(zip(self.fields, row))
+
+    def to_dicts(self, rows) -> list:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def from_object(self, obj) -> dict:
+        """Dict of an ORM object already loaded, e.g. one just written"""
+        return {field: getattr(obj, field) for field in self.fields}
+
+def dumps(content) -> bytes:
+    """JSON bytes of dicts, lists and the dates in them"""
+    return orjson.dumps(content)
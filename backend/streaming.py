@@ -0,0 +1,53 @@
+"""
+Streaming list responses
+
+Rows are fetched from the database in batches of STREAM_BATCH_SIZE with
+yield_per and written out as soon as each batch is encoded, so memory use
+stays flat no matter how many rows the list returns. Each batch is turned
+into dicts by the list's RowSerializer and encoded with orjson.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from backend.database import SessionLocal
+from backend.serializers import RowSerializer, dumps
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# ndjson: one JSON object per line; json: a regular JSON array sent in chunks
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+def check_stream_mode(mode: Optional[str]):
+    if mode is not None and mode not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid stream mode. Allowed: ndjson, json")
+
+def encode_rows(statement, serializer: RowSerializer, mode: str):
+    """Yield the rows of a select() of serializer.columns as JSON chunks.
+
+    Opens its own session because the body is produced after the route has
+    returned and its request-scoped session may already be closed.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+        if mode == "json":
+            separator = b"["
+            for rows in result.partitions():
+                # The batch encoded as an array, without its brackets
+                yield separator + dumps(serializer.to_dicts(rows))[1:-1]
+                separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+        else:
+            for rows in result.partitions():
+                yield b"".join(dumps(item) + b"\n" for item in serializer.to_dicts(rows))
+    finally:
+        db.close()
+
+def streaming_response(statement, serializer: RowSerializer, mode: str) -> StreamingResponse:
+    return StreamingResponse(encode_rows(statement, serializer, mode), media_type=STREAM_MEDIA_TYPES[mode])
@@ -0,0 +1,274 @@
+"""
+Change versioning for incremental sync
+
+Every flush that creates, updates or deletes maintenance requests bumps the
+"maintenance_requests" counter in change_versions and stamps the touched rows
+with the new value (deleted rows leave a RequestTombstone), and so does
+renaming equipment or a team, whose names appear on the requests' Kanban
+cards. A client that remembers the last version it saw can then ask only
+for rows with a higher row_version instead of re-downloading the board.
+
+Equipment, teams, technicians and schedules have counters too, bumped by
+every flush that writes them. Committed counters are mirrored in memory by
+table_versions, which lets conditional GETs (see conditional.py) answer
+without a query. Core writes of requests go through stamp_bulk_rows,
+which also does the other request hooks' work; other Core writes call
+next_version themselves. In the workers of run.py --production, writes
+committed by other processes are picked up by polling change_versions (see
+invalidation.py); table_versions then also remembers which versions this
+process wrote itself, so the poller only acts on the others.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import event, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from backend.analytics import ROLLUP_FIELDS, mark_dirty_days
+from backend.events import queue_events
+from backend.history import TRACKED_FIELDS, event_row, log_events
+from backend.models import (
+    ChangeVersion, Equipment, MaintenanceRequest, MaintenanceSchedule, MaintenanceTeam, RequestTombstone, Technician,
+    CLOSED_STATUSES
+)
+
+# Models whose table version is bumped by every flush that writes them
+VERSIONED_MODELS = (Equipment, MaintenanceTeam, Technician, MaintenanceSchedule)
+# Kanban cards carry the names of their equipment and team, so renaming one
+# stamps its requests with a new version and delta sync re-sends them
+NAMED_PARENTS = {Equipment: MaintenanceRequest.equipment_id, MaintenanceTeam: MaintenanceRequest.team_id}
+
+class TableVersions:
+    """In-memory copy of the committed change versions.
+
+    Loaded once at startup and advanced after each commit that bumped a
+    counter, so readers get the current versions without touching the
+    database. get() returns None until load() has run.
+    """
+
+    def __init__(self):
+        self._versions = None
+        # Set by track_local(): versions up to which other processes' writes
+        # were applied, and versions above that written by this process
+        self._synced = None
+        self._local = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        versions = dict(db.execute(select(ChangeVersion.name, ChangeVersion.version)).all())
+        with self._lock:
+            self._versions = versions
+            if self._synced is not None:
+                self._synced = dict(versions)
+
+    def track_local(self):
+        """Remember the versions this process writes, for refresh()"""
+        with self._lock:
+            self._synced = dict(self._versions or {})
+            self._local = {}
+
+    def claim(self, name: str, version: int):
+        """Note a version handed out to a write of this process, before it commits"""
+        with self._lock:
+            if self._local is not None:
+                self._local.setdefault(name, set()).add(version)
+
+    def release(self, versions: list):
+        """Forget the (table, version) pairs of a write that was rolled back; they will be handed out again"""
+        with self._lock:
+            if self._local is not None:
+                for name, version in versions:
+                    self._local.get(name, set()).discard(version)
+
+    def advance(self, versions: dict):
+        with self._lock:
+            if self._versions is None:
+                return
+            for name, version in versions.items():
+                if version > self._versions.get(name, 0):
+                    self._versions[name] = version
+
+    def refresh(self, db: Session) -> dict:
+        """Catch up with the versions committed by other processes.
+
+        Returns {table: [(first, last), ...]} with the ranges of versions
+        written elsewhere since the last refresh, for the tables that have
+        any. Needs track_local().
+        """
+        versions = dict(db.execute(select(ChangeVersion.name, ChangeVersion.version)).all())
+        changed = {}
+        with self._lock:
+            if self._versions is None or self._synced is None:
+                return changed
+            for name, version in versions.items():
+                synced = self._synced.get(name, 0)
+                if version <= synced:
+                    continue
+                local = self._local.get(name, set())
+                ranges = []
+                for v in range(synced + 1, version + 1):
+                    if v in local:
+                        continue
+                    if ranges and ranges[-1][1] == v - 1:
+                        ranges[-1] = (ranges[-1][0], v)
+                    else:
+                        ranges.append((v, v))
+                local.difference_update(range(synced + 1, version + 1))
+                self._synced[name] = version
+                if version > self._versions.get(name, 0):
+                    self._versions[name] = version
+                if ranges:
+                    changed[name] = ranges
+        return changed
+
+    def get(self, names: Iterable[str]) -> Optional[tuple]:
+        with self._lock:
+            if self._versions is None:
+                return None
+            return tuple(self._versions.get(name, 0) for name in names)
+
+table_versions = TableVersions()
+
+def current_version(db: Session, name: str) -> int:
+    """Latest change version of a table (0 if it was never written)"""
+    version = db.execute(select(ChangeVersion.version).where(ChangeVersion.name == name)).scalar()
+    return version or 0
+
+def next_version(db: Session, name: str) -> int:
+    """Increment and return the change version of a table.
+
+    Runs inside the caller's transaction, so concurrent writers serialize on
+    the counter row and versions follow commit order.
+    """
+    conn = db.connection()
+    result = conn.execute(
+        update(ChangeVersion).where(ChangeVersion.name == name).values(version=ChangeVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(ChangeVersion).values(name=name, version=1))
+        version = 1
+    else:
+        version = conn.execute(select(ChangeVersion.version).where(ChangeVersion.name == name)).scalar_one()
+    # Published to table_versions once the transaction commits
+    db.info.setdefault("pending_versions", {})[name] = version
+    # A transaction may take several versions of a table, one per flush
+    db.info.setdefault("claimed_versions", []).append((name, version))
+    table_versions.claim(name, version)
+    return version
+
+def stamp_bulk_rows(db: Session, rows: list, current: Optional[dict] = None, loads_applied: bool = False) -> int:
+    """Do for maintenance request rows written with Core what the flush hooks do for objects.
+
+    rows are the parameter dicts of an executemany INSERT, or of an UPDATE
+    by "id" when current maps each id to the row as read before the write.
+    Every row gets a new version; rows that write a status or scheduled date
+    get the overdue flag and completion time. Updates log their history and
+    mark the rolled-up days they touch dirty. After commit the changes reach
+    live subscribers and the assignment engine reloads its loads, unless the
+    caller says it already applied them. Returns the version.
+    """
+    # Both modules import next_version from here
+    from backend.assignment import queue_reload
+    from backend.overdue import is_overdue_on
+
+    version = next_version(db, MaintenanceRequest.__tablename__)
+    now = datetime.utcnow()
+    today = now.date()
+    history, days = [], set()
+    for row in rows:
+        old = current[row["id"]] if current is not None else None
+        row["row_version"] = version
+        if "status" in row or "scheduled_date" in row:
+            status = row.get("status", old.status if old else None) or "New"
+            scheduled_date = row["scheduled_date"] if "scheduled_date" in row else old.scheduled_date
+            row["is_overdue"] = is_overdue_on(status, scheduled_date, today)
+        if "status" in row and "completed_at" not in row:
+            # Only a change of status opens or closes a request
+            closed = (row["status"] or "New") in CLOSED_STATUSES
+            if old is not None and closed == ((old.status or "New") in CLOSED_STATUSES):
+                row["completed_at"] = old.completed_at
+            else:
+                row["completed_at"] = now if closed else None
+        if old is None:
+            # New requests only affect today, which is never rolled up yet
+            continue
+        history.extend(
+            event_row(row["id"], field, getattr(old, field), row[field], now)
+            for field in TRACKED_FIELDS if field in row and row[field] != getattr(old, field)
+        )
+        if any(field in row and row[field] != getattr(old, field, None) for field in ROLLUP_FIELDS):
+            days.update(value.date() for value in (old.created_at, old.completed_at) if value and value.date() < today)
+
+    if current is None:
+        queue_events(db, [("maintenance_request", "reload", None, {row["team_id"] for row in rows})])
+    else:
+        queue_events(db, [("maintenance_request", "updated", row["id"], {current[row["id"]].team_id}) for row in rows])
+    log_events(db, history)
+    mark_dirty_days(db, days)
+    if not loads_applied:
+        queue_reload(db)
+    return version
+
+@event.listens_for(Session, "before_flush")
+def stamp_request_versions(session, flush_context, instances):
+    """Stamp maintenance requests written in this flush with a new version"""
+    changed = [obj for obj in session.new if isinstance(obj, MaintenanceRequest)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, MaintenanceRequest) and session.is_modified(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, MaintenanceRequest)]
+    if not changed and not deleted:
+        return
+
+    version = next_version(session, MaintenanceRequest.__tablename__)
+    for obj in changed:
+        obj.row_version = version
+    for obj in deleted:
+        session.add(RequestTombstone(request_id=obj.id, team_id=obj.team_id, row_version=version))
+
+@event.listens_for(Session, "before_flush")
+def stamp_renamed_parents(session, flush_context, instances):
+    """Stamp the requests of equipment and teams renamed in this flush with a new version"""
+    conditions = [
+        NAMED_PARENTS[type(obj)] == obj.id for obj in session.dirty
+        if type(obj) in NAMED_PARENTS and inspect(obj).attrs.name.history.has_changes()
+    ]
+    if not conditions:
+        return
+    version = next_version(session, MaintenanceRequest.__tablename__)
+    session.connection().execute(update(MaintenanceRequest).where(or_(*conditions)).values(row_version=version))
+
+@event.listens_for(Session, "before_flush")
+def bump_table_versions(session, flush_context, instances):
+    """Bump the version of every other versioned table written in this flush"""
+    written = {obj.__tablename__ for obj in session.new if isinstance(obj, VERSIONED_MODELS)}
+    written |= {obj.__tablename__ for obj in session.deleted if isinstance(obj, VERSIONED_MODELS)}
+    written |= {
+        obj.__tablename__ for obj in session.dirty
+        if isinstance(obj, VERSIONED_MODELS) and session.is_modified(obj)
+    }
+    for name in sorted(written):
+        next_version(session, name)
+
+@event.listens_for(Session, "after_commit")
+def publish_versions(session):
+    session.info.pop("claimed_versions", None)
+    versions = session.info.pop("pending_versions", None)
+    if versions:
+        table_versions.advance(versions)
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_versions(session, transaction):
+    # Still pending when the outermost transaction ends: it was rolled back or
+    # closed without a commit, and those versions may be handed out again
+    if transaction.parent is None:
+        session.info.pop("pending_versions", None)
+        claimed = session.info.pop("claimed_versions", None)
+        if claimed:
+            table_versions.release(claimed)
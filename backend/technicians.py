@@ -0,0 +1,110 @@
+"""
+Technicians and team membership
+
+Teams keep their comma-separated members text and requests their free-form
+technician name as entered, but both are resolved to rows of the
+technicians table: team_members links teams to technicians and
+MaintenanceRequest.technician_id points at the assigned technician, so
+per-technician questions are answered by index lookups instead of string
+matching.
+
+migrate_legacy_members() backfills both for data written before the
+technicians table existed.
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Iterable, Optional
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session
+from backend.models import MaintenanceTeam, MaintenanceRequest, Technician, team_members
+from backend.sync import next_version
+
+# Names looked up per IN (...) query, below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+def parse_members(members: Optional[str]) -> list:
+    """Distinct, non-empty names from a comma-separated members string, in order"""
+    names = []
+    for name in (members or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def lookup_technicians(db: Session, names: Iterable[str]) -> dict:
+    """Map the names that belong to existing technicians to their ids"""
+    names = sorted(names)
+    ids = {}
+    for i in range(0, len(names), LOOKUP_CHUNK_SIZE):
+        chunk = names[i:i + LOOKUP_CHUNK_SIZE]
+        ids.update(db.execute(select(Technician.name, Technician.id).where(Technician.name.in_(chunk))).all())
+    return ids
+
+def ensure_technicians(db: Session, names: Iterable[str]) -> dict:
+    """Map each name to its technician id, creating the missing technicians"""
+    names = {name.strip() for name in names if name and name.strip()}
+    ids = lookup_technicians(db, names)
+    missing = names - ids.keys()
+    if missing:
+        next_version(db, Technician.__tablename__)
+        # OR IGNORE: a concurrent writer may have created some of them already
+        db.execute(insert(Technician).prefix_with("OR IGNORE", dialect="sqlite"), [{"name": name} for name in sorted(missing)])
+        ids.update(lookup_technicians(db, missing))
+    return ids
+
+def technician_id_for(db: Session, name: Optional[str]) -> Optional[int]:
+    """Technician id for a request's technician name (None for no technician)"""
+    if not name or not name.strip():
+        return None
+    return ensure_technicians(db, [name])[name.strip()]
+
+def set_team_members(db: Session, team: MaintenanceTeam, members: Optional[str]):
+    """Replace a team's technicians with the ones named in members"""
+    ids = ensure_technicians(db, parse_members(members))
+    team.technicians = db.query(Technician).filter(Technician.id.in_(ids.values())).all() if ids else []
+
+def migrate_legacy_members(db: Session) -> dict:
+    """Backfill team_members and technician_id from the text fields.
+
+    Only touches teams without any membership rows and requests without a
+    technician_id, so running it again is cheap and changes nothing.
+    """
+    teams = db.execute(
+        select(MaintenanceTeam.id, MaintenanceTeam.members).where(
+            MaintenanceTeam.members.isnot(None),
+            ~exists().where(team_members.c.team_id == MaintenanceTeam.id)
+        )
+    ).all()
+    team_names = {team_id: parse_members(members) for team_id, members in teams}
+    request_names = db.execute(
+        select(MaintenanceRequest.technician).distinct().where(
+            MaintenanceRequest.technician_id.is_(None), func.trim(MaintenanceRequest.technician) != ""
+        )
+    ).scalars().all()
+
+    ids = ensure_technicians(db, [name for names in team_names.values() for name in names] + list(request_names))
+    links = [
+        {"team_id": team_id, "technician_id": ids[name]}
+        for team_id, names in team_names.items() for name in names
+    ]
+    if links:
+        next_version(db, Technician.__tablename__)
+        db.execute(insert(team_members), links)
+
+    assigned = 0
+    if request_names:
+        version = next_version(db, MaintenanceRequest.__tablename__)
+        assigned = db.execute(
+            update(MaintenanceRequest).where(
+                MaintenanceRequest.technician_id.is_(None), func.trim(MaintenanceRequest.technician) != ""
+            ).values(
+                technician_id=select(Technician.id).where(Technician.name == func.trim(MaintenanceRequest.technician)).scalar_subquery(),
+                row_version=version
+            )
+        ).rowcount
+    db.commit()
+    return {"team_members": len(links), "requests": assigned}
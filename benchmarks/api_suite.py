@@ -0,0 +1,379 @@
+"""
+Benchmark suite for the GearGuard API
+Drives every route of the API in-process against a synthetic database and
+reports p50/p95/p99 latency, throughput and SQL statements per call for each
+endpoint. The one exception is the /api/events stream, which never ends and
+so cannot be read through the in-process client.
+
+Run from the project root:
+    python benchmarks/api_suite.py                       # small generated dataset
+    python benchmarks/api_suite.py --teams 10000 --equipment-per-team 5 --requests-per-equipment 20
+    python benchmarks/api_suite.py --output results.json
+    python benchmarks/api_suite.py --baseline results.json   # exit 1 on regressions
+
+Data is generated into a temporary database unless --database points at an
+existing one. Every run uses the same --seed, so numbers are comparable
+between commits on the same machine.
+"""
+import sys
+import os
+import argparse
+import json
+import math
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Latency increases below this many milliseconds are treated as noise
+NOISE_FLOOR_MS = 1.0
+# Equipment ids meter readings are sent for, so series queries find points
+METERED_EQUIPMENT = 10
+
+class Context:
+    """Shared state for building scenario requests"""
+
+    def __init__(self, rng, counts):
+        self.rng = rng
+        self.teams = counts["teams"]
+        self.equipment = counts["equipment"]
+        self.requests = counts["requests"]
+        self.technicians = counts["technicians"]
+        self.created = {"equipment": [], "teams": [], "requests": [], "schedules": [], "meter_rules": []}
+        self.sequence = 0
+        self.kanban_version = 0
+
+    def next_id(self):
+        self.sequence += 1
+        return self.sequence
+
+    def team_id(self):
+        return self.rng.randint(1, self.teams)
+
+    def equipment_id(self):
+        return self.rng.randint(1, self.equipment)
+
+    def request_id(self):
+        return self.rng.randint(1, self.requests)
+
+    def technician_id(self):
+        return self.rng.randint(1, self.technicians)
+
+    def metered_equipment_id(self):
+        return self.rng.randint(1, min(METERED_EQUIPMENT, self.equipment))
+
+def equipment_payload(ctx):
+    n = ctx.next_id()
+    return {
+        "name": f"Bench asset {n}",
+        "serial_number": f"BENCH-{os.getpid()}-{n}",
+        "department": "Production",
+        "location": "Bench hall",
+        "purchase_date": "2022-01-01",
+        "maintenance_team_id": ctx.team_id(),
+    }
+
+def request_payload(ctx):
+    return {
+        "title": "Bench request",
+        "description": "Created by the benchmark suite",
+        "equipment_id": ctx.equipment_id(),
+        "request_type": ctx.rng.choice(["Corrective", "Preventive"]),
+        "scheduled_date": "2026-01-15",
+        "duration": 2,
+    }
+
+def schedule_payload(ctx):
+    return {
+        "equipment_id": ctx.equipment_id(),
+        "title": "Bench inspection",
+        "duration": 1,
+        "interval_value": ctx.rng.randint(2, 8),
+        "interval_unit": "weeks",
+    }
+
+def readings_payload(ctx, count=100):
+    now = datetime.utcnow()
+    return [
+        {
+            "equipment_id": ctx.metered_equipment_id(),
+            "meter": "temperature",
+            "ts": (now - timedelta(seconds=ctx.rng.randint(0, 7 * 86400))).isoformat(),
+            "value": round(ctx.rng.uniform(20, 90), 1),
+        }
+        for _ in range(count)
+    ]
+
+def batch_payload(ctx, count=100):
+    ids = ctx.rng.sample(range(1, ctx.requests + 1), min(count, ctx.requests))
+    return {"updates": [
+        {"id": request_id, "status": ctx.rng.choice(["New", "In Progress", "Repaired"]), "scheduled_date": "2026-02-01"}
+        for request_id in ids
+    ]}
+
+def jsonl(rows):
+    return "\n".join(json.dumps(row) for row in rows)
+
+def remember(kind):
+    """After-hook storing the id of a created row for later update/delete calls"""
+    def hook(ctx, response):
+        ctx.created[kind].append(response.json()["id"])
+    return hook
+
+def created_id(ctx, kind, create):
+    """Pop a row created by an earlier scenario (or create one unmeasured)"""
+    if not ctx.created[kind]:
+        create(ctx)
+    return ctx.created[kind].pop()
+
+def existing_id(ctx, kind, create):
+    """Any row created by an earlier scenario, left in place"""
+    if not ctx.created[kind]:
+        create(ctx)
+    return ctx.rng.choice(ctx.created[kind])
+
+def build_scenarios(client, heavy_iterations):
+    """(name, build(ctx) -> (method, url, request kwargs), after hook, iterations)"""
+    from backend.cache import dashboard_cache
+
+    def create_unmeasured(kind, path, payload):
+        def create(ctx):
+            ctx.created[kind].append(client.post(path, json=payload(ctx)).json()["id"])
+        return create
+
+    new_equipment = create_unmeasured("equipment", "/api/equipment", equipment_payload)
+    new_team = create_unmeasured("teams", "/api/teams", lambda ctx: {"name": f"Bench team {os.getpid()}-{ctx.next_id()}", "members": "A, B"})
+    new_request = create_unmeasured("requests", "/api/maintenance-requests", request_payload)
+    new_schedule = create_unmeasured("schedules", "/api/schedules", schedule_payload)
+    new_meter_rule = create_unmeasured("meter_rules", "/api/meter-rules", lambda ctx: {
+        "equipment_id": ctx.metered_equipment_id(), "meter": "temperature", "max_value": 100.0,
+    })
+
+    def uncached_dashboard(ctx):
+        dashboard_cache.invalidate()
+        return "GET", "/", {}
+
+    def kanban_since(ctx):
+        return "GET", f"/api/kanban?since={ctx.kanban_version}&team_id={ctx.team_id()}", {}
+
+    def store_kanban_version(ctx, response):
+        ctx.kanban_version = response.json()["version"]
+
+    def second_page(ctx):
+        cursor = client.get("/api/maintenance-requests?limit=100&sort=scheduled_date").headers.get("x-next-cursor", "")
+        return "GET", f"/api/maintenance-requests?limit=100&sort=scheduled_date&cursor={cursor}", {}
+
+    return [
+        # Equipment
+        ("GET /api/equipment", lambda ctx: ("GET", "/api/equipment?limit=100", {}), None, None),
+        ("GET /api/equipment?team_id", lambda ctx: ("GET", f"/api/equipment?team_id={ctx.team_id()}", {}), None, None),
+        ("GET /api/equipment/{id}", lambda ctx: ("GET", f"/api/equipment/{ctx.equipment_id()}", {}), None, None),
+        ("POST /api/equipment", lambda ctx: ("POST", "/api/equipment", {"json": equipment_payload(ctx)}), remember("equipment"), None),
+        ("PUT /api/equipment/{id}", lambda ctx: ("PUT", f"/api/equipment/{ctx.equipment_id()}", {"json": {"location": f"Bay {ctx.next_id()}"}}), None, None),
+        ("DELETE /api/equipment/{id}", lambda ctx: ("DELETE", f"/api/equipment/{created_id(ctx, 'equipment', new_equipment)}", {}), None, None),
+        ("POST /api/equipment/bulk (100 rows)", lambda ctx: ("POST", "/api/equipment/bulk", {
+            "content": jsonl(equipment_payload(ctx) for _ in range(100)),
+            "headers": {"content-type": "application/x-ndjson"},
+        }), None, None),
+        ("GET /api/equipment/export", lambda ctx: ("GET", "/api/equipment/export?format=jsonl", {}), None, heavy_iterations),
+        # Teams
+        ("GET /api/teams", lambda ctx: ("GET", "/api/teams", {}), None, None),
+        ("GET /api/teams/{id}", lambda ctx: ("GET", f"/api/teams/{ctx.team_id()}", {}), None, None),
+        ("POST /api/teams", lambda ctx: ("POST", "/api/teams", {"json": {"name": f"Bench team {os.getpid()}-{ctx.next_id()}", "members": "A, B"}}), remember("teams"), None),
+        ("PUT /api/teams/{id}", lambda ctx: ("PUT", f"/api/teams/{ctx.team_id()}", {"json": {"members": "A, B, C"}}), None, None),
+        ("DELETE /api/teams/{id}", lambda ctx: ("DELETE", f"/api/teams/{created_id(ctx, 'teams', new_team)}", {}), None, None),
+        # Technicians
+        ("GET /api/technicians?team_id", lambda ctx: ("GET", f"/api/technicians?team_id={ctx.team_id()}", {}), None, None),
+        ("GET /api/technicians/{id}/workload", lambda ctx: ("GET", f"/api/technicians/{ctx.technician_id()}/workload", {}), None, None),
+        ("PUT /api/technicians/{id}", lambda ctx: ("PUT", f"/api/technicians/{ctx.technician_id()}", {"json": {"skills": ctx.rng.choice(["hydraulics", "electrical, hydraulics"])}}), None, None),
+        # Maintenance requests
+        ("GET /api/maintenance-requests", lambda ctx: ("GET", "/api/maintenance-requests?limit=100", {}), None, None),
+        ("GET /api/maintenance-requests (page 2)", second_page, None, None),
+        ("GET /api/maintenance-requests?status&team_id", lambda ctx: ("GET", f"/api/maintenance-requests?status=New&team_id={ctx.team_id()}", {}), None, None),
+        ("GET /api/maintenance-requests?is_overdue", lambda ctx: ("GET", "/api/maintenance-requests?is_overdue=true&limit=100", {}), None, None),
+        ("GET /api/maintenance-requests/overdue", lambda ctx: ("GET", "/api/maintenance-requests/overdue?limit=100", {}), None, None),
+        ("GET /api/maintenance-requests/{id}", lambda ctx: ("GET", f"/api/maintenance-requests/{ctx.request_id()}", {}), None, None),
+        ("POST /api/maintenance-requests", lambda ctx: ("POST", "/api/maintenance-requests", {"json": request_payload(ctx)}), remember("requests"), None),
+        ("PUT /api/maintenance-requests/{id}", lambda ctx: ("PUT", f"/api/maintenance-requests/{ctx.request_id()}", {"json": {"status": ctx.rng.choice(["New", "In Progress", "Repaired"])}}), None, None),
+        ("DELETE /api/maintenance-requests/{id}", lambda ctx: ("DELETE", f"/api/maintenance-requests/{created_id(ctx, 'requests', new_request)}", {}), None, None),
+        ("POST /api/maintenance-requests/bulk (100 rows)", lambda ctx: ("POST", "/api/maintenance-requests/bulk", {
+            "content": jsonl(request_payload(ctx) for _ in range(100)),
+            "headers": {"content-type": "application/x-ndjson"},
+        }), None, None),
+        ("GET /api/maintenance-requests?stream=ndjson", lambda ctx: ("GET", "/api/maintenance-requests?stream=ndjson", {}), None, heavy_iterations),
+        ("GET /api/maintenance-requests/export", lambda ctx: ("GET", "/api/maintenance-requests/export?format=jsonl", {}), None, heavy_iterations),
+        ("PATCH /api/maintenance-requests/batch (100 rows)", lambda ctx: ("PATCH", "/api/maintenance-requests/batch", {"json": batch_payload(ctx)}), None, None),
+        ("POST /api/maintenance-requests/assign", lambda ctx: ("POST", f"/api/maintenance-requests/assign?team_id={ctx.team_id()}", {}), None, None),
+        ("GET /api/maintenance-requests/{id}/history", lambda ctx: ("GET", f"/api/maintenance-requests/{ctx.request_id()}/history", {}), None, None),
+        # Preventive maintenance schedules
+        ("POST /api/schedules", lambda ctx: ("POST", "/api/schedules", {"json": schedule_payload(ctx)}), remember("schedules"), None),
+        ("GET /api/schedules", lambda ctx: ("GET", "/api/schedules?limit=100", {}), None, None),
+        ("GET /api/schedules/{id}", lambda ctx: ("GET", f"/api/schedules/{existing_id(ctx, 'schedules', new_schedule)}", {}), None, None),
+        ("PUT /api/schedules/{id}", lambda ctx: ("PUT", f"/api/schedules/{existing_id(ctx, 'schedules', new_schedule)}", {"json": {"duration": ctx.rng.randint(1, 4)}}), None, None),
+        ("POST /api/schedules/generate", lambda ctx: ("POST", "/api/schedules/generate", {}), None, None),
+        ("DELETE /api/schedules/{id}", lambda ctx: ("DELETE", f"/api/schedules/{created_id(ctx, 'schedules', new_schedule)}", {}), None, None),
+        # Meters
+        ("POST /api/meter-readings (100 rows)", lambda ctx: ("POST", "/api/meter-readings", {
+            "content": jsonl(readings_payload(ctx)),
+            "headers": {"content-type": "application/x-ndjson"},
+        }), None, None),
+        ("GET /api/equipment/{id}/readings", lambda ctx: ("GET", f"/api/equipment/{ctx.metered_equipment_id()}/readings?meter=temperature", {}), None, None),
+        ("GET /api/equipment/{id}/readings?resolution=hour", lambda ctx: ("GET", f"/api/equipment/{ctx.metered_equipment_id()}/readings?meter=temperature&resolution=hour", {}), None, None),
+        ("GET /api/equipment/{id}/meters", lambda ctx: ("GET", f"/api/equipment/{ctx.metered_equipment_id()}/meters", {}), None, None),
+        ("POST /api/meter-rules", lambda ctx: ("POST", "/api/meter-rules", {"json": {
+            "equipment_id": ctx.metered_equipment_id(), "meter": "temperature", "max_value": 100.0,
+        }}), remember("meter_rules"), None),
+        ("GET /api/meter-rules", lambda ctx: ("GET", "/api/meter-rules", {}), None, None),
+        ("DELETE /api/meter-rules/{id}", lambda ctx: ("DELETE", f"/api/meter-rules/{created_id(ctx, 'meter_rules', new_meter_rule)}", {}), None, None),
+        # Search and analytics
+        ("GET /api/search (selective)", lambda ctx: ("GET", f"/api/search?q=SN-{ctx.equipment_id():08d}", {}), None, None),
+        ("GET /api/search (common words)", lambda ctx: ("GET", "/api/search?q=hydraulic leak", {}), None, None),
+        ("GET /api/analytics/reliability", lambda ctx: ("GET", "/api/analytics/reliability", {}), None, None),
+        ("GET /api/analytics/volume", lambda ctx: ("GET", f"/api/analytics/volume?group_by={ctx.rng.choice(['department', 'team', 'month'])}", {}), None, None),
+        ("POST /api/analytics/refresh", lambda ctx: ("POST", "/api/analytics/refresh", {}), None, None),
+        # Background jobs and service endpoints
+        ("GET /api/jobs", lambda ctx: ("GET", "/api/jobs", {}), None, None),
+        ("POST /api/jobs/retry", lambda ctx: ("POST", "/api/jobs/retry", {}), None, None),
+        ("GET /api/health", lambda ctx: ("GET", "/api/health", {}), None, None),
+        ("GET /api/metrics", lambda ctx: ("GET", "/api/metrics", {}), None, None),
+        # Boards and pages
+        ("GET /api/calendar (month)", lambda ctx: ("GET", "/api/calendar?start=2026-01-01&end=2026-01-31", {}), None, None),
+        ("GET /api/kanban?team_id", lambda ctx: ("GET", f"/api/kanban?team_id={ctx.team_id()}", {}), store_kanban_version, None),
+        ("GET /api/kanban?since", kanban_since, store_kanban_version, None),
+        ("GET / (dashboard, cached)", lambda ctx: ("GET", "/", {}), None, None),
+        ("GET / (dashboard, uncached)", uncached_dashboard, None, None),
+        ("GET /equipment", lambda ctx: ("GET", "/equipment", {}), None, None),
+        ("GET /kanban", lambda ctx: ("GET", "/kanban", {}), None, None),
+        ("GET /calendar", lambda ctx: ("GET", "/calendar", {}), None, None),
+    ]
+
+def percentile(sorted_values, p):
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def run_scenario(client, ctx, statements, build, after, iterations, warmup):
+    latencies = []
+    queries = []
+    for n in range(warmup + iterations):
+        method, url, kwargs = build(ctx)
+        statements[0] = 0
+        start = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        if after:
+            after(ctx, response)
+        if n >= warmup:
+            latencies.append(elapsed)
+            queries.append(statements[0])
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": iterations / sum(latencies),
+        "queries": sum(queries) / len(queries),
+    }
+
+def compare(results, baseline, tolerance):
+    """Names and reasons of endpoints that regressed against baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit and current["p95_ms"] - previous["p95_ms"] > NOISE_FLOOR_MS:
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries {previous['queries']:.1f} -> {current['queries']:.1f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every GearGuard API route in-process")
+    parser.add_argument("--database", help="Existing database URL to benchmark (generated when empty)")
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--equipment-per-team", type=int, default=10)
+    parser.add_argument("--requests-per-equipment", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--heavy-iterations", type=int, default=3, help="Iterations for full-table streams and exports")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 increase over the baseline")
+    args = parser.parse_args()
+
+    # The engine is created on import, so the URL has to be set first
+    os.environ["DATABASE_URL"] = args.database or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    import warnings
+    warnings.filterwarnings("ignore")
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from backend.database import SessionLocal, engine, async_engine, init_db
+    from backend.models import MaintenanceTeam, Equipment, MaintenanceRequest, Technician
+    from backend.main import app
+    from datagen import generate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if db.query(MaintenanceTeam.id).first() is None:
+            start = time.perf_counter()
+            generate(db, args.teams, args.equipment_per_team, args.requests_per_equipment, args.seed)
+            print(f"Generated data in {time.perf_counter() - start:.1f}s")
+        counts = {
+            "teams": db.query(MaintenanceTeam).count(),
+            "equipment": db.query(Equipment).count(),
+            "requests": db.query(MaintenanceRequest).count(),
+            "technicians": db.query(Technician).count(),
+        }
+    finally:
+        db.close()
+    print(f"Dataset: {counts['teams']} teams, {counts['equipment']} equipment, {counts['requests']} requests")
+
+    statements = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    ctx = Context(random.Random(args.seed), counts)
+    results = {}
+    print(f"{'endpoint':<48} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'queries':>8}")
+    with TestClient(app) as client:
+        for name, build, after, iterations in build_scenarios(client, args.heavy_iterations):
+            if args.only and args.only not in name:
+                continue
+            result = run_scenario(client, ctx, statements, build, after, iterations or args.iterations, args.warmup)
+            results[name] = result
+            print(f"{name:<48} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                  f"{result['throughput']:>9.1f} {result['queries']:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"dataset": counts, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n✓ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark for technician auto-assignment
+Generates a dataset, takes the technician off a share of the open requests
+and times POST /api/maintenance-requests/assign's batch path putting them
+back, reported as assignments per second.
+
+Run from the project root:
+    python benchmarks/assignment.py --teams 200 --unassigned 20000
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark technician auto-assignment")
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--equipment-per-team", type=int, default=25)
+    parser.add_argument("--requests-per-equipment", type=int, default=10)
+    parser.add_argument("--unassigned", type=int, default=20000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gearguard-assign-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from sqlalchemy import select, update
+    from backend.database import SessionLocal, init_db
+    from backend.models import MaintenanceRequest, OPEN_STATUSES
+    from backend.assignment import assign_unassigned, assignment_engine, MAX_ASSIGN_BATCH
+    from datagen import generate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        counts = generate(db, args.teams, args.equipment_per_team, args.requests_per_equipment)
+        ids = db.execute(
+            select(MaintenanceRequest.id).where(MaintenanceRequest.status.in_(OPEN_STATUSES)).limit(args.unassigned)
+        ).scalars().all()
+        db.execute(update(MaintenanceRequest), [{"id": i, "technician": None, "technician_id": None} for i in ids])
+        db.commit()
+        assignment_engine.reset()
+
+        print(f"{counts['requests']} requests, {counts['technicians']} technicians, {len(ids)} unassigned")
+        assigned = 0
+        start = time.perf_counter()
+        while True:
+            result = assign_unassigned(db, limit=MAX_ASSIGN_BATCH)
+            assigned += result["assigned"]
+            if result["assigned"] == 0 or result["unassigned"] + result["assigned"] < MAX_ASSIGN_BATCH:
+                break
+        elapsed = time.perf_counter() - start
+        print(f"  assigned {assigned} in {elapsed:.2f}s  ({assigned / elapsed:,.0f}/s, index load included)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Load benchmark: sync (threadpool) vs async (aiosqlite) database layer
+Drives the read endpoints with 50 and 200 concurrent in-process clients in
+both USE_ASYNC_DB modes and reports throughput and latency percentiles.
+
+Each mode runs in its own subprocess because the database layer is chosen
+when backend.database is imported.
+
+Run from the project root:
+    python benchmarks/async_load.py
+"""
+import sys
+import os
+import asyncio
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLIENT_COUNTS = [50, 200]
+DURATION_SECONDS = 10
+EQUIPMENT_ROWS = 500
+REQUESTS_PER_EQUIPMENT = 10
+ENDPOINTS = [
+    "/api/equipment?limit=50",
+    "/api/maintenance-requests?limit=100&status=New",
+    "/api/kanban?since=0",
+    "/api/teams",
+]
+
+def seed(db):
+    """Fill the benchmark database with synthetic rows"""
+    from datetime import date, timedelta
+    from backend.models import MaintenanceTeam, Equipment, MaintenanceRequest
+
+    team = MaintenanceTeam(name="Load Team", members="Tech A, Tech B")
+    db.add(team)
+    db.commit()
+    db.bulk_insert_mappings(Equipment, [
+        {
+            "name": f"Asset {i}",
+            "serial_number": f"LOAD-{i:06d}",
+            "department": "Production",
+            "location": "Plant 1",
+            "purchase_date": date(2020, 1, 1),
+            "maintenance_team_id": team.id,
+            "is_scrapped": False,
+        }
+        for i in range(EQUIPMENT_ROWS)
+    ])
+    equipment_ids = [eq_id for (eq_id,) in db.query(Equipment.id).all()]
+    statuses = ["New", "In Progress", "Repaired", "Scrap"]
+    today = date.today()
+    db.bulk_insert_mappings(MaintenanceRequest, [
+        {
+            "title": f"Request {n}",
+            "equipment_id": eq_id,
+            "team_id": team.id,
+            "request_type": "Preventive" if n % 2 else "Corrective",
+            "status": statuses[n % len(statuses)],
+            "scheduled_date": today + timedelta(days=n - 5),
+        }
+        for eq_id in equipment_ids
+        for n in range(REQUESTS_PER_EQUIPMENT)
+    ])
+    db.commit()
+
+async def drive(app, clients: int) -> dict:
+    """Run `clients` concurrent request loops for DURATION_SECONDS"""
+    import httpx
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + DURATION_SECONDS
+
+    async def client_loop(client, offset):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(ENDPOINTS[i % len(ENDPOINTS)])
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+            i += 1
+
+    # Unhandled errors (e.g. pool checkout timeouts) count as failed requests
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, n) for n in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+    }
+
+def run_worker(clients: int):
+    """Benchmark one mode/concurrency pair; prints a JSON result line"""
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from backend.database import SessionLocal, init_db, async_engine
+    from backend.main import app
+
+    init_db()
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+
+    async def main():
+        try:
+            return await drive(app, clients)
+        finally:
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    print(json.dumps(asyncio.run(main())))
+
+def run_benchmark():
+    """Run every mode/concurrency pair in a subprocess and print a table"""
+    print(f"{'mode':>6} {'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ["sync", "async"]:
+        for clients in CLIENT_COUNTS:
+            # Every run gets its own database file
+            database_path = os.path.join(tempfile.mkdtemp(), "load.db")
+            env = dict(
+                os.environ,
+                USE_ASYNC_DB="1" if mode == "async" else "0",
+                DATABASE_URL=f"sqlite:///{database_path}",
+            )
+            env.pop("ASYNC_DATABASE_URL", None)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", str(clients)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>6} {clients:>8} {result['requests']:>9} {result['errors']:>7} "
+                  f"{result['throughput']:>9.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        run_worker(int(sys.argv[2]))
+    else:
+        run_benchmark()
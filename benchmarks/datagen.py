@@ -0,0 +1,157 @@
+"""
+Synthetic data generator for benchmarks
+Creates teams, their equipment and maintenance request history with Core
+executemany batches, deterministically for a given --seed.
+
+Run from the project root, e.g. 10k teams / 50k assets / 1M requests:
+    python benchmarks/datagen.py --database sqlite:///./bench.db \\
+        --teams 10000 --equipment-per-team 5 --requests-per-equipment 20
+"""
+import sys
+import os
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSERT_BATCH_SIZE = 50000
+
+DEPARTMENTS = ["Production", "Manufacturing", "Facilities", "Logistics", "Quality", "Utilities"]
+ASSET_KINDS = ["Generator", "Conveyor", "Hydraulic Press", "Compressor", "Pump", "Chiller", "Boiler", "Lathe"]
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Dana", "Emma", "Frank", "Grace", "Hiro", "Ines", "Jon"]
+LAST_NAMES = ["Smith", "Doe", "Johnson", "Williams", "Brown", "Lee", "Davis", "Miller", "Wilson", "Khan"]
+ISSUES = ["oil leak", "hydraulic leak", "belt wear", "overheating", "vibration", "noise", "filter change", "calibration"]
+STATUS_WEIGHTS = {"New": 15, "In Progress": 10, "Repaired": 70, "Scrap": 5}
+
+def insert_batched(db, model, rows):
+    """executemany rows into model's table in INSERT_BATCH_SIZE chunks"""
+    from sqlalchemy import insert
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            db.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.execute(insert(model), batch)
+
+def generate(db, teams: int, equipment_per_team: int, requests_per_equipment: int, seed: int = 42, history_days: int = 3 * 365) -> dict:
+    """Fill an empty database with a synthetic teams/equipment/requests graph"""
+    from backend.models import MaintenanceTeam, Equipment, MaintenanceRequest, Technician, CLOSED_STATUSES, team_members as team_members_table
+    from backend.sync import next_version
+    from backend.overdue import is_overdue_on
+
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.utcnow()
+
+    team_members = []
+    for t in range(teams):
+        team_members.append([
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {t}-{m}" for m in range(rng.randint(2, 6))
+        ])
+    insert_batched(db, MaintenanceTeam, (
+        {"id": t + 1, "name": f"Team {t + 1:05d}", "members": ", ".join(members)}
+        for t, members in enumerate(team_members)
+    ))
+    technician_ids = {}
+    for members in team_members:
+        for name in members:
+            technician_ids[name] = len(technician_ids) + 1
+    insert_batched(db, Technician, ({"id": i, "name": name} for name, i in technician_ids.items()))
+    insert_batched(db, team_members_table, (
+        {"team_id": t + 1, "technician_id": technician_ids[name]}
+        for t, members in enumerate(team_members) for name in members
+    ))
+
+    equipment_count = teams * equipment_per_team
+    insert_batched(db, Equipment, (
+        {
+            "id": e + 1,
+            "name": f"{rng.choice(ASSET_KINDS)} {e + 1}",
+            "serial_number": f"SN-{e + 1:08d}",
+            "department": rng.choice(DEPARTMENTS),
+            "location": f"Building {chr(65 + rng.randrange(8))} - Floor {rng.randint(1, 5)}",
+            "purchase_date": today - timedelta(days=rng.randint(365, 10 * 365)),
+            "warranty_expiry": today + timedelta(days=rng.randint(-5 * 365, 3 * 365)) if rng.random() < 0.7 else None,
+            "maintenance_team_id": e // equipment_per_team + 1,
+            "is_scrapped": False,
+        }
+        for e in range(equipment_count)
+    ))
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    version = next_version(db, MaintenanceRequest.__tablename__)
+
+    def request_rows():
+        for e in range(equipment_count):
+            team_index = e // equipment_per_team
+            for _ in range(requests_per_equipment):
+                preventive = rng.random() < 0.4
+                created = now - timedelta(days=rng.randint(0, history_days), minutes=rng.randint(0, 1440))
+                status = rng.choices(statuses, weights)[0]
+                issue = rng.choice(ISSUES)
+                technician = rng.choice(team_members[team_index])
+                scheduled = (created + timedelta(days=rng.randint(0, 60))).date()
+                duration = rng.randint(1, 12)
+                completed = None
+                if status in CLOSED_STATUSES:
+                    # Closed after the scheduled day's work, never in the future
+                    completed = min(max(created, datetime.combine(scheduled, datetime.min.time())) + timedelta(hours=duration), now)
+                yield {
+                    "title": f"{'Scheduled' if preventive else 'Repair'} {issue}",
+                    "description": f"Reported {issue} on asset {e + 1}",
+                    "equipment_id": e + 1,
+                    "team_id": team_index + 1,
+                    "technician": technician,
+                    "technician_id": technician_ids[technician],
+                    "request_type": "Preventive" if preventive else "Corrective",
+                    "status": status,
+                    "scheduled_date": scheduled,
+                    "duration": duration,
+                    "created_at": created,
+                    "completed_at": completed,
+                    "row_version": version,
+                    "is_overdue": is_overdue_on(status, scheduled, today),
+                }
+
+    insert_batched(db, MaintenanceRequest, request_rows())
+    db.commit()
+    return {
+        "teams": teams,
+        "technicians": len(technician_ids),
+        "equipment": equipment_count,
+        "requests": equipment_count * requests_per_equipment,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic GearGuard data")
+    parser.add_argument("--database", help="Database URL (defaults to DATABASE_URL)")
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--equipment-per-team", type=int, default=10)
+    parser.add_argument("--requests-per-equipment", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.database:
+        os.environ["DATABASE_URL"] = args.database
+    from backend.database import SessionLocal, init_db
+    import backend.models  # noqa: F401  (registers the tables)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counts = generate(db, args.teams, args.equipment_per_team, args.requests_per_equipment, args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"✓ Generated {counts['teams']} teams, {counts['equipment']} equipment, "
+          f"{counts['requests']} maintenance requests in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark for GET /api/equipment
+Counts the SQL statements and wall time per call for growing page sizes.
+The statement count should stay constant no matter how many rows are returned.
+
+Run from the project root:
+    python benchmarks/equipment_listing.py
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+from datetime import date, timedelta
+from backend.database import Base, get_db
+from backend.models import MaintenanceTeam, Equipment, MaintenanceRequest
+from backend.main import app
+
+EQUIPMENT_ROWS = 1000
+REQUESTS_PER_EQUIPMENT = 5
+PAGE_SIZES = [10, 100, 500, 1000]
+REPEAT = 5
+
+def build_database(path):
+    """Create a throwaway database filled with synthetic equipment and requests"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    team = MaintenanceTeam(name="Benchmark Team", members="Tech A, Tech B")
+    db.add(team)
+    db.commit()
+    db.bulk_insert_mappings(Equipment, [
+        {
+            "name": f"Asset {i}",
+            "serial_number": f"BENCH-{i:06d}",
+            "department": "Production",
+            "location": "Plant 1",
+            "purchase_date": date(2020, 1, 1),
+            "maintenance_team_id": team.id,
+            "is_scrapped": False,
+        }
+        for i in range(EQUIPMENT_ROWS)
+    ])
+    equipment_ids = [eq_id for (eq_id,) in db.query(Equipment.id).all()]
+    today = date.today()
+    db.bulk_insert_mappings(MaintenanceRequest, [
+        {
+            "title": f"Request {n}",
+            "equipment_id": eq_id,
+            "team_id": team.id,
+            "request_type": "Preventive",
+            "status": "New",
+            "scheduled_date": today + timedelta(days=n),
+        }
+        for eq_id in equipment_ids
+        for n in range(REQUESTS_PER_EQUIPMENT)
+    ])
+    db.commit()
+    db.close()
+    return engine, Session
+
+def run_benchmark():
+    """Measure statements and latency per page size"""
+    workdir = tempfile.mkdtemp()
+    engine, Session = build_database(os.path.join(workdir, "bench.db"))
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    print(f"{'page size':>10} {'rows':>6} {'queries':>8} {'avg ms':>8}")
+    try:
+        for page_size in PAGE_SIZES:
+            elapsed = 0.0
+            for _ in range(REPEAT):
+                statements.clear()
+                start = time.perf_counter()
+                response = client.get(f"/api/equipment?limit={page_size}")
+                elapsed += time.perf_counter() - start
+                response.raise_for_status()
+            print(f"{page_size:>10} {len(response.json()):>6} {len(statements):>8} {elapsed / REPEAT * 1000:>8.2f}")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+if __name__ == "__main__":
+    run_benchmark()
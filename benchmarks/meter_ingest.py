@@ -0,0 +1,84 @@
+"""
+Benchmark for meter reading ingestion
+Generates a small fleet, streams a day of per-minute readings for several
+meters of every asset through the ingestion path in calls of --per-call
+readings, and reports readings stored per second plus the latency of raw,
+hourly and daily series queries.
+
+Run from the project root:
+    python benchmarks/meter_ingest.py --equipment 200 --meters 3 --minutes 1440
+"""
+import sys
+import os
+import argparse
+import io
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark meter reading ingestion")
+    parser.add_argument("--equipment", type=int, default=200)
+    parser.add_argument("--meters", type=int, default=3)
+    parser.add_argument("--minutes", type=int, default=1440)
+    parser.add_argument("--per-call", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gearguard-meters-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from backend.database import SessionLocal, init_db
+    from backend.models import MeterRule
+    from backend import meters
+    from datagen import generate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        generate(db, max(1, args.equipment // 5), 5, 1)
+        # A rule per asset on the first meter, so every call also checks rules
+        db.add_all(MeterRule(equipment_id=e + 1, meter="meter0", max_value=1e9) for e in range(args.equipment))
+        db.commit()
+
+        start_ts = datetime(2026, 1, 1)
+        def readings():
+            # Time-ordered, the way devices report: every asset and meter each minute
+            for minute in range(args.minutes):
+                ts = (start_ts + timedelta(minutes=minute)).isoformat()
+                for e in range(args.equipment):
+                    for m in range(args.meters):
+                        yield json.dumps({"equipment_id": e + 1, "meter": f"meter{m}", "ts": ts, "value": minute * 0.1 + m})
+
+        total = args.equipment * args.meters * args.minutes
+        print(f"{args.equipment} assets x {args.meters} meters x {args.minutes} minutes = {total} readings")
+        stored = 0
+        elapsed = 0.0
+        lines = readings()
+        while True:
+            chunk = [line for _, line in zip(range(args.per_call), lines)]
+            if not chunk:
+                break
+            upload = io.BytesIO(("\n".join(chunk) + "\n").encode())
+            started = time.perf_counter()
+            report = meters.ingest(db, upload, "jsonl")
+            elapsed += time.perf_counter() - started
+            stored += report["inserted"]
+        print(f"  ingest: {stored} readings in {elapsed:.2f}s  ({stored / elapsed:,.0f}/s, {args.per_call} per call)")
+
+        end_ts = start_ts + timedelta(minutes=args.minutes)
+        for resolution in meters.SERIES_RESOLUTIONS:
+            timings = []
+            for e in range(min(args.equipment, 50)):
+                started = time.perf_counter()
+                points = meters.series(db, e + 1, "meter0", start_ts, end_ts, resolution, meters.MAX_SERIES_POINTS)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            print(f"  series {resolution:<4} {len(points):>5} points  p50 {timings[len(timings) // 2] * 1000:.1f} ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
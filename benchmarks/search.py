@@ -0,0 +1,61 @@
+"""
+Benchmark for full-text search
+Generates a request history and times /api/search queries from very
+selective (one serial number) to very common (a word in an eighth of all
+requests), first page of 20 results each.
+
+Run from the project root:
+    python benchmarks/search.py --teams 2000 --requests-per-equipment 100
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = ["SN-00000042", "asset 4242", "compressor build", "overheat", "hydraulic leak"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text search")
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--equipment-per-team", type=int, default=5)
+    parser.add_argument("--requests-per-equipment", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gearguard-search-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from fastapi.testclient import TestClient
+    from backend.database import SessionLocal, init_db
+    from backend.main import app
+    from datagen import generate
+
+    init_db()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counts = generate(db, args.teams, args.equipment_per_team, args.requests_per_equipment)
+        db.commit()
+        print(f"{counts['equipment']} equipment, {counts['requests']} requests indexed in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        print(f"  {'query':<20} {'matches':>8} {'p50 ms':>8} {'max ms':>8}")
+        for q in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = client.get("/api/search", params={"q": q, "limit": 20})
+                timings.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            matches = len(client.get("/api/search", params={"q": q, "limit": 1000}).json())
+            shown = f"{matches}+" if matches == 1000 else str(matches)
+            print(f"  {q:<20} {shown:>8} {statistics.median(timings):8.1f} {max(timings):8.1f}")
+
+if __name__ == "__main__":
+    main()
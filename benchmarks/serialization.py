@@ -0,0 +1,124 @@
+"""
+Benchmark for response serialization
+Builds a request history of --rows rows and reports the cost per row of
+turning it into JSON: fetching ORM objects and hand-building a dict per
+object (the way routes used to) against selecting the response columns and
+zipping them into dicts with a RowSerializer, each encoded the way FastAPI
+encodes a response_model=List[dict] response and with orjson. Finishes with
+the full listing streamed through the API.
+
+Run from the project root:
+    python benchmarks/serialization.py --rows 100000
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+from typing import List
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gearguard-serialization-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from pydantic import TypeAdapter
+    from fastapi.testclient import TestClient
+    from backend.database import SessionLocal, init_db
+    from backend.models import MaintenanceRequest
+    from backend.routes import REQUEST
+    from backend.serializers import dumps
+    from backend.main import app
+    from datagen import generate
+
+    def hand_built(req):
+        return {
+            "id": req.id,
+            "title": req.title,
+            "description": req.description,
+            "equipment_id": req.equipment_id,
+            "team_id": req.team_id,
+            "technician": req.technician,
+            "technician_id": req.technician_id,
+            "request_type": req.request_type,
+            "status": req.status,
+            "scheduled_date": str(req.scheduled_date) if req.scheduled_date else None,
+            "duration": req.duration,
+            "required_skills": req.required_skills,
+            "created_at": req.created_at.isoformat() if req.created_at else None,
+            "completed_at": req.completed_at.isoformat() if req.completed_at else None,
+            "is_overdue": req.is_overdue
+        }
+
+    init_db()
+    db = SessionLocal()
+    try:
+        requests_per_equipment = 100
+        equipment = max(1, args.rows // requests_per_equipment)
+        generate(db, max(1, equipment // 50), min(equipment, 50), requests_per_equipment)
+        db.commit()
+        rows = db.query(MaintenanceRequest).count()
+        print(f"{rows} maintenance requests, best of {args.repeat}, microseconds per row")
+
+        # What FastAPI does with the dicts a response_model=List[dict] route returns
+        response_model = TypeAdapter(List[dict])
+        def fastapi_encode(items):
+            return response_model.dump_json(response_model.validate_python(items))
+
+        def orm_objects():
+            db.expunge_all()
+            return db.query(MaintenanceRequest).all()
+        def column_rows():
+            return REQUEST.query(db).all()
+
+        objects = orm_objects()
+        tuples = column_rows()
+        hand_dicts = [hand_built(req) for req in objects]
+        row_dicts = REQUEST.to_dicts(tuples)
+        assert fastapi_encode(hand_dicts) == fastapi_encode(row_dicts)
+
+        stages = [
+            ("fetch ORM objects", orm_objects),
+            ("fetch response columns", column_rows),
+            ("hand-built dicts from objects", lambda: [hand_built(req) for req in objects]),
+            ("RowSerializer dicts from columns", lambda: REQUEST.to_dicts(tuples)),
+            ("encode dicts, FastAPI response_model", lambda: fastapi_encode(row_dicts)),
+            ("encode dicts, orjson", lambda: dumps(row_dicts)),
+        ]
+        for label, stage in stages:
+            elapsed = best_of(args.repeat, stage)
+            print(f"  {label:<38} {elapsed / rows * 1e6:8.2f}")
+
+        before = best_of(args.repeat, lambda: fastapi_encode([hand_built(req) for req in orm_objects()]))
+        after = best_of(args.repeat, lambda: fastapi_encode(REQUEST.to_dicts(column_rows())))
+        streamed = best_of(args.repeat, lambda: dumps(REQUEST.to_dicts(column_rows())))
+        print(f"  {'total, ORM + hand-built dicts':<38} {before / rows * 1e6:8.2f}")
+        print(f"  {'total, RowSerializer':<38} {after / rows * 1e6:8.2f}")
+        print(f"  {'total, RowSerializer + orjson':<38} {streamed / rows * 1e6:8.2f}")
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        for mode in ("ndjson", "json"):
+            def stream():
+                response = client.get(f"/api/maintenance-requests?stream={mode}")
+                response.raise_for_status()
+            elapsed = best_of(args.repeat, stream)
+            print(f"  GET ?stream={mode:<6} {rows} rows in {elapsed:.2f}s  ({elapsed / rows * 1e6:.2f} per row)")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,26 @@
 let currentDate = new Date();
-let requests = [];
-let equipmentList = [];
+let eventsByDay = {};
 
 // Load data on page load
 document.addEventListener('DOMContentLoaded', async () => {
-    await loadEquipment();
     await loadRequests();
-    renderCalendar();
+    subscribeEvents(['maintenance_request'], () => loadRequests());
 });
 
-async function loadEquipment() {
-    try {
-        equipmentList = await apiCall('/equipment');
-    } catch (error) {
-        console.error('Error loading equipment:', error);
-    }
+// Format a Date as YYYY-MM-DD in local time
+function toDateString(d) {
+    return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
 }
 
 async function loadRequests() {
+    // Preventive requests of the displayed month, already grouped by day
+    const year = currentDate.getFullYear();
+    const month = currentDate.getMonth();
+    const start = toDateString(new Date(year, month, 1));
+    const end = toDateString(new Date(year, month + 1, 0));
     try {
-        requests = await apiCall('/maintenance-requests');
+        const calendar = await apiCall(`/calendar?start=${start}&end=${end}`);
+        eventsByDay = calendar.days;
         renderCalendar();
     } catch (error) {
         console.error('Error loading requests:', error);
@@ -27,8 +28,9 @@ async function loadRequests() {
 }
 
 function changeMonth(direction) {
+    currentDate.setDate(1);
     currentDate.setMonth(currentDate.getMonth() + direction);
-    renderCalendar();
+    loadRequests();
 }
 
 function renderCalendar() {
@@ -46,11 +48,6 @@ function renderCalendar() {
     const daysInMonth = lastDay.getDate();
     const startingDayOfWeek = firstDay.getDay();
     
-    // Get preventive maintenance requests for this month
-    const preventiveRequests = requests.filter(r => 
-        r.request_type === 'Preventive' && r.scheduled_date
-    );
-    
     // Clear calendar
     const grid = document.getElementById('calendarGrid');
     grid.innerHTML = '';
@@ -92,7 +89,7 @@ function renderCalendar() {
         
         // Add events for this day
         const dayString = `${year}-${String(month + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
-        const dayEvents = preventiveRequests.filter(r => r.scheduled_date === dayString);
+        const dayEvents = eventsByDay[dayString] || [];
         
         dayEvents.forEach(event => {
             const eventElement = document.createElement('div');
@@ -104,8 +101,7 @@ function renderCalendar() {
                 eventElement.classList.add('event-preventive');
             }
             
-            const equipment = equipmentList.find(e => e.id === event.equipment_id);
-            eventElement.textContent = `${event.title} - ${equipment ? equipment.name : 'N/A'}`;
+            eventElement.textContent = `${event.title} - ${event.equipment_name || 'N/A'}`;
             eventElement.onclick = () => showEventDetails(event);
             dayElement.appendChild(eventElement);
         });
@@ -124,7 +120,6 @@ function renderCalendar() {
 }
 
 function showEventDetails(event) {
-    const equipment = equipmentList.find(e => e.id === event.equipment_id);
     const modalBody = document.getElementById('eventModalBody');
     
     modalBody.innerHTML = `
@@ -135,7 +130,7 @@ function showEventDetails(event) {
             <strong>Description:</strong> ${event.description || 'N/A'}
         </div>
         <div class="mb-3">
-            <strong>Equipment:</strong> ${equipment ? equipment.name : 'N/A'}
+            <strong>Equipment:</strong> ${event.equipment_name || 'N/A'}
         </div>
         <div class="mb-3">
             <strong>Type:</strong> ${event.request_type}
@@ -9,7 +9,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 async function loadTeams() {
     try {
-        teams = await apiCall('/teams');
+        teams = await apiCallAll('/teams');
         const teamSelect = document.getElementById('equipmentTeamId');
         teamSelect.innerHTML = '<option value="">Select Team</option>';
         teams.forEach(team => {
@@ -25,7 +25,7 @@ async function loadTeams() {
 
 async function loadEquipment() {
     try {
-        equipmentList = await apiCall('/equipment');
+        equipmentList = await apiCallAll('/equipment');
         renderEquipmentTable();
     } catch (error) {
         console.error('Error loading equipment:', error);
@@ -2,12 +2,25 @@ let requests = [];
 let equipmentList = [];
 let teams = [];
 
+// Board state for incremental sync with /api/kanban
+let kanbanVersion = null;
+const requestsById = new Map();
+
 // Load data on page load
 document.addEventListener('DOMContentLoaded', async () => {
     await loadEquipment();
     await loadTeams();
     await loadRequests();
     
+    // Keep the board current: request changes are fetched incrementally.
+    // Renamed equipment re-stamps its requests, so the delta carries the new names
+    subscribeEvents(['maintenance_request', 'equipment'], (name) => {
+        if (name === 'equipment') {
+            loadEquipment();
+        }
+        loadRequests();
+    });
+    
     // Check for equipment filter in URL
     const urlParams = new URLSearchParams(window.location.search);
     const equipmentId = urlParams.get('equipment');
@@ -19,8 +32,10 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 async function loadEquipment() {
     try {
-        equipmentList = await apiCall('/equipment');
+        equipmentList = await apiCallAll('/equipment');
         const select = document.getElementById('requestEquipmentId');
+        // Live reloads must not drop a selection in an open form
+        const selected = select.value;
         select.innerHTML = '<option value="">Select Equipment</option>';
         equipmentList.forEach(eq => {
             const option = document.createElement('option');
@@ -28,6 +43,7 @@ async function loadEquipment() {
             option.textContent = `${eq.name} (${eq.serial_number})`;
             select.appendChild(option);
         });
+        select.value = selected;
     } catch (error) {
         console.error('Error loading equipment:', error);
     }
@@ -35,7 +51,7 @@ async function loadEquipment() {
 
 async function loadTeams() {
     try {
-        teams = await apiCall('/teams');
+        teams = await apiCallAll('/teams');
     } catch (error) {
         console.error('Error loading teams:', error);
     }
@@ -43,7 +59,18 @@ async function loadTeams() {
 
 async function loadRequests() {
     try {
-        requests = await apiCall('/maintenance-requests');
+        // After the first load only fetch requests changed since our version
+        const endpoint = kanbanVersion === null ? '/kanban' : `/kanban?since=${kanbanVersion}`;
+        const board = await apiCall(endpoint);
+        if (!board.incremental) {
+            requestsById.clear();
+        }
+        board.deleted.forEach(id => requestsById.delete(id));
+        Object.values(board.columns).forEach(column => {
+            column.forEach(request => requestsById.set(request.id, request));
+        });
+        kanbanVersion = board.version;
+        requests = Array.from(requestsById.values()).sort((a, b) => a.id - b.id);
         renderKanban();
     } catch (error) {
         console.error('Error loading requests:', error);
@@ -89,15 +116,12 @@ function createKanbanCard(request) {
     card.id = `request-${request.id}`;
     card.ondragstart = (e) => dragStart(e, request.id);
     
-    const equipment = equipmentList.find(e => e.id === request.equipment_id);
-    const team = teams.find(t => t.id === request.team_id);
-    
     card.innerHTML = `
         <div class="d-flex justify-content-between align-items-start mb-2">
             <h6 class="mb-0">${request.title}</h6>
             ${request.is_overdue ? '<span class="badge bg-danger">Overdue</span>' : ''}
         </div>
-        <p class="text-muted small mb-2">${equipment ? equipment.name : 'N/A'}</p>
+        <p class="text-muted small mb-2">${request.equipment_name || 'N/A'}</p>
         <p class="text-muted small mb-2">${request.description || 'No description'}</p>
         <div class="d-flex justify-content-between align-items-center">
             <small class="text-muted">${request.request_type}</small>
@@ -133,20 +157,10 @@ function drop(event) {
 
 async function updateRequestStatus(requestId, newStatus) {
     try {
-        await apiCall(`/maintenance-requests/${requestId}`, 'PUT', { status: newStatus });
+        // One transaction; moving a card to Scrap also marks its equipment as scrapped
+        await apiCall('/maintenance-requests/batch', 'PATCH', { updates: [{ id: requestId, status: newStatus }] });
         showNotification('Status updated successfully!', 'success');
         
-        // If status is Scrap, also mark equipment as scrapped
-        if (newStatus === 'Scrap') {
-            const request = requests.find(r => r.id === requestId);
-            if (request) {
-                const equipment = equipmentList.find(e => e.id === request.equipment_id);
-                if (equipment && !equipment.is_scrapped) {
-                    await apiCall(`/equipment/${request.equipment_id}`, 'PUT', { is_scrapped: true });
-                }
-            }
-        }
-        
         await loadRequests();
     } catch (error) {
         showNotification('Error updating status: ' + error.message, 'danger');
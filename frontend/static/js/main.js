@@ -28,6 +28,55 @@ async function apiCall(endpoint, method = 'GET', data = null) {
     }
 }
 
+// Fetch every page of a cursor-paginated list endpoint
+async function apiCallAll(endpoint, pageSize = 1000) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    let results = [];
+    let cursor = null;
+    
+    try {
+        do {
+            let url = `${API_BASE}${endpoint}${separator}limit=${pageSize}`;
+            if (cursor) {
+                url += `&cursor=${encodeURIComponent(cursor)}`;
+            }
+            const response = await fetch(url);
+            if (!response.ok) {
+                const error = await response.json();
+                throw new Error(error.detail || 'Request failed');
+            }
+            results = results.concat(await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
+        return results;
+    } catch (error) {
+        console.error('API Error:', error);
+        alert('Error: ' + error.message);
+        throw error;
+    }
+}
+
+// Call onChange(eventName, data) for live updates pushed by /api/events.
+// After a reconnect changes may have been missed, so onChange is called with
+// a reload for every event name.
+function subscribeEvents(eventNames, onChange, teamId = null) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const source = new EventSource(`${API_BASE}/events${teamId ? `?team_id=${teamId}` : ''}`);
+    let connected = false;
+    source.onopen = () => {
+        if (connected) {
+            eventNames.forEach(name => onChange(name, { changed: [], deleted: [], reload: true }));
+        }
+        connected = true;
+    };
+    eventNames.forEach(name => {
+        source.addEventListener(name, (e) => onChange(name, JSON.parse(e.data)));
+    });
+    return source;
+}
+
 // Format date for display
 function formatDate(dateString) {
     if (!dateString) return 'N/A';
@@ -1,6 +1,9 @@
 """
 Quick start script for GearGuard
 Run this from the project root directory
+
+    python run.py                            # Development server with auto-reload
+    python run.py --production --workers 4   # Preloaded app forked into 4 workers, no reload
 """
 import sys
 import os
@@ -14,6 +17,12 @@ sys.path.insert(0, PROJECT_ROOT)
 # Change to project root directory
 os.chdir(PROJECT_ROOT)
 
+import argparse
+import asyncio
+import gc
+import signal
+import threading
+import traceback
 import uvicorn
 
 def check_dependencies():
@@ -81,7 +90,108 @@ def check_project_structure():
             print(f"  - {dir_path}")
         print("=" * 60)
 
+def run_production(host: str, port: int, workers: int):
+    """Serve with several worker processes sharing one database.
+
+    The app is imported and the database prepared here, once, and the
+    workers are forked from this process: they share its loaded modules and
+    templates and start serving right away. One more forked process runs the
+    periodic tasks (overdue rollover, PM scheduler, analytics rollups). This
+    process only supervises them and restarts any that exits. The workers
+    pick up each other's writes through backend/invalidation.py.
+    """
+    if not hasattr(os, "fork"):
+        run_spawned_workers(host, port, workers)
+        return
+    from backend import main
+    from backend.database import engine
+
+    main.prepare_database()
+    # Forked processes must not share a connection with this one
+    engine.dispose()
+    main.MANAGED_WORKER = True
+    config = uvicorn.Config(main.app, host=host, port=port, timeout_graceful_shutdown=5)
+    sock = config.bind_socket()
+    # Keep the preloaded objects out of the collector so workers do not copy their pages
+    gc.freeze()
+
+    processes = {}
+    stopping = False
+
+    def start(role: str):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            # Not this supervisor's handlers: SIGTERM ends the process, SIGINT raises KeyboardInterrupt
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            try:
+                if role == "worker":
+                    uvicorn.Server(config).run(sockets=[sock])
+                else:
+                    sock.close()
+                    asyncio.run(run_periodic_tasks(main))
+            except KeyboardInterrupt:
+                pass
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        processes[pid] = role
+
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        for pid in processes:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        start("worker")
+    start("periodic tasks")
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        while processes:
+            try:
+                pid, status = os.wait()
+            except KeyboardInterrupt:
+                stop()
+                continue
+            role = processes.pop(pid)
+            if not stopping:
+                print(f"WARNING: {role} process {pid} exited (status {os.waitstatus_to_exitcode(status)}), restarting")
+                start(role)
+    finally:
+        sock.close()
+
+def run_spawned_workers(host: str, port: int, workers: int):
+    """Fallback without fork() (Windows): uvicorn spawns workers that import the app themselves"""
+    from backend import main
+
+    main.prepare_database()
+    threading.Thread(
+        target=lambda: asyncio.run(run_periodic_tasks(main)), name="periodic-tasks", daemon=True
+    ).start()
+    # Inherited by the worker processes
+    os.environ[main.MANAGED_WORKER_ENV] = "1"
+    uvicorn.run("backend.main:app", host=host, port=port, workers=workers, timeout_graceful_shutdown=5)
+
+async def run_periodic_tasks(main):
+    await asyncio.gather(*main.periodic_tasks())
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the GearGuard server")
+    parser.add_argument("--production", action="store_true",
+                        help="Run several worker processes without auto-reload")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes in production mode (default: one per CPU core)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
     print("=" * 60)
     print("GearGuard Maintenance Management System")
     print("=" * 60)
@@ -95,14 +205,20 @@ if __name__ == "__main__":
     print("\nStarting server...")
     print(f"Project root: {PROJECT_ROOT}")
     print("\nAccess the application at:")
-    print("  → Web Interface: http://localhost:8000")
-    print("  → API Docs: http://localhost:8000/docs")
-    print("  → Health Check: http://localhost:8000/api/health")
+    print(f"  → Web Interface: http://localhost:{args.port}")
+    print(f"  → API Docs: http://localhost:{args.port}/docs")
+    print(f"  → Health Check: http://localhost:{args.port}/api/health")
+    if args.production:
+        print(f"\nProduction mode: {args.workers} worker process(es), no auto-reload")
     print("\nPress CTRL+C to stop the server")
     print("=" * 60)
     
     try:
-        uvicorn.run("backend.main:app", host="127.0.0.1", port=8000, reload=True)
+        if args.production:
+            run_production(args.host, args.port, args.workers)
+        else:
+            # Open event streams never finish on their own; don't let them hold up a reload
+            uvicorn.run("backend.main:app", host=args.host, port=args.port, reload=True, timeout_graceful_shutdown=5)
     except KeyboardInterrupt:
         print("\n\nServer stopped.")
     except Exception as e:
@@ -110,6 +226,6 @@ if __name__ == "__main__":
         print("\nTroubleshooting:")
         print("1. Make sure you're in the project root directory")
         print("2. Install dependencies: pip install -r requirements.txt")
-        print("3. Check if port 8000 is already in use")
+        print(f"3. Check if port {args.port} is already in use")
         sys.exit(1)
 
@@ -0,0 +1,61 @@
+"""
+Shared fixtures: the application served by a TestClient on its own SQLite
+database, created in a temporary directory for the test session.
+
+database.py reads DATABASE_URL when it is imported, so it is set here
+before the backend is. Tests share the database and isolate themselves by
+creating their own team and equipment (filter on their ids).
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+import tempfile
+import pytest
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="gearguard-tests-"), "test.db")
+
+from fastapi.testclient import TestClient
+from backend.main import app
+
+_names = itertools.count(1)
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def team(client):
+    response = client.post("/api/teams", json={"name": f"Team {next(_names)}", "members": "Ann, Bob"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def make_equipment(client, team):
+    def make(**fields):
+        n = next(_names)
+        data = {
+            "name": f"Press {n}", "serial_number": f"SN-{n}", "department": "Production", "location": "Hall A",
+            "purchase_date": "2024-01-01", "maintenance_team_id": team["id"], **fields
+        }
+        response = client.post("/api/equipment", json=data)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
+
+@pytest.fixture
+def equipment(make_equipment):
+    return make_equipment()
+
+@pytest.fixture
+def make_request(client, equipment):
+    def make(**fields):
+        data = {"title": f"Request {next(_names)}", "equipment_id": equipment["id"], "request_type": "Corrective", **fields}
+        response = client.post("/api/maintenance-requests", json=data)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
@@ -0,0 +1,59 @@
+from sqlalchemy import update
+from backend.database import SessionLocal
+from backend.models import MaintenanceRequest
+
+def put(client, request_id, **fields):
+    response = client.put(f"/api/maintenance-requests/{request_id}", json=fields)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_completed_at_follows_open_closed_transitions(client, make_request):
+    request = make_request()
+    assert request["completed_at"] is None
+
+    repaired = put(client, request["id"], status="Repaired")
+    assert repaired["completed_at"] is not None
+    # Closed to closed and other edits keep the completion time
+    assert put(client, request["id"], status="Scrap")["completed_at"] == repaired["completed_at"]
+    assert put(client, request["id"], title="Edited")["completed_at"] == repaired["completed_at"]
+    # Reopening clears it
+    assert put(client, request["id"], status="In Progress")["completed_at"] is None
+    assert put(client, request["id"], status="Repaired")["completed_at"] > repaired["completed_at"]
+
+def test_closed_request_without_completion_time_keeps_it_unset(client, make_request):
+    request = make_request()
+    db = SessionLocal()
+    try:
+        db.execute(update(MaintenanceRequest).where(MaintenanceRequest.id == request["id"]).values(status="Repaired"))
+        db.commit()
+    finally:
+        db.close()
+
+    assert put(client, request["id"], title="Edited")["completed_at"] is None
+    assert put(client, request["id"], status="Scrap")["completed_at"] is None
+
+def test_batch_updates_follow_the_same_rule(client, make_request):
+    closed, reopened = make_request(), make_request()
+    repaired_at = put(client, closed["id"], status="Repaired")["completed_at"]
+    put(client, reopened["id"], status="Repaired")
+
+    response = client.patch("/api/maintenance-requests/batch", json={"updates": [
+        {"id": closed["id"], "status": "Scrap"}, {"id": reopened["id"], "status": "New"}
+    ]})
+
+    rows = {row["id"]: row for row in response.json()}
+    assert rows[closed["id"]]["completed_at"] == repaired_at
+    assert rows[reopened["id"]]["completed_at"] is None
+
+def test_imported_closed_requests_get_a_completion_time(client, equipment):
+    lines = [
+        f'{{"title": "Imported {status}", "equipment_id": {equipment["id"]}, "request_type": "Corrective", "status": "{status}"}}'
+        for status in ("New", "Repaired")
+    ]
+    response = client.post(
+        "/api/maintenance-requests/bulk", content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.json()["inserted"] == 2
+
+    rows = client.get("/api/maintenance-requests", params={"equipment_id": equipment["id"]}).json()
+    assert {row["status"]: row["completed_at"] is not None for row in rows} == {"New": False, "Repaired": True}
@@ -0,0 +1,80 @@
+import pytest
+from backend import routes
+
+def batch(client, *updates):
+    return client.patch("/api/maintenance-requests/batch", json={"updates": list(updates)})
+
+def statuses(client, equipment) -> dict:
+    rows = client.get("/api/maintenance-requests", params={"equipment_id": equipment["id"]}).json()
+    return {row["id"]: row["status"] for row in rows}
+
+def test_applies_every_update_and_returns_changed_rows(client, equipment, make_request):
+    first, second, untouched = make_request(), make_request(), make_request()
+
+    response = batch(
+        client,
+        {"id": first["id"], "status": "In Progress", "technician": "Ann"},
+        {"id": second["id"], "scheduled_date": "2031-05-01"},
+        {"id": untouched["id"], "status": "New"},
+    )
+
+    assert response.status_code == 200, response.text
+    rows = response.json()
+    assert [row["id"] for row in rows] == [first["id"], second["id"]]
+    assert (rows[0]["status"], rows[0]["technician"]) == ("In Progress", "Ann")
+    assert rows[0]["technician_id"] is not None
+    assert rows[1]["scheduled_date"] == "2031-05-01"
+    history = client.get(f"/api/maintenance-requests/{first['id']}/history").json()["events"]
+    assert sorted((event["field"], event["to"]) for event in history) == [("status", "In Progress"), ("technician", "Ann")]
+
+def test_unknown_request_rejects_the_whole_batch(client, equipment, make_request):
+    request = make_request()
+
+    response = batch(client, {"id": request["id"], "status": "Repaired"}, {"id": 10 ** 9, "status": "Repaired"})
+
+    assert response.status_code == 404
+    assert str(10 ** 9) in response.json()["detail"]
+    assert statuses(client, equipment) == {request["id"]: "New"}
+
+@pytest.mark.parametrize("bad", [{"status": "Bogus"}, {"scheduled_date": "tomorrow"}])
+def test_invalid_update_rejects_the_whole_batch(client, equipment, make_request, bad):
+    first, second = make_request(), make_request()
+
+    response = batch(client, {"id": first["id"], "status": "Repaired"}, {"id": second["id"], **bad})
+
+    assert response.status_code == 400
+    assert statuses(client, equipment) == {first["id"]: "New", second["id"]: "New"}
+
+def test_duplicate_ids_are_rejected(client, make_request):
+    request = make_request()
+
+    response = batch(client, {"id": request["id"], "status": "Repaired"}, {"id": request["id"], "status": "New"})
+
+    assert response.status_code == 400
+
+def test_failure_after_the_writes_rolls_all_of_them_back(client, monkeypatch, equipment, make_request):
+    first, second = make_request(), make_request()
+    etag = client.get("/api/maintenance-requests").headers["etag"]
+
+    def fail(db, events):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(routes, "queue_events", fail)
+    with pytest.raises(RuntimeError):
+        batch(client, {"id": first["id"], "status": "In Progress"}, {"id": second["id"], "status": "Scrap"})
+
+    assert statuses(client, equipment) == {first["id"]: "New", second["id"]: "New"}
+    assert client.get(f"/api/equipment/{equipment['id']}").json()["is_scrapped"] is False
+    assert client.get(f"/api/maintenance-requests/{first['id']}/history").json()["events"] == []
+    assert client.get("/api/maintenance-requests", headers={"If-None-Match": etag}).status_code == 304
+
+def test_scrap_marks_the_equipment_scrapped(client, equipment, make_request):
+    request = make_request()
+
+    response = batch(client, {"id": request["id"], "status": "Scrap"})
+
+    assert response.json()[0]["status"] == "Scrap"
+    assert client.get(f"/api/equipment/{equipment['id']}").json()["is_scrapped"] is True
+
+def test_batch_size_is_limited(client):
+    updates = [{"id": i, "status": "New"} for i in range(1, routes.MAX_BATCH_UPDATES + 2)]
+    assert batch(client, *updates).status_code == 400
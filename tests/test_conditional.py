@@ -0,0 +1,43 @@
+def test_matching_etag_answers_304(client, equipment):
+    response = client.get("/api/equipment")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/api/equipment", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+def test_strong_form_and_lists_match_weakly(client, equipment):
+    etag = client.get(f"/api/equipment/{equipment['id']}").headers["etag"]
+    strong = etag.removeprefix("W/")
+
+    assert client.get(f"/api/equipment/{equipment['id']}", headers={"If-None-Match": strong}).status_code == 304
+    assert client.get(f"/api/equipment/{equipment['id']}", headers={"If-None-Match": f'W/"0", {etag}'}).status_code == 304
+
+def test_write_changes_the_etag(client, equipment, make_request):
+    etag = client.get("/api/maintenance-requests").headers["etag"]
+
+    make_request()
+    response = client.get("/api/maintenance-requests", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_etag_covers_every_table_of_the_response(client, equipment, make_request):
+    # Equipment listings carry request counts, so a new request changes their ETag too
+    etag = client.get("/api/equipment").headers["etag"]
+
+    make_request()
+
+    assert client.get("/api/equipment", headers={"If-None-Match": etag}).status_code == 200
+
+def test_writes_to_other_tables_keep_the_etag(client, team, make_request):
+    make_request()
+    etag = client.get("/api/maintenance-requests").headers["etag"]
+
+    client.put(f"/api/teams/{team['id']}", json={"members": "Ann, Bob, Cid"})
+
+    assert client.get("/api/maintenance-requests", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from backend.database import SessionLocal
+from backend.models import MeterHourlyStat, MeterReading, MeterRule
+
+UNKNOWN_EQUIPMENT = 10 ** 9
+
+def ingest(client, *readings):
+    lines = "\n".join(
+        f'{{"equipment_id": {equipment_id}, "meter": "{meter}", "ts": "{ts.isoformat()}", "value": {value}}}'
+        for equipment_id, meter, ts, value in readings
+    )
+    response = client.post("/api/meter-readings", content=lines, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_readings_of_unknown_equipment_are_404(client):
+    response = client.get(f"/api/equipment/{UNKNOWN_EQUIPMENT}/readings", params={"meter": "temperature"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Equipment not found"
+
+def test_meters_of_unknown_equipment_are_404(client):
+    assert client.get(f"/api/equipment/{UNKNOWN_EQUIPMENT}/meters").status_code == 404
+
+def test_rule_for_unknown_equipment_is_404(client):
+    response = client.post("/api/meter-rules", json={"equipment_id": UNKNOWN_EQUIPMENT, "meter": "temperature", "max_value": 80})
+    assert response.status_code == 404
+
+def test_known_equipment_without_readings_has_an_empty_series(client, equipment):
+    response = client.get(f"/api/equipment/{equipment['id']}/readings", params={"meter": "temperature"})
+
+    assert response.status_code == 200
+    assert response.json()["points"] == []
+    assert client.get(f"/api/equipment/{equipment['id']}/meters").json() == []
+
+def test_readings_of_unknown_equipment_are_reported_not_stored(client, equipment):
+    now = datetime.utcnow().replace(microsecond=0)
+
+    report = ingest(client, (equipment["id"], "temperature", now - timedelta(minutes=1), 40.5),
+                    (UNKNOWN_EQUIPMENT, "temperature", now, 41))
+
+    assert report["inserted"] == 1
+    assert [error["error"] for error in report["errors"]] == ["Equipment not found"]
+    points = client.get(f"/api/equipment/{equipment['id']}/readings", params={"meter": "temperature"}).json()["points"]
+    assert [point["value"] for point in points] == [40.5]
+
+def test_deleting_equipment_deletes_its_readings_and_rules(client, make_equipment):
+    equipment = make_equipment()
+    client.post("/api/meter-rules", json={"equipment_id": equipment["id"], "meter": "temperature", "max_value": 80})
+    ingest(client, (equipment["id"], "temperature", datetime.utcnow().replace(microsecond=0), 40))
+
+    assert client.delete(f"/api/equipment/{equipment['id']}").status_code == 200
+
+    db = SessionLocal()
+    try:
+        for model in (MeterReading, MeterHourlyStat, MeterRule):
+            assert db.scalar(select(func.count()).select_from(model).where(model.equipment_id == equipment["id"])) == 0
+    finally:
+        db.close()
@@ -0,0 +1,58 @@
+from backend.pagination import NEXT_CURSOR_HEADER
+
+def walk(client, url, params):
+    """Every page of a list endpoint, following the next-page cursors"""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+
+def test_pages_cover_every_row_once(client, equipment, make_request):
+    ids = [make_request()["id"] for _ in range(25)]
+
+    pages = walk(client, "/api/maintenance-requests", {"equipment_id": equipment["id"], "limit": 10})
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [row["id"] for page in pages for row in page] == ids
+
+def test_full_last_page_has_no_cursor(client, equipment, make_request):
+    for _ in range(4):
+        make_request()
+
+    pages = walk(client, "/api/maintenance-requests", {"equipment_id": equipment["id"], "limit": 2})
+
+    assert [len(page) for page in pages] == [2, 2]
+
+def test_descending_sort_breaks_ties_by_id(client, equipment, make_request):
+    dates = ["2030-01-03", "2030-01-01", "2030-01-02", "2030-01-01", "2030-01-03", "2030-01-02", "2030-01-01"]
+    created = [make_request(scheduled_date=day) for day in dates]
+
+    pages = walk(client, "/api/maintenance-requests", {
+        "equipment_id": equipment["id"], "sort": "scheduled_date", "order": "desc", "limit": 3
+    })
+
+    expected = sorted(created, key=lambda row: (row["scheduled_date"], row["id"]), reverse=True)
+    assert [row["id"] for page in pages for row in page] == [row["id"] for row in expected]
+
+def test_rows_written_between_pages_are_not_repeated(client, equipment, make_request):
+    first = [make_request()["id"] for _ in range(3)]
+    response = client.get("/api/maintenance-requests", params={"equipment_id": equipment["id"], "limit": 2})
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    added = make_request()["id"]
+
+    response = client.get("/api/maintenance-requests", params={"equipment_id": equipment["id"], "limit": 2, "cursor": cursor})
+
+    assert [row["id"] for row in response.json()] == [first[2], added]
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get("/api/maintenance-requests", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_unknown_sort_field_is_rejected(client):
+    response = client.get("/api/maintenance-requests", params={"sort": "title"})
+    assert response.status_code == 400
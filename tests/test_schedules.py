@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from sqlalchemy import update
+from backend import schedules
+from backend.database import SessionLocal
+from backend.models import MaintenanceSchedule
+
+def create_schedule(client, equipment, start_date: date, **fields):
+    data = {
+        "equipment_id": equipment["id"], "title": "Weekly inspection", "technician": "Ann",
+        "interval_value": 1, "interval_unit": "weeks", "start_date": start_date.isoformat(), **fields
+    }
+    response = client.post("/api/schedules", json=data)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def generated_dates(client, equipment) -> list:
+    rows = client.get("/api/maintenance-requests", params={"equipment_id": equipment["id"], "sort": "scheduled_date"}).json()
+    return [date.fromisoformat(row["scheduled_date"]) for row in rows]
+
+def weekly(start: date, first: date, last: date) -> list:
+    """Weekly occurrences from start that fall in [first, last]"""
+    days = []
+    due = start
+    while due <= last:
+        if due >= first:
+            days.append(due)
+        due += timedelta(weeks=1)
+    return days
+
+def test_past_occurrences_are_skipped_not_backfilled(client, equipment):
+    today = date.today()
+    start = today - timedelta(days=30)
+
+    schedule = create_schedule(client, equipment, start)
+
+    horizon = today + timedelta(days=schedules.PM_HORIZON_DAYS)
+    expected = weekly(start, today, horizon)
+    assert generated_dates(client, equipment) == expected
+    # Skipped occurrences still count, so later ones keep their dates
+    assert schedule["generated_count"] == len(weekly(start, start, horizon))
+    assert date.fromisoformat(schedule["next_due_date"]) == expected[-1] + timedelta(weeks=1)
+
+def test_rerun_generates_nothing_new(client, equipment):
+    create_schedule(client, equipment, date.today())
+    before = generated_dates(client, equipment)
+
+    assert client.post("/api/schedules/generate").status_code == 200
+
+    assert generated_dates(client, equipment) == before
+
+def test_reactivated_schedule_skips_the_missed_occurrences(client, equipment):
+    today = date.today()
+    schedule = create_schedule(client, equipment, today, interval_unit="days", interval_value=30)
+    client.put(f"/api/schedules/{schedule['id']}", json={"is_active": False})
+    # Pretend the schedule started 301 days ago and was paused since its first occurrence
+    start = today - timedelta(days=301)
+    db = SessionLocal()
+    try:
+        db.execute(update(MaintenanceSchedule).where(MaintenanceSchedule.id == schedule["id"]).values(
+            start_date=start, next_due_date=start, generated_count=0
+        ))
+        db.commit()
+    finally:
+        db.close()
+    before = generated_dates(client, equipment)
+
+    reactivated = client.put(f"/api/schedules/{schedule['id']}", json={"is_active": True}).json()
+
+    added = sorted(set(generated_dates(client, equipment)) - set(before))
+    assert added == [today + timedelta(days=days) for days in (29, 59, 89)]
+    assert date.fromisoformat(reactivated["next_due_date"]) > today + timedelta(days=schedules.PM_HORIZON_DAYS)
+
+def test_first_upcoming_counts_the_skipped_occurrences():
+    schedule = MaintenanceSchedule(start_date=date(2024, 1, 1), interval_value=1, interval_unit="weeks")
+
+    assert schedules.first_upcoming(schedule, 0, date(2024, 1, 1), date(2024, 1, 20)) == (3, date(2024, 1, 22))
+    assert schedules.first_upcoming(schedule, 3, date(2024, 1, 22), date(2024, 1, 22)) == (3, date(2024, 1, 22))
@@ -0,0 +1,78 @@
+def kanban(client, team, since=None):
+    params = {"team_id": team["id"]}
+    if since is not None:
+        params["since"] = since
+    response = client.get("/api/kanban", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def card_ids(board) -> list:
+    return sorted(card["id"] for cards in board["columns"].values() for card in cards)
+
+def test_full_board_then_only_changes(client, team, make_request):
+    kept = make_request()
+    changed = make_request()
+    board = kanban(client, team)
+    assert not board["incremental"]
+    assert card_ids(board) == [kept["id"], changed["id"]]
+
+    client.put(f"/api/maintenance-requests/{changed['id']}", json={"status": "In Progress"})
+    added = make_request()
+    delta = kanban(client, team, board["version"])
+
+    assert delta["incremental"]
+    assert card_ids(delta) == [changed["id"], added["id"]]
+    assert [card["id"] for card in delta["columns"]["In Progress"]] == [changed["id"]]
+    assert delta["deleted"] == []
+    assert delta["version"] > board["version"]
+
+def test_nothing_changed_returns_empty_delta(client, team, make_request):
+    make_request()
+    board = kanban(client, team)
+
+    delta = kanban(client, team, board["version"])
+
+    assert card_ids(delta) == []
+    assert delta["deleted"] == []
+    assert delta["version"] == board["version"]
+
+def test_deleted_requests_leave_tombstones(client, team, make_request):
+    doomed = make_request()
+    board = kanban(client, team)
+
+    assert client.delete(f"/api/maintenance-requests/{doomed['id']}").status_code == 200
+    delta = kanban(client, team, board["version"])
+
+    assert delta["deleted"] == [doomed["id"]]
+    assert card_ids(delta) == []
+    # Tombstones older than the client's version are not re-sent
+    assert kanban(client, team, delta["version"])["deleted"] == []
+
+def test_tombstones_are_filtered_by_team(client, team, make_request):
+    doomed = make_request()
+    other = client.post("/api/teams", json={"name": f"Other of {team['name']}", "members": "Cid"}).json()
+    board = kanban(client, other)
+
+    client.delete(f"/api/maintenance-requests/{doomed['id']}")
+
+    assert kanban(client, other, board["version"])["deleted"] == []
+
+def test_renamed_equipment_resends_its_cards(client, team, equipment, make_request):
+    request = make_request()
+    board = kanban(client, team)
+
+    client.put(f"/api/equipment/{equipment['id']}", json={"name": "Renamed press"})
+    delta = kanban(client, team, board["version"])
+
+    assert card_ids(delta) == [request["id"]]
+    assert delta["columns"]["New"][0]["equipment_name"] == "Renamed press"
+
+def test_renamed_team_resends_its_cards(client, team, make_request):
+    request = make_request()
+    board = kanban(client, team)
+
+    client.put(f"/api/teams/{team['id']}", json={"name": team["name"] + " (night)"})
+    delta = kanban(client, team, board["version"])
+
+    assert card_ids(delta) == [request["id"]]
+    assert delta["columns"]["New"][0]["team_name"] == team["name"] + " (night)"